@@ -0,0 +1,148 @@
+"""
+Plantilla de perfil de Chrome pre-calentada y ranuras de caché de disco compartidas
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Optional
+from config import PROFILE_CONFIG
+
+# Archivos de la plantilla que nunca se copian: bloqueos de la instancia que la
+# creó y cachés (la caché va aparte, en --disk-cache-dir)
+_ALWAYS_SKIP = {
+    "SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile", "LOCK",
+    "Cache", "Code Cache", "GPUCache", "DawnCache", "GrShaderCache", "ShaderCache",
+    "Crashpad", "BrowserMetrics", "DevToolsActivePort"
+}
+
+LEASE_FILE = "lease.pid"
+
+_lease_lock = threading.Lock()
+
+
+def template_available() -> bool:
+    template = PROFILE_CONFIG.get("template_dir")
+    return bool(template) and os.path.isdir(template)
+
+
+def prepare_worker_profile(with_cookies: bool = False) -> str:
+    """Copia la plantilla a un directorio temporal propio del driver"""
+    user_data_dir = tempfile.mkdtemp(prefix='chrome_scraper_')
+
+    def ignore(directory, names):
+        skipped = [name for name in names if name in _ALWAYS_SKIP]
+        if not with_cookies:
+            skipped += [name for name in names if name.startswith("Cookies")]
+        return skipped
+
+    shutil.copytree(PROFILE_CONFIG["template_dir"], user_data_dir, ignore=ignore, dirs_exist_ok=True)
+    return user_data_dir
+
+
+def pid_alive(pid: int) -> bool:
+    """Indica si el proceso sigue vivo (sin enviarle ninguna señal real)"""
+    if pid <= 0:
+        return False
+    if os.name == "nt":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if handle:
+            ctypes.windll.kernel32.CloseHandle(handle)
+            return True
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_lease(path: str) -> int:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def acquire_cache_dir(max_slots: int = 8) -> Optional[str]:
+    """Reserva una ranura de caché libre.
+
+    Chrome no admite dos instancias sobre la misma caché de disco, así que cada driver
+    vivo (incluido el repuesto) usa su ranura; las ranuras persisten entre ejecuciones.
+    """
+    with _lease_lock:
+        for slot in range(max_slots):
+            cache_dir = PROFILE_CONFIG["cache_dir"] if slot == 0 else f"{PROFILE_CONFIG['cache_dir']}-{slot}"
+            os.makedirs(cache_dir, exist_ok=True)
+            lease = os.path.join(cache_dir, LEASE_FILE)
+            owner = _read_lease(lease)
+            if owner and pid_alive(owner):
+                # Reservada por otro driver (de este u otro proceso vivo)
+                continue
+            with open(lease, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
+            return os.path.abspath(cache_dir)
+    return None
+
+
+def release_cache_dir(cache_dir: Optional[str]):
+    if not cache_dir:
+        return
+    with _lease_lock:
+        lease = os.path.join(cache_dir, LEASE_FILE)
+        if _read_lease(lease) == os.getpid():
+            try:
+                os.remove(lease)
+            except OSError:
+                pass
+
+
+def warm_template(headless: bool = False, wait: float = 5.0):
+    """Crea (o refresca) la plantilla visitando las URLs de calentamiento"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    template = os.path.abspath(PROFILE_CONFIG["template_dir"])
+    os.makedirs(template, exist_ok=True)
+    cache_dir = acquire_cache_dir()
+
+    options = Options()
+    options.add_argument(f"--user-data-dir={template}")
+    options.add_argument("--no-first-run")
+    if cache_dir:
+        options.add_argument(f"--disk-cache-dir={cache_dir}")
+    if headless:
+        options.add_argument("--headless=new")
+
+    driver = webdriver.Chrome(options=options)
+    try:
+        for url in PROFILE_CONFIG["warm_urls"]:
+            print(f"Calentando perfil con {url}...")
+            driver.get(url)
+            time.sleep(wait)
+    finally:
+        driver.quit()
+        release_cache_dir(cache_dir)
+    print(f"✓ Plantilla de perfil lista en {template}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gestiona la plantilla de perfil de Chrome")
+    parser.add_argument("--warm", action="store_true", help="Crear o refrescar la plantilla")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--wait", type=float, default=5.0, help="Segundos por URL de calentamiento")
+    args = parser.parse_args()
+    if args.warm:
+        warm_template(args.headless, args.wait)
+    else:
+        print(f"Plantilla: {PROFILE_CONFIG['template_dir']} ({'lista' if template_available() else 'no existe'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Banco de pruebas offline del manejo de CAPTCHA contra fixtures/slider_captcha.html
+"""
+import argparse
+import functools
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from captcha_handler import CaptchaHandler, CaptchaVerdict, SLIDER_STRATEGIES
+from config import INSTRUMENTATION_CONFIG
+from driver_manager import DriverManager
+from instrumentation import CommandRecorder, phase
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_PAGE = "slider_captcha.html"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(directory: str = FIXTURES_DIR):
+    """Sirve los fixtures en un puerto libre de localhost; devuelve (servidor, url_base)"""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# Fase en la que se ejecuta cada intento: el registrador de comandos la cuenta aparte
+BENCH_PHASE = "captcha_bench"
+
+
+def create_recorder(driver) -> CommandRecorder:
+    """Registrador propio del banco (Selenium o CDP), activo aunque la instrumentación global no lo esté"""
+    recorder = CommandRecorder({**INSTRUMENTATION_CONFIG, "enabled": True, "measure_bytes": False,
+                                "log_per_product": False, "summary_file": None})
+    recorder.attach(driver)
+    return recorder
+
+
+def _phase_commands(recorder: CommandRecorder, name: str = BENCH_PHASE) -> int:
+    return recorder.run_summary()["by_phase"].get(name, {}).get("count", 0)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_detection(manager: DriverManager, handler: CaptchaHandler, base_url: str, rounds: int,
+                    delay_ms: int) -> Dict[str, Any]:
+    """Latencia de detección: del momento en que se inserta el CAPTCHA a que se detecta"""
+    driver = manager.driver
+    watcher_ms, probe_ms = [], []
+    for _ in range(rounds):
+        manager.navigate(f"{base_url}/{FIXTURE_PAGE}?delay={delay_ms}")
+        deadline = time.time() + delay_ms / 1000 + 5
+        while time.time() < deadline and handler.watcher_verdict() in (None, CaptchaVerdict.NONE):
+            time.sleep(0.02)
+        state = driver.execute_script("return {bench: window.__bench, watch: window.__captchaWatch};")
+        if state["watch"] and state["watch"]["changed_at"] and state["bench"]["inserted_at"]:
+            watcher_ms.append(state["watch"]["changed_at"] - state["bench"]["inserted_at"])
+
+        started = time.perf_counter()
+        handler.detect_captcha()
+        probe_ms.append((time.perf_counter() - started) * 1000)
+    return {
+        "rounds": rounds,
+        "watcher_p50_ms": _percentile(watcher_ms, 50),
+        "watcher_p95_ms": _percentile(watcher_ms, 95),
+        "probe_p50_ms": _percentile(probe_ms, 50),
+        "probe_p95_ms": _percentile(probe_ms, 95)
+    }
+
+
+def bench_strategy(manager: DriverManager, handler: CaptchaHandler, recorder: CommandRecorder, base_url: str,
+                   strategy: str, rounds: int, query: str) -> Dict[str, Any]:
+    """Tasa de resolución, tiempo y comandos por intento de una estrategia"""
+    driver = manager.driver
+    solved, durations, commands, rejections = 0, [], [], {}
+    for _ in range(rounds):
+        manager.navigate(f"{base_url}/{FIXTURE_PAGE}?{query}")
+        slider = handler.find_slider_element()
+        if not slider:
+            rejections["no_slider"] = rejections.get("no_slider", 0) + 1
+            continue
+
+        before = _phase_commands(recorder)
+        started = time.perf_counter()
+        with phase(BENCH_PHASE, strategy=strategy):
+            success = handler.strategies[strategy](slider)
+        durations.append(time.perf_counter() - started)
+        commands.append(_phase_commands(recorder) - before)
+
+        if success:
+            solved += 1
+        else:
+            reason = driver.execute_script("return window.__bench.rejected;") or "unknown"
+            rejections[reason] = rejections.get(reason, 0) + 1
+    return {
+        "strategy": strategy,
+        "rounds": rounds,
+        "solve_rate": solved / rounds if rounds else 0.0,
+        "mean_s": statistics.mean(durations) if durations else 0.0,
+        "p95_s": _percentile(durations, 95),
+        "commands_per_attempt": statistics.mean(commands) if commands else 0.0,
+        "rejections": rejections
+    }
+
+
+def run_bench(rounds: int = 10, strategies: List[str] = None, delay_ms: int = 500,
+              query: str = "", headless: bool = True, backend: str = None) -> Dict[str, Any]:
+    """Ejecuta el banco completo con un Chrome headless contra el fixture local"""
+    server, base_url = start_fixture_server()
+    manager = DriverManager(headless=headless, backend=backend)
+    try:
+        manager.setup_driver()
+        driver = manager.driver
+        handler = CaptchaHandler(driver)
+        recorder = create_recorder(driver)
+
+        results = {"backend": manager.backend, "detection": bench_detection(manager, handler, base_url, rounds, delay_ms), "strategies": []}
+        for strategy in strategies or SLIDER_STRATEGIES:
+            # Se llama a la estrategia directamente para no alterar las estadísticas persistidas
+            results["strategies"].append(bench_strategy(manager, handler, recorder, base_url, strategy, rounds, query))
+        return results
+    finally:
+        manager.close()
+        server.shutdown()
+
+
+def print_report(results: Dict[str, Any]):
+    detection = results["detection"]
+    print(f"\n📊 DETECCIÓN (backend {results['backend']})")
+    print(f"  Observador: p50 {detection['watcher_p50_ms']:.0f} ms, p95 {detection['watcher_p95_ms']:.0f} ms")
+    print(f"  Sonda:      p50 {detection['probe_p50_ms']:.1f} ms, p95 {detection['probe_p95_ms']:.1f} ms")
+    print("\n📊 ESTRATEGIAS")
+    print(f"  {'estrategia':<10} {'resuelto':>9} {'media s':>8} {'p95 s':>7} {'comandos':>9}  rechazos")
+    for r in results["strategies"]:
+        print(f"  {r['strategy']:<10} {r['solve_rate']:>8.0%} {r['mean_s']:>8.2f} {r['p95_s']:>7.2f} "
+              f"{r['commands_per_attempt']:>9.1f}  {r['rejections'] or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de pruebas offline del slider CAPTCHA")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--strategies", default=",".join(SLIDER_STRATEGIES))
+    parser.add_argument("--delay-ms", type=int, default=500, help="Retraso de inserción del CAPTCHA")
+    parser.add_argument("--trusted", action="store_true", help="Rechazar eventos sintéticos (isTrusted=false)")
+    parser.add_argument("--min-moves", type=int, default=0)
+    parser.add_argument("--min-ms", type=int, default=0)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--backend", choices=["selenium", "cdp"], help="Backend del navegador (por defecto el de config)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    query = f"trusted={int(args.trusted)}&min_moves={args.min_moves}&min_ms={args.min_ms}"
+    results = run_bench(args.rounds, args.strategies.split(","), args.delay_ms, query, headless=not args.headed,
+                        backend=args.backend)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
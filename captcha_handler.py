@@ -1,203 +1,401 @@
 """
 Manejador de CAPTCHAs para Alibaba
 """
+import json
 import time
 import random
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from config import CAPTCHA_SELECTORS, SLIDER_SELECTORS, RETRY_CONFIG
-from notification_handler import notification_handler
+from config import (
+    CAPTCHA_SELECTORS,
+    SLIDER_SELECTORS,
+    CAPTCHA_SUCCESS_SELECTORS,
+    CAPTCHA_BLOCK_MARKERS,
+    CAPTCHA_STRATEGY_CONFIG,
+    RETRY_CONFIG
+)
+from notification_handler import notification_dispatcher
+from captcha_strategy import CaptchaStrategySelector
+from slider_trajectory import perform_drag
+from instrumentation import phase
+from run_report import run_report
+from metrics_exporter import CAPTCHA_ENCOUNTERS, CAPTCHA_RESULTS
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+SLIDER_STRATEGIES = ["v1", "v2", "v3", "v4"]
+
+# Estadísticas compartidas por todas las instancias de CaptchaHandler
+strategy_selector = CaptchaStrategySelector(SLIDER_STRATEGIES)
+
+
+class CaptchaVerdict(str, Enum):
+    """Resultado de la sonda de CAPTCHA"""
+    NONE = "none"
+    SLIDER = "slider"
+    IFRAME = "iframe_captcha"
+    BLOCK_PAGE = "block_page"
+
+
+# Función de detección que se evalúa dentro de la página: todos los selectores y
+# la visibilidad se resuelven en una sola llamada en lugar de un find_elements +
+# is_displayed por selector.
+CAPTCHA_PROBE_FUNCTION_JS = """
+function __captchaProbe(cfg) {
+    const visible = el => {
+        if (!el || !el.isConnected) return false;
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) {
+            return false;
+        }
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const firstVisible = (selectors, extra) => {
+        for (const selector of selectors) {
+            let elements = [];
+            try { elements = document.querySelectorAll(selector); } catch (e) { continue; }
+            for (const el of elements) {
+                if (visible(el) && (!extra || extra(el))) return {el: el, selector: selector};
+            }
+        }
+        return null;
+    };
+    
+    const result = {verdict: 'none', slider: null, selector: null};
+    const captcha = firstVisible(cfg.captcha);
+    if (captcha) {
+        result.selector = captcha.selector;
+        if (captcha.el.tagName === 'IFRAME') {
+            result.verdict = 'iframe_captcha';
+            return result;
+        }
+        result.verdict = 'slider';
+        const slider = firstVisible(cfg.slider, el => !el.disabled);
+        if (slider) result.slider = slider.el;
+        return result;
+    }
+    
+    const url = window.location.href;
+    let blocked = cfg.block.url.some(marker => url.includes(marker));
+    if (!blocked && document.getElementsByTagName('*').length < 500) {
+        // Las páginas de bloqueo son pequeñas: solo entonces se revisa el texto
+        const text = (document.title + ' ' + (document.body ? document.body.textContent : '')).slice(0, 5000);
+        blocked = cfg.block.text.some(marker => text.includes(marker));
+    }
+    if (blocked) result.verdict = 'block_page';
+    return result;
+}
+"""
+
+PROBE_CONFIG = {
+    "captcha": CAPTCHA_SELECTORS,
+    "slider": SLIDER_SELECTORS,
+    "block": CAPTCHA_BLOCK_MARKERS
+}
+
+CAPTCHA_PROBE_JS = CAPTCHA_PROBE_FUNCTION_JS + """
+return __captchaProbe(arguments[0]);
+"""
+
+CAPTCHA_SUCCESS_PROBE_JS = CAPTCHA_PROBE_FUNCTION_JS + """
+const successSelectors = arguments[1];
+for (const selector of successSelectors) {
+    let elements = [];
+    try { elements = document.querySelectorAll(selector); } catch (e) { continue; }
+    for (const el of elements) {
+        const rect = el.getBoundingClientRect();
+        if (rect.width > 0 && rect.height > 0) return true;
+    }
+}
+return __captchaProbe(arguments[0]).verdict === 'none';
+"""
+
+# Observador inyectado en cada documento (junto a los scripts anti-detección).
+# Reevalúa la sonda cuando el DOM cambia y deja el veredicto en window.__captchaWatch,
+# que lee la compuerta de carga.
+
+CAPTCHA_WATCHER_JS = """
+(function() {
+    if (window.__captchaWatch) return;
+    const cfg = """ + json.dumps(PROBE_CONFIG) + """;
+""" + CAPTCHA_PROBE_FUNCTION_JS + """
+    const state = window.__captchaWatch = {verdict: 'none', selector: null, changed_at: 0, detections: 0};
+    let scheduled = false;
+    const evaluate = () => {
+        scheduled = false;
+        let result;
+        try { result = __captchaProbe(cfg); } catch (e) { return; }
+        if (result.verdict === state.verdict) return;
+        state.verdict = result.verdict;
+        state.selector = result.selector;
+        state.changed_at = Date.now();
+        if (result.verdict !== 'none') state.detections += 1;
+    };
+    const schedule = () => {
+        if (!scheduled) {
+            scheduled = true;
+            setTimeout(evaluate, 200);
+        }
+    };
+    new MutationObserver(schedule).observe(document, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'style', 'src']
+    });
+    schedule();
+})();
+"""
+
+# Espera dentro de la página (una sola llamada) a que el CAPTCHA desaparezca o
+# aparezca un indicador de éxito, en lugar de dormir un tiempo fijo.
+CAPTCHA_SUCCESS_WAIT_JS = CAPTCHA_PROBE_FUNCTION_JS + """
+const cfg = arguments[0];
+const successSelectors = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const solved = () => {
+    for (const selector of successSelectors) {
+        let elements = [];
+        try { elements = document.querySelectorAll(selector); } catch (e) { continue; }
+        for (const el of elements) {
+            const rect = el.getBoundingClientRect();
+            if (rect.width > 0 && rect.height > 0) return true;
+        }
+    }
+    return __captchaProbe(cfg).verdict === 'none';
+};
+let finished = false;
+const finish = value => {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(value);
+};
+let scheduled = false;
+const observer = new MutationObserver(() => {
+    if (scheduled) return;
+    scheduled = true;
+    setTimeout(() => { scheduled = false; if (solved()) finish(true); }, 50);
+});
+const timer = setTimeout(() => finish(solved()), timeoutMs);
+observer.observe(document, {childList: true, subtree: true, attributes: true});
+"""
+
+# Espera a que aparezca el slider (o a que el CAPTCHA desaparezca) en lugar de una pausa
+# fija; devuelve el elemento o null
+SLIDER_WAIT_JS = CAPTCHA_PROBE_FUNCTION_JS + """
+const cfg = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const ready = () => {
+    const result = __captchaProbe(cfg);
+    return result.slider || result.verdict === 'none';
+};
+let finished = false;
+const finish = () => {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(__captchaProbe(cfg).slider);
+};
+let scheduled = false;
+const observer = new MutationObserver(() => {
+    if (scheduled) return;
+    scheduled = true;
+    setTimeout(() => { scheduled = false; if (ready()) finish(); }, 50);
+});
+const timer = setTimeout(finish, timeoutMs);
+observer.observe(document, {childList: true, subtree: true, attributes: true});
+if (ready()) finish();
+"""
 
 
 class CaptchaHandler:
-    def __init__(self, driver):
+    def __init__(self, driver, refresh: Optional[Callable[[], Any]] = None):
         self.driver = driver
+        # Recarga que espera la compuerta de carga (DriverManager.refresh_page); sin ella
+        # se usa driver.refresh() con una pausa fija
+        self.refresh = refresh
         self.wait = WebDriverWait(driver, 5)
+        self.strategy_selector = strategy_selector
+        self.last_detected = False
+        self.strategies = {
+            "v1": self._solve_slider_v1,
+            "v2": self._solve_slider_v2,
+            "v3": self._solve_slider_v3,
+            "v4": self._solve_slider_v4
+        }
+    
+    def detect_captcha(self) -> Dict[str, Any]:
+        """Sonda única: devuelve el veredicto y, si aplica, el elemento slider"""
+        try:
+            result = self.driver.execute_script(CAPTCHA_PROBE_JS, PROBE_CONFIG) or {}
+        except Exception as e:
+            logger.warning("Error en la sonda de CAPTCHA: %s", e)
+            return {"verdict": CaptchaVerdict.NONE, "slider": None, "selector": None}
+        return {
+            "verdict": CaptchaVerdict(result.get("verdict", "none")),
+            "slider": result.get("slider"),
+            "selector": result.get("selector")
+        }
     
+    @phase("captcha")
     def is_captcha_present(self) -> bool:
         """Detecta si hay un CAPTCHA presente en la página"""
-        for selector in CAPTCHA_SELECTORS:
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if element.is_displayed():
-                        return True
-            except:
-                continue
-        return False
+        return self.detect_captcha()["verdict"] != CaptchaVerdict.NONE
     
     def find_slider_element(self):
         """Encuentra el elemento slider del CAPTCHA"""
-        for selector in SLIDER_SELECTORS:
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    if element.is_displayed() and element.is_enabled():
-                        return element
-            except:
-                continue
-        return None
+        return self.detect_captcha()["slider"]
+    
+    def watcher_verdict(self) -> Optional[CaptchaVerdict]:
+        """Lee el veredicto del observador inyectado (None si no está instalado)"""
+        try:
+            verdict = self.driver.execute_script(
+                "return window.__captchaWatch ? window.__captchaWatch.verdict : null;"
+            )
+        except Exception:
+            return None
+        return CaptchaVerdict(verdict) if verdict else None
     
     def handle_slider_captcha_advanced(self) -> bool:
         """Manejo avanzado de CAPTCHA con múltiples estrategias"""
+        # Se llama en cada carga: la sonda inicial queda fuera de la fase "captcha" para
+        # que las páginas sin CAPTCHA no cuenten como tal
+        self.last_detected = False
+        detection = self.detect_captcha()
+        if detection["verdict"] == CaptchaVerdict.NONE:
+            logger.debug("No se detectó CAPTCHA")
+            return True
+        with phase("captcha"):
+            return self._resolve_captcha(detection)
+    
+    def _resolve_captcha(self, detection: Dict[str, Any]) -> bool:
+        """Reintenta con distintas estrategias; `detection` es la sonda que encontró el CAPTCHA"""
         max_attempts = RETRY_CONFIG["max_captcha_attempts"]
+        refresh_after = CAPTCHA_STRATEGY_CONFIG["refresh_after_failures"]
         captcha_detected = False
+        tried_strategies = set()
+        failures_since_refresh = 0
         
         for attempt in range(max_attempts):
             try:
-                print(f"Buscando CAPTCHA... Intento {attempt + 1}/{max_attempts}")
+                logger.debug("Buscando CAPTCHA, intento %d/%d", attempt + 1, max_attempts)
                 
-                if not self.is_captcha_present():
-                    print("No se detectó CAPTCHA")
+                if attempt:
+                    detection = self.detect_captcha()
+                verdict = detection["verdict"]
+                if verdict == CaptchaVerdict.NONE:
+                    logger.debug("No se detectó CAPTCHA")
+                    if self.last_detected:
+                        # Desapareció tras un intento anterior de este episodio
+                        CAPTCHA_RESULTS.inc(result="solved")
                     return True
                 
+                if not self.last_detected:
+                    CAPTCHA_ENCOUNTERS.inc(verdict=verdict.value)
+                self.last_detected = True
+                if verdict == CaptchaVerdict.BLOCK_PAGE:
+                    # No hay slider que resolver: reintentar aquí solo pierde tiempo
+                    logger.error("Página de bloqueo detectada, no hay CAPTCHA que resolver")
+                    run_report.failure("captcha", "block_page")
+                    CAPTCHA_RESULTS.inc(result="blocked")
+                    notification_dispatcher.send_error_notification(
+                        "Alibaba devolvió una página de bloqueo.", category="captcha"
+                    )
+                    return False
+                
                 # Si es la primera vez que detectamos CAPTCHA, enviar notificación
                 if not captcha_detected:
                     captcha_detected = True
-                    notification_handler.send_captcha_alert(
+                    notification_dispatcher.send_captcha_alert(
                         message="CAPTCHA detectado en Alibaba. El scraper intentará resolverlo automáticamente.",
                         title="Alibaba Scraper - CAPTCHA Detectado"
                     )
                 
-                time.sleep(2)
-                
-                # Detectar tipo de CAPTCHA
-                slider_element = self.find_slider_element()
+                # La sonda ya trajo el slider; si aún no estaba se espera a que aparezca
+                slider_element = detection["slider"] or self._wait_for_slider()
                 
                 if slider_element:
-                    print(f"CAPTCHA detectado, resolviendo... (Intento {attempt + 1})")
+                    # La estrategia se elige según el historial de esta variante de CAPTCHA,
+                    # sin repetir en el mismo episodio una que ya falló
+                    variant = f"{verdict.value}:{detection['selector']}"
+                    strategy = self.strategy_selector.choose(variant, exclude=tried_strategies)
+                    tried_strategies.add(strategy)
+                    logger.info("CAPTCHA detectado, resolviendo con estrategia %s", strategy,
+                                extra={"variant": variant, "attempt": attempt + 1})
                     
-                    # Estrategia múltiple de resolución
-                    if attempt < 2:
-                        success = self._solve_slider_v1(slider_element)
-                    elif attempt < 4:
-                        success = self._solve_slider_v2(slider_element)
-                    elif attempt < 5:
-                        success = self._solve_slider_v3(slider_element)
-                    else:
-                        success = self._solve_slider_v4(slider_element)
+                    started = time.time()
+                    success = self.strategies[strategy](slider_element)
+                    self.strategy_selector.record(variant, strategy, success, time.time() - started)
                     
                     if success:
-                        print("¡CAPTCHA resuelto exitosamente!")
-                        notification_handler.send_success_notification(
+                        logger.info("CAPTCHA resuelto", extra={"strategy": strategy, "elapsed_s": round(time.time() - started, 2)})
+                        CAPTCHA_RESULTS.inc(result="solved")
+                        notification_dispatcher.send_success_notification(
                             "CAPTCHA resuelto automáticamente. El scraping continúa."
                         )
                         time.sleep(2)
                         return True
                     else:
-                        print(f"Intento {attempt + 1} fallido, reintentando...")
+                        logger.warning("Intento %d fallido, reintentando", attempt + 1, extra={"strategy": strategy})
                         time.sleep(random.uniform(2, 4))
-                        # Refrescar página si falla
-                        if attempt >= 2:
-                            self.driver.refresh()
-                            time.sleep(3)
+                        # Refrescar solo tras varios fallos seguidos con estrategias distintas
+                        failures_since_refresh += 1
+                        if failures_since_refresh >= refresh_after:
+                            self._refresh()
+                            failures_since_refresh = 0
+                            tried_strategies.clear()
                 else:
-                    print("No se encontró elemento deslizante")
+                    logger.warning("No se encontró elemento deslizante")
                     time.sleep(1)
                     
             except Exception as e:
-                print(f"Error en intento {attempt + 1}: {e}")
+                logger.warning("Error en intento %d: %s", attempt + 1, e, extra={"error_type": type(e).__name__})
                 time.sleep(random.uniform(1, 3))
         
         # Si llegamos aquí, no se pudo resolver el CAPTCHA
-        print("No se pudo resolver el CAPTCHA después de todos los intentos")
-        notification_handler.send_error_notification(
+        logger.error("No se pudo resolver el CAPTCHA después de todos los intentos")
+        run_report.failure("captcha", "unsolved")
+        if self.last_detected:
+            CAPTCHA_RESULTS.inc(result="failed")
+        notification_dispatcher.send_error_notification(
             "CAPTCHA no pudo ser resuelto automáticamente. Se requiere intervención manual."
         )
         return False
     
+    def _refresh(self):
+        if self.refresh:
+            self.refresh()
+        else:
+            self.driver.refresh()
+            time.sleep(3)
+    
     def _solve_slider_v1(self, slider_element) -> bool:
-        """Estrategia 1: Movimiento lineal rápido con distancia garantizada"""
+        """Estrategia 1: Arrastre rápido y casi lineal hasta el final"""
         try:
-            action = ActionChains(self.driver)
-            
-            # Obtener dimensiones del contenedor
-            container = slider_element.find_element(By.XPATH, "./ancestor::div[contains(@class, 'nc_wrapper') or contains(@class, 'slider')]")
-            container_width = container.size['width']
-            
-            # Calcular distancia exacta hasta el final
-            slider_rect = slider_element.rect
-            slider_width = slider_rect['width']
-            
-            # Asegurar que llegue hasta el final (agregar un pequeño margen)
-            distance = container_width - slider_width + 5
-            
-            print(f"Distancia calculada: {distance}px (container: {container_width}px, slider: {slider_width}px)")
-            
-            # Movimiento rápido y directo
-            action.move_to_element(slider_element).perform()
-            time.sleep(0.5)
-            
-            action.click_and_hold(slider_element).perform()
-            time.sleep(0.2)
-            
-            # Mover hasta el final
-            action.move_by_offset(distance, 0).perform()
-            time.sleep(0.5)
-            
-            action.release().perform()
-            
+            distance = perform_drag(self.driver, slider_element, "direct")
+            logger.debug("Estrategia 1: distancia recorrida %spx", distance)
             return self._check_captcha_success()
             
         except Exception as e:
-            print(f"Error en estrategia 1: {e}")
+            logger.debug("Error en estrategia 1: %s", e)
             return False
     
     def _solve_slider_v2(self, slider_element) -> bool:
-        """Estrategia 2: Movimiento con aceleración humana y distancia garantizada"""
+        """Estrategia 2: Arrastre con aceleración humana y temblor vertical"""
         try:
-            action = ActionChains(self.driver)
-            
-            # Obtener dimensiones del contenedor
-            container = slider_element.find_element(By.XPATH, "./ancestor::div[contains(@class, 'nc_wrapper') or contains(@class, 'slider')]")
-            container_width = container.size['width']
-            
-            # Calcular distancia exacta hasta el final
-            slider_rect = slider_element.rect
-            slider_width = slider_rect['width']
-            
-            # Asegurar que llegue hasta el final (agregar un pequeño margen)
-            distance = container_width - slider_width + 5
-            
-            print(f"Estrategia 2 - Distancia calculada: {distance}px")
-            
-            action.move_to_element(slider_element).perform()
-            time.sleep(random.uniform(0.5, 1))
-            
-            action.click_and_hold(slider_element).perform()
-            time.sleep(random.uniform(0.1, 0.3))
-            
-            # Movimiento en etapas con aceleración y distancia garantizada
-            steps = 10
-            total_moved = 0
-            
-            for i in range(steps):
-                step_distance = distance / steps
-                
-                # Ajustar velocidad según la etapa
-                if i < 3:  # Aceleración
-                    step_distance *= 0.8
-                elif i > 7:  # Desaceleración
-                    step_distance *= 1.2
-                
-                # Asegurar que el último paso llegue exactamente al final
-                if i == steps - 1:
-                    remaining_distance = distance - total_moved
-                    step_distance = remaining_distance
-                
-                action.move_by_offset(step_distance, int(random.uniform(-1, 1))).perform()
-                total_moved += step_distance
-                time.sleep(random.uniform(0.02, 0.05))
-            
-            time.sleep(random.uniform(0.3, 0.7))
-            action.release().perform()
-            
+            distance = perform_drag(self.driver, slider_element, "human")
+            logger.debug("Estrategia 2: distancia recorrida %spx", distance)
             return self._check_captcha_success()
             
         except Exception as e:
-            print(f"Error en estrategia 2: {e}")
+            logger.debug("Error en estrategia 2: %s", e)
             return False
     
     def _solve_slider_v3(self, slider_element) -> bool:
@@ -264,78 +462,54 @@ class CaptchaHandler:
             return self._check_captcha_success()
             
         except Exception as e:
-            print(f"Error en estrategia 3: {e}")
+            logger.debug("Error en estrategia 3: %s", e)
             return False
     
     def _solve_slider_v4(self, slider_element) -> bool:
-        """Estrategia 4: Movimiento agresivo con múltiples intentos"""
+        """Estrategia 4: Arrastres rápidos que se pasan del final, con varios intentos"""
         try:
-            action = ActionChains(self.driver)
-            
-            # Obtener dimensiones del contenedor
-            container = slider_element.find_element(By.XPATH, "./ancestor::div[contains(@class, 'nc_wrapper') or contains(@class, 'slider')]")
-            container_width = container.size['width']
-            
-            # Calcular distancia con margen extra
-            slider_rect = slider_element.rect
-            slider_width = slider_rect['width']
-            distance = container_width - slider_width + 10  # Margen extra
-            
-            print(f"Estrategia 4 - Distancia agresiva: {distance}px")
-            
-            # Múltiples intentos con diferentes velocidades
+            # Múltiples intentos, cada uno con una trayectoria distinta de la biblioteca
             for attempt in range(3):
                 try:
-                    action.move_to_element(slider_element).perform()
-                    time.sleep(0.3)
-                    
-                    action.click_and_hold(slider_element).perform()
-                    time.sleep(0.1)
-                    
-                    # Movimiento muy rápido al final
-                    action.move_by_offset(distance, 0).perform()
-                    time.sleep(0.2)
-                    
-                    action.release().perform()
-                    time.sleep(1)
+                    distance = perform_drag(self.driver, slider_element, "overshoot")
+                    logger.debug("Estrategia 4: distancia recorrida %spx (intento %d)", distance, attempt + 1)
                     
                     if self._check_captcha_success():
                         return True
                         
                 except Exception as e:
-                    print(f"Intento {attempt + 1} de estrategia 4 falló: {e}")
+                    logger.debug("Intento %d de estrategia 4 falló: %s", attempt + 1, e)
                     continue
             
             return False
             
         except Exception as e:
-            print(f"Error en estrategia 4: {e}")
+            logger.debug("Error en estrategia 4: %s", e)
             return False
     
-    def _check_captcha_success(self) -> bool:
-        """Verifica si el CAPTCHA fue resuelto exitosamente"""
-        success_indicators = [
-            "div.nc-lang-cnt[data-nc-lang='_yesTEXT']",
-            "span[class*='success']",
-            "div[class*='success']",
-            "div[class*='verified']",
-            ".nc-lang-cnt:contains('成功')",
-            "[class*='pass']"
-        ]
-        
-        time.sleep(2)  # Esperar respuesta del servidor
-        
-        for indicator in success_indicators:
-            try:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, indicator)
-                for element in elements:
-                    if element.is_displayed():
-                        return True
-            except:
-                continue
+    def _wait_for_slider(self, timeout: float = 5):
+        """Espera a que el slider aparezca, como máximo `timeout` (el del WebDriverWait)"""
+        try:
+            return self.driver.execute_async_script(SLIDER_WAIT_JS, PROBE_CONFIG, int(timeout * 1000))
+        except Exception as e:
+            logger.debug("Error esperando el slider: %s", e)
+            return self.find_slider_element()
+    
+    def _check_captcha_success(self, timeout: float = 2) -> bool:
+        """Verifica si el CAPTCHA fue resuelto exitosamente (indicadores o CAPTCHA ausente)"""
+        try:
+            # Regresa en cuanto la página reacciona; como máximo espera `timeout`
+            return bool(self.driver.execute_async_script(
+                CAPTCHA_SUCCESS_WAIT_JS, PROBE_CONFIG, CAPTCHA_SUCCESS_SELECTORS, int(timeout * 1000)
+            ))
+        except Exception:
+            # La página puede navegar al resolverse; se verifica con la sonda simple
+            time.sleep(0.5)
         
-        # Verificar si el CAPTCHA desapareció
-        if not self.is_captcha_present():
-            return True
-            
-        return False 
\ No newline at end of file
+        try:
+            return bool(self.driver.execute_script(
+                CAPTCHA_SUCCESS_PROBE_JS, PROBE_CONFIG, CAPTCHA_SUCCESS_SELECTORS
+            ))
+        except Exception as e:
+            logger.debug("Error verificando CAPTCHA: %s", e)
+            return False 
\ No newline at end of file
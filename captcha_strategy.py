@@ -0,0 +1,99 @@
+"""
+Selector adaptativo de estrategias de CAPTCHA con estadísticas persistentes
+"""
+import json
+import os
+import random
+import threading
+from typing import Dict, Iterable, List, Optional
+from config import CAPTCHA_STRATEGY_CONFIG
+
+
+class CaptchaStrategySelector:
+    """
+    Bandido multibrazo (muestreo de Thompson) por variante de CAPTCHA.
+    Cada estrategia tiene una Beta(éxitos + 1, fallos + 1); la muestra se divide
+    por el tiempo medio del intento para preferir la que resuelve más por segundo.
+    """
+    
+    def __init__(self, strategies: List[str],
+                 stats_file: Optional[str] = CAPTCHA_STRATEGY_CONFIG["stats_file"],
+                 prior_time: float = CAPTCHA_STRATEGY_CONFIG["prior_time"]):
+        self.strategies = list(strategies)
+        self.stats_file = stats_file
+        self.prior_time = prior_time
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        """Carga las estadísticas guardadas (si existen)"""
+        if not self.stats_file or not os.path.exists(self.stats_file):
+            return
+        try:
+            with open(self.stats_file, encoding="utf-8") as f:
+                self.stats = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ No se pudieron cargar las estadísticas de CAPTCHA: {e}")
+            self.stats = {}
+    
+    def save(self):
+        """Guarda las estadísticas de forma atómica"""
+        if not self.stats_file:
+            return
+        tmp_path = self.stats_file + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.stats, f, indent=2)
+            os.replace(tmp_path, self.stats_file)
+        except OSError as e:
+            print(f"⚠️ No se pudieron guardar las estadísticas de CAPTCHA: {e}")
+    
+    def _arm(self, variant: str, strategy: str) -> Dict:
+        return self.stats.setdefault(variant, {}).setdefault(
+            strategy, {"successes": 0, "failures": 0, "total_time": 0.0, "solved_time": 0.0}
+        )
+    
+    def expected_time(self, variant: str, strategy: str) -> float:
+        """Tiempo medio por intento (con un intento previo de prior_time segundos)"""
+        arm = self._arm(variant, strategy)
+        attempts = arm["successes"] + arm["failures"]
+        return (arm["total_time"] + self.prior_time) / (attempts + 1)
+    
+    def choose(self, variant: str, exclude: Iterable[str] = ()) -> str:
+        """Elige la estrategia a probar para esta variante"""
+        excluded = set(exclude)
+        candidates = [s for s in self.strategies if s not in excluded] or self.strategies
+        with self.lock:
+            best, best_score = candidates[0], -1.0
+            for strategy in candidates:
+                arm = self._arm(variant, strategy)
+                theta = random.betavariate(arm["successes"] + 1, arm["failures"] + 1)
+                score = theta / max(self.expected_time(variant, strategy), 0.1)
+                if score > best_score:
+                    best, best_score = strategy, score
+            return best
+    
+    def record(self, variant: str, strategy: str, success: bool, duration: float):
+        """Registra el resultado de un intento y lo persiste"""
+        with self.lock:
+            arm = self._arm(variant, strategy)
+            arm["successes" if success else "failures"] += 1
+            arm["total_time"] += duration
+            if success:
+                arm["solved_time"] += duration
+            self.save()
+    
+    def summary(self, variant: str) -> List[Dict]:
+        """Estadísticas de cada estrategia para una variante, de mejor a peor tasa de éxito"""
+        rows = []
+        for strategy in self.strategies:
+            arm = self._arm(variant, strategy)
+            attempts = arm["successes"] + arm["failures"]
+            rows.append({
+                "strategy": strategy,
+                "attempts": attempts,
+                "success_rate": (arm["successes"] / attempts) if attempts else None,
+                "mean_time": self.expected_time(variant, strategy)
+            })
+        return sorted(rows, key=lambda r: -(r["success_rate"] or 0))
@@ -0,0 +1,95 @@
+"""
+Benchmark de densidad: memoria por navegador y páginas por minuto según el perfil de lanzamiento
+"""
+import argparse
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+from config import CHROME_LAUNCH_PROFILES
+from driver_manager import DriverManager
+from driver_health import chrome_rss_mb, PSUTIL_AVAILABLE
+from captcha_bench import start_fixture_server, FIXTURE_PAGE
+
+
+def _browse(manager: DriverManager, urls: List[str], pages: int, loaded: List[int]):
+    for i in range(pages):
+        try:
+            manager.navigate(urls[i % len(urls)])
+            loaded.append(1)
+        except Exception as e:
+            print(f"✗ Error cargando página: {e}")
+
+
+def bench_profile(profile: str, urls: List[str], browsers: int, pages: int, headless: bool = True) -> Dict[str, Any]:
+    """Lanza `browsers` Chrome con el perfil y carga `pages` páginas en cada uno en paralelo"""
+    managers = []
+    try:
+        launch_started = time.perf_counter()
+        for _ in range(browsers):
+            manager = DriverManager(headless=headless, launch_profile=profile)
+            manager.setup_driver()
+            managers.append(manager)
+        launch_s = (time.perf_counter() - launch_started) / browsers
+
+        loaded = []
+        threads = [threading.Thread(target=_browse, args=(m, urls, pages, loaded)) for m in managers]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        rss = [r for r in (chrome_rss_mb(m.driver) for m in managers) if r is not None]
+        return {
+            "profile": profile,
+            "browsers": browsers,
+            "launch_s": launch_s,
+            "pages_per_min": len(loaded) / elapsed * 60 if elapsed else 0.0,
+            "rss_mb_per_browser": statistics.mean(rss) if rss else None,
+            "rss_mb_max": max(rss) if rss else None
+        }
+    finally:
+        for manager in managers:
+            manager.close()
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print("\n📊 DENSIDAD POR PERFIL DE LANZAMIENTO")
+    print(f"  {'perfil':<12} {'navegadores':>11} {'arranque s':>10} {'págs/min':>9} {'RSS MB/nav':>11} {'RSS máx':>8}")
+    for r in results:
+        rss = f"{r['rss_mb_per_browser']:.0f}" if r['rss_mb_per_browser'] is not None else "n/d"
+        rss_max = f"{r['rss_mb_max']:.0f}" if r['rss_mb_max'] is not None else "n/d"
+        print(f"  {r['profile']:<12} {r['browsers']:>11} {r['launch_s']:>10.2f} {r['pages_per_min']:>9.1f} "
+              f"{rss:>11} {rss_max:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los perfiles de lanzamiento de Chrome")
+    parser.add_argument("--profiles", default=",".join(CHROME_LAUNCH_PROFILES))
+    parser.add_argument("--browsers", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=10, help="Páginas por navegador")
+    parser.add_argument("--url", action="append", help="URL a cargar (por defecto el fixture local)")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    if not PSUTIL_AVAILABLE:
+        print("⚠️  Sin psutil no se puede medir la memoria por navegador")
+
+    server = None
+    urls = args.url
+    if not urls:
+        server, base_url = start_fixture_server()
+        urls = [f"{base_url}/{FIXTURE_PAGE}"]
+    try:
+        results = [bench_profile(profile, urls, args.browsers, args.pages, headless=not args.headed)
+                   for profile in args.profiles.split(",")]
+    finally:
+        if server:
+            server.shutdown()
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Exportación columnar (Parquet / Arrow IPC) de los catálogos scrapeados
+"""
+import argparse
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List
+from config import OUTPUT_FILES, COLUMNAR_CONFIG
+from product_ids import canonical_product_id
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Columnas de texto repetitivo que se guardan con codificación de diccionario
+DICTIONARY_COLUMNS = ["category_id", "company", "supplier_name", "supplier_type", "supplier_location"]
+
+
+def build_schema():
+    """Esquema tipado del catálogo"""
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    string_map = pa.map_(pa.string(), pa.string())
+    return pa.schema([
+        ("canonical_id", pa.string()),
+        ("original_product_id", pa.int64()),
+        ("category_id", dict_string),
+        ("description", pa.string()),
+        ("price", pa.string()),
+        ("company", dict_string),
+        ("min_order", pa.string()),
+        ("product_url", pa.string()),
+        ("alibaba_detail_url", pa.string()),
+        ("supplier_name", dict_string),
+        ("supplier_type", dict_string),
+        ("supplier_years", pa.string()),
+        ("supplier_location", dict_string),
+        ("prices", pa.list_(pa.struct([("quantity", pa.string()), ("price", pa.string())]))),
+        ("attributes", string_map),
+        ("packaging_info", string_map),
+        ("delivery_lead_times", string_map),
+        ("images", pa.list_(pa.string())),
+        ("iframe_images", pa.list_(pa.string())),
+        ("detailed_description_text", pa.string()),
+        ("iframe_content_text", pa.string())
+    ])
+
+
+def _to_int(value: Any):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_str(value: Any):
+    if value is None or value == 'N/A':
+        return None
+    return str(value)
+
+
+def _to_map(value: Any) -> List[tuple]:
+    return [(str(k), str(v)) for k, v in (value or {}).items()]
+
+
+def product_to_row(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplana un producto (formato JSON del scraper) en una fila columnar"""
+    supplier = product.get('supplier_info') or {}
+    iframe = product.get('iframe_content') or {}
+    return {
+        "canonical_id": canonical_product_id(product.get('alibaba_detail_url') or product.get('product_url')),
+        "original_product_id": _to_int(product.get('original_product_id')),
+        "category_id": _to_str(product.get('category_id')),
+        "description": product.get('description'),
+        "price": product.get('price'),
+        "company": _to_str(product.get('company')),
+        "min_order": product.get('min_order'),
+        "product_url": product.get('product_url'),
+        "alibaba_detail_url": product.get('alibaba_detail_url'),
+        "supplier_name": _to_str(supplier.get('name') or product.get('supplier_name')),
+        "supplier_type": _to_str(supplier.get('type')),
+        "supplier_years": _to_str(supplier.get('years_on_alibaba')),
+        "supplier_location": _to_str(supplier.get('location')),
+        "prices": [{"quantity": p.get('quantity'), "price": p.get('price')} for p in product.get('prices') or []],
+        "attributes": _to_map(product.get('attributes')),
+        "packaging_info": _to_map(product.get('packaging_info')),
+        "delivery_lead_times": _to_map(product.get('delivery_lead_times')),
+        "images": list(product.get('images') or []),
+        "iframe_images": list(iframe.get('images') or []),
+        "detailed_description_text": product.get('detailed_description_text'),
+        "iframe_content_text": iframe.get('text')
+    }
+
+
+def iter_products_jsonl(filename: str = OUTPUT_FILES['jsonl']) -> Iterator[Dict[str, Any]]:
+    """Lee el diario JSON Lines producto a producto"""
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_products_sqlite(filename: str = OUTPUT_FILES['sqlite'],
+                         chunk_size: int = COLUMNAR_CONFIG['chunk_size']) -> Iterator[Dict[str, Any]]:
+    """Reconstruye productos desde el almacén SQLite por bloques de chunk_size"""
+    conn = sqlite3.connect(filename)
+    try:
+        cursor = conn.execute(
+            """
+            SELECT p.canonical_id, p.original_product_id, p.category_id, p.description, p.price,
+                   p.company, p.min_order, p.product_url, p.alibaba_detail_url,
+                   p.detailed_description_text, p.iframe_content_text,
+                   s.name, s.type, s.years_on_alibaba, s.location
+            FROM products p LEFT JOIN suppliers s ON s.supplier_id = p.supplier_id
+            ORDER BY p.canonical_id
+            """
+        )
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            ids = [r[0] for r in rows]
+            marks = ", ".join("?" for _ in ids)
+
+            tiers, attributes, images = {}, {}, {}
+            for cid, quantity, price in conn.execute(
+                    f"SELECT canonical_id, quantity, price FROM price_tiers WHERE canonical_id IN ({marks}) "
+                    f"ORDER BY canonical_id, position", ids):
+                tiers.setdefault(cid, []).append({"quantity": quantity, "price": price})
+            for cid, section, name, value in conn.execute(
+                    f"SELECT canonical_id, section, name, value FROM attributes WHERE canonical_id IN ({marks})", ids):
+                attributes.setdefault(cid, {}).setdefault(section, {})[name] = value
+            for cid, source, url in conn.execute(
+                    f"SELECT canonical_id, source, url FROM images WHERE canonical_id IN ({marks}) "
+                    f"ORDER BY canonical_id, source, position", ids):
+                images.setdefault(cid, {}).setdefault(source, []).append(url)
+
+            for r in rows:
+                cid = r[0]
+                sections = attributes.get(cid, {})
+                yield {
+                    "original_product_id": r[1],
+                    "category_id": r[2],
+                    "description": r[3],
+                    "price": r[4],
+                    "company": r[5],
+                    "min_order": r[6],
+                    "product_url": r[7],
+                    "alibaba_detail_url": r[8],
+                    "detailed_description_text": r[9],
+                    "supplier_info": {"name": r[11], "type": r[12], "years_on_alibaba": r[13], "location": r[14]},
+                    "prices": tiers.get(cid, []),
+                    "attributes": sections.get("attribute", {}),
+                    "packaging_info": sections.get("packaging", {}),
+                    "delivery_lead_times": sections.get("lead_time", {}),
+                    "images": images.get(cid, {}).get("gallery", []),
+                    "iframe_content": {"text": r[10], "images": images.get(cid, {}).get("iframe", [])}
+                }
+    finally:
+        conn.close()
+
+
+def export_columnar(products: Iterable[Dict[str, Any]], output: str, fmt: str = "parquet",
+                    chunk_size: int = COLUMNAR_CONFIG['chunk_size']) -> int:
+    """Escribe los productos por lotes de chunk_size; devuelve el total exportado"""
+    if not PYARROW_AVAILABLE:
+        print("⚠️  pyarrow no está instalado. Instala con: pip install pyarrow")
+        return 0
+
+    schema = build_schema()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(output, schema, compression=COLUMNAR_CONFIG['compression'],
+                                  use_dictionary=DICTIONARY_COLUMNS)
+        write_batch = writer.write_batch
+    elif fmt == "arrow":
+        # Formato stream: cada lote puede traer su propio diccionario
+        sink = pa.OSFile(output, "wb")
+        writer = pa.ipc.new_stream(sink, schema)
+        write_batch = writer.write_batch
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+    total = 0
+    chunk = []
+    try:
+        for product in products:
+            chunk.append(product_to_row(product))
+            if len(chunk) >= chunk_size:
+                write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            total += len(chunk)
+    finally:
+        writer.close()
+        if fmt == "arrow":
+            sink.close()
+
+    print(f"✓ {total} productos exportados a {output} ({fmt})")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta el catálogo scrapeado a Parquet/Arrow")
+    parser.add_argument("--source", choices=["jsonl", "sqlite"], default="jsonl")
+    parser.add_argument("--input", help="Archivo de origen (por defecto el de OUTPUT_FILES)")
+    parser.add_argument("--output", default=OUTPUT_FILES['parquet'])
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=COLUMNAR_CONFIG['chunk_size'])
+    args = parser.parse_args()
+
+    if args.source == "jsonl":
+        products = iter_products_jsonl(args.input or OUTPUT_FILES['jsonl'])
+    else:
+        products = iter_products_sqlite(args.input or OUTPUT_FILES['sqlite'], args.chunk_size)
+    export_columnar(products, args.output, args.format, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,45 @@ CHROME_OPTIONS = {
     ]
 }
 
+# Perfiles de lanzamiento de Chrome: "low_memory" permite más navegadores por nodo
+CHROME_LAUNCH_PROFILE = "default"
+CHROME_LAUNCH_PROFILES = {
+    "default": {
+        "window_size": CHROME_OPTIONS["window_size"],
+        "images": True,
+        "cache_size_mb": None,
+        "args": []
+    },
+    "low_memory": {
+        "window_size": "1280,800",
+        "images": False,          # las URLs de imagen se leen de los atributos del DOM
+        "cache_size_mb": 64,
+        "args": [
+            "--renderer-process-limit=2",
+            "--disable-site-isolation-trials",
+            "--disable-features=IsolateOrigins,site-per-process,Prerender2,BackForwardCache,"
+            "MediaRouter,Translate,OptimizationHints",
+            "--enable-low-end-device-mode",
+            "--aggressive-cache-discard",
+            "--media-cache-size=1",
+            "--mute-audio",
+            "--autoplay-policy=user-gesture-required",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--js-flags=--max-old-space-size=512"
+        ]
+    }
+}
+
+# Backend del navegador: "selenium" (vía chromedriver) o "cdp" (DevTools directo por websocket)
+BROWSER_BACKEND = "selenium"
+CDP_CONFIG = {
+    "chrome_binary": None,          # None = buscar google-chrome/chromium en el PATH
+    "startup_timeout": 20,
+    "command_timeout": 60
+}
+
 # Configuración de tiempos de espera
 TIMEOUTS = {
     "short": 5,
@@ -24,7 +63,9 @@ TIMEOUTS = {
     "page_load": 2,
     "between_requests": (1, 2),
     "between_products": (2, 3),
-    "retry_wait": (2, 4)
+    "retry_wait": (2, 4),
+    "page_load_timeout": 30,   # driver.set_page_load_timeout
+    "script_timeout": 20       # driver.set_script_timeout (scripts asíncronos)
 }
 
 # Configuración de reintentos
@@ -70,6 +111,29 @@ SELECTORS = {
     ]
 }
 
+# Carga de páginas por tipo. El driver arranca con la estrategia de sesión "none" y cada
+# tipo de página decide qué esperar: "normal" (load), "eager" (DOMContentLoaded) o "none",
+# más una compuerta de selectores (cada entrada se cumple si alguno de sus selectores existe).
+# Con "stop", al cumplirse la compuerta se corta el resto de la carga con window.stop().
+PAGE_LOAD_CONFIG = {
+    "session_strategy": "none",
+    "gate_timeout": 12,
+    "page_types": {
+        "default": {"strategy": "normal", "gate": [], "stop": False},
+        "search": {"strategy": "eager", "gate": [SELECTORS["product_items"]], "stop": False},
+        "detail": {
+            "strategy": "none",
+            "gate": [
+                f'{SELECTORS["price_container"]}, {SELECTORS["single_price_container"]}',
+                SELECTORS["attribute_container"],
+                '#description-layout, .description-layout'
+            ],
+            "stop": True
+        },
+        "iframe": {"strategy": "eager", "gate": [], "stop": True}
+    }
+}
+
 # Selectores para CAPTCHA
 CAPTCHA_SELECTORS = [
     "div.nc_wrapper",
@@ -93,13 +157,45 @@ SLIDER_SELECTORS = [
     "[class*='slide']"
 ]
 
+# Indicadores de CAPTCHA resuelto
+CAPTCHA_SUCCESS_SELECTORS = [
+    "div.nc-lang-cnt[data-nc-lang='_yesTEXT']",
+    "span[class*='success']",
+    "div[class*='success']",
+    "div[class*='verified']",
+    "[class*='pass']"
+]
+
+# Marcadores de página de bloqueo (sin slider que resolver)
+CAPTCHA_BLOCK_MARKERS = {
+    "url": ["_____tmd_____/punish", "/punish?", "x5secdata"],
+    "text": ["unusual traffic", "tráfico inusual", "Sorry, we have detected", "访问被拒绝"]
+}
+
 # Archivos de salida
 OUTPUT_FILES = {
     "csv": "alibaba_products_optimized.csv",
     "json": "alibaba_products_optimized.json",
+    "jsonl": "alibaba_products_optimized.jsonl",
+    "sqlite": "alibaba_products.sqlite3",
+    "parquet": "alibaba_products.parquet",
     "images_report": "alibaba_images_report.txt"
 }
 
+# Backends de salida incremental activos
+OUTPUT_BACKENDS = ["csv", "jsonl", "images_report", "sqlite"]
+
+# Configuración del almacén SQLite
+SQLITE_CONFIG = {
+    "batch_size": 20
+}
+
+# Configuración de la exportación columnar (Parquet/Arrow)
+COLUMNAR_CONFIG = {
+    "chunk_size": 500,
+    "compression": "zstd"
+}
+
 # Campos para CSV
 CSV_FIELDS = [
     "img", "description", "price", "company", "product_url", "min_order",
@@ -108,4 +204,216 @@ CSV_FIELDS = [
     "prices", "attributes", "packaging_info", "delivery_lead_times", "images", 
     "original_product_id", "category_id", "alibaba_detail_url", "supplier_name", "supplier_type", 
     "supplier_years", "supplier_location", "supplier_performance"
-] 
\ No newline at end of file
+] 
+# Proyección de campos por consumidor
+# True conserva el campo completo; una lista conserva solo esas subclaves; un dict
+# aplana las subclaves indicadas en campos de primer nivel (subclave -> campo).
+# La extracción calcula únicamente la unión de los consumidores activos.
+LISTING_FIELDS = ["img", "description", "price", "company", "product_url", "min_order",
+                  "original_product_id", "category_id"]
+
+DETAIL_FIELDS = ["alibaba_detail_url", "detailed_description_text", "detailed_description_html",
+                 "prices", "attributes", "packaging_info", "delivery_lead_times", "images",
+                 "supplier_name"]
+
+BASE_FIELD_MASK = {field: True for field in LISTING_FIELDS + DETAIL_FIELDS}
+
+IFRAME_SUBFIELDS = ["text", "reconstructed_html", "images"]
+SUPPLIER_SUBFIELDS = ["name", "type", "years_on_alibaba", "location", "performance"]
+
+FIELD_MASKS = {
+    "csv": {
+        **BASE_FIELD_MASK,
+        "supplier_info": SUPPLIER_SUBFIELDS,
+        "iframe_content": IFRAME_SUBFIELDS
+    },
+    "json": {
+        **BASE_FIELD_MASK,
+        "supplier_info": True,
+        "iframe_content": IFRAME_SUBFIELDS
+    },
+    # Contrato del servicio (ver show_api_structure.py): iframe y proveedor van aplanados
+    "api": {
+        **BASE_FIELD_MASK,
+        "supplier_info": {
+            "name": "supplier_name",
+            "type": "supplier_type",
+            "years_on_alibaba": "supplier_years",
+            "location": "supplier_location",
+            "performance": "supplier_performance"
+        },
+        "iframe_content": {
+            "text": "iframe_content_text",
+            "reconstructed_html": "iframe_content_html",
+            "images": "iframe_content_images"
+        }
+    }
+}
+
+ACTIVE_CONSUMERS = ["csv", "json", "api"]
+
+# Configuración de notificaciones
+# sink: "auto" (escritorio si hay pantalla, si no log), "desktop", "log" o "none"
+# rate_limits: categoría -> (máximo inmediato, ventana en segundos); el resto se
+# agrupa en un resumen al cerrar la ventana.
+NOTIFICATION_CONFIG = {
+    "sink": "auto",
+    "queue_size": 200,
+    "rate_limits": {
+        "product_sent": (2, 60),
+        "product_send_error": (2, 60),
+        "product_completed": (2, 60),
+        "product_complete_error": (2, 60),
+        "captcha": (1, 60)
+    },
+    "digests": {
+        "product_sent": "{count} productos enviados a la API en {window}",
+        "product_send_error": "{count} errores enviando productos en {window}",
+        "product_completed": "{count} productos marcados como completados en {window}",
+        "product_complete_error": "{count} errores marcando productos en {window}",
+        "captcha": "{count} CAPTCHAs detectados en {window}"
+    }
+}
+
+# Selección adaptativa de estrategias de CAPTCHA (muestreo de Thompson)
+CAPTCHA_STRATEGY_CONFIG = {
+    "stats_file": "captcha_strategy_stats.json",
+    "prior_time": 5.0,
+    "refresh_after_failures": 3
+}
+
+# Trayectorias del slider (biblioteca pregenerada con NumPy)
+SLIDER_TRAJECTORY_CONFIG = {
+    "library_size": 24,   # trayectorias pregeneradas por perfil
+    "points": 30,         # movimientos por arrastre
+    "margin": 5,          # px extra para asegurar que llegue al final
+    "profiles": {
+        # duration: segundos del arrastre; ease: exponente de la curva ease-out;
+        # jitter: px de temblor vertical; overshoot: fracción que se pasa del final
+        "direct": {"duration": (0.25, 0.4), "ease": (1.0, 1.3), "jitter": 0.0, "overshoot": (0.0, 0.0)},
+        "human": {"duration": (0.6, 1.1), "ease": (2.0, 3.5), "jitter": 0.6, "overshoot": (0.0, 0.0)},
+        "overshoot": {"duration": (0.35, 0.6), "ease": (2.5, 4.0), "jitter": 0.4, "overshoot": (0.03, 0.08)}
+    }
+}
+
+# Rotación de identidad del driver según la tasa de CAPTCHA
+IDENTITY_CONFIG = {
+    "window": 10,          # últimas cargas de página consideradas
+    "min_pages": 4,        # cargas mínimas antes de evaluar la tasa
+    "warm_at": 0.2,        # tasa a partir de la cual se prepara un driver de repuesto
+    "rotate_at": 0.4,      # tasa que retira el driver actual
+    "spare_timeout": 60,   # segundos máximos esperando al repuesto al rotar
+    "proxies": []          # opcional, formato "host:puerto" o "socks5://host:puerto"
+}
+
+# Perfil de Chrome pre-calentado (copiado para cada driver) y caché de disco compartida.
+# Si la plantilla no existe se usa un perfil vacío como antes; créala con:
+#   python browser_profile.py --warm
+PROFILE_CONFIG = {
+    "template_dir": "chrome_profile_template",
+    "cache_dir": "chrome_shared_cache",   # se reparte en ranuras: una por Chrome vivo
+    "cache_size_mb": 512,
+    "persist_cookies": False,              # copiar las cookies (idioma/sesión) de la plantilla
+    "warm_urls": ["https://www.alibaba.com/"]
+}
+
+# Salud del driver: se recicla entre productos si supera algún umbral
+DRIVER_HEALTH_CONFIG = {
+    "check_every": 5,          # productos entre mediciones
+    "max_rss_mb": 2500,        # memoria de Chrome (navegador + renderers), requiere psutil
+    "max_js_heap_mb": 600,     # JSHeapUsedSize de la pestaña
+    "max_dom_nodes": 150000,
+    "max_latency_ms": 1500,    # ida y vuelta de un comando trivial (media de la ventana)
+    "latency_window": 5,
+    "max_pages": 300,          # reciclar igualmente tras tantas páginas
+    "blank_between_pages": True
+}
+
+# Watchdog: plazo máximo de una operación completa antes de matar el driver colgado
+WATCHDOG_CONFIG = {
+    "detail_deadline": 120,    # segundos por producto detallado
+    "search_deadline": 240,    # segundos por búsqueda
+    "poll_interval": 1.0,
+    "max_requeues": 1,         # veces que una URL vuelve a la cola tras colgar el driver
+    "incidents_file": "driver_incidents.jsonl"
+}
+
+# Limpieza de perfiles chrome_scraper_* y procesos Chrome huérfanos de ejecuciones muertas
+JANITOR_CONFIG = {
+    "interval": 600,        # segundos entre barridos periódicos
+    "grace_period": 3600,   # perfiles sin registro de dueño más nuevos que esto se respetan
+    "temp_dir": None        # None = tempfile.gettempdir()
+}
+
+# Instrumentación de comandos del driver: conteo, latencia y bytes por tipo y por fase
+INSTRUMENTATION_CONFIG = {
+    "enabled": True,
+    "measure_bytes": False,    # tamaño de cada comando (cuerpo HTTP / frame CDP), sin serializar de nuevo
+    "latency_buckets_ms": [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+    "log_per_product": True,     # resumen de comandos por producto en el log (nivel INFO)
+    "summary_file": "driver_commands_summary.json"
+}
+
+# Reporte de rendimiento por ejecución e historial para detectar regresiones
+RUN_REPORT_CONFIG = {
+    "report_file": "run_report.json",
+    "history_file": "run_history.jsonl",
+    "timeline_bucket_s": 60,        # ancho de cada punto de la serie productos/minuto
+    "baseline_runs": 5,             # ejecuciones anteriores que forman la línea base
+    "regression_threshold": 0.15    # caída relativa de throughput que se marca como regresión
+}
+
+# Métricas en formato Prometheus para nodos de larga duración
+# mode: "http" (endpoint /metrics) o "textfile" (colector textfile de node-exporter)
+METRICS_CONFIG = {
+    "enabled": False,
+    "mode": "http",
+    "address": "0.0.0.0",
+    "port": 9108,
+    "textfile_path": "alibaba_scraper.prom",
+    "textfile_interval": 15,   # segundos entre escrituras del archivo
+    "latency_buckets_s": [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+}
+
+# Trazas por producto (spans anidados en formato OTLP/JSON)
+# exporter: "file" (una traza OTLP por línea), "otlp_http" (colector OTLP/HTTP) o "none"
+# Apagado por defecto: el exportador "file" agrega a traces.jsonl sin rotación
+TRACING_CONFIG = {
+    "enabled": False,
+    "exporter": "file",
+    "file": "traces.jsonl",
+    "otlp_endpoint": "http://localhost:4318/v1/traces",
+    "service_name": "alibaba-scraper",
+    "export_timeout": 5
+}
+
+# Perfilado bajo demanda del lado Python (apagado: sin costo). Se puede activar sin tocar
+# el código con variables de entorno (SCRAPER_PROFILE=detail,send SCRAPER_PROFILE_EVERY=10
+# SCRAPER_PROFILE_MODE=deterministic) o con --profile / --profile-every en mainv3.py.
+# mode: "sampling" (muestreo de pilas cada interval_s) o "deterministic" (todas las llamadas)
+PROFILING_CONFIG = {
+    "enabled": False,
+    "mode": "sampling",
+    "phases": [],               # fases a perfilar ("all" = todas)
+    "every_n_products": 0,      # además, uno de cada N productos completo (0 = ninguno)
+    "interval_s": 0.005,
+    "output_dir": "profiles"
+}
+
+# Perfilado del lado Chrome de los scripts de extracción (CDP Profiler + Performance).
+# Opt-in: enabled, la variable SCRAPER_JS_PROFILE=1 o --js-profile en mainv3.py
+JS_PROFILING_CONFIG = {
+    "enabled": False,
+    "sampling_interval_us": 100,
+    "save_cpuprofile": True,    # guarda cada perfil .cpuprofile (se abre en DevTools)
+    "output_dir": "js_profiles"
+}
+
+# Logging estructurado: los registros se encolan y un hilo los escribe (JSON Lines)
+# Variables de entorno: SCRAPER_LOG_LEVEL, SCRAPER_LOG_FORMAT, SCRAPER_LOG_FILE, SCRAPER_WORKER_ID
+LOGGING_CONFIG = {
+    "level": "INFO",
+    "format": "json",      # "json" (una línea JSON por registro) o "text"
+    "file": None,          # None = stdout
+    "worker_id": None      # None = <host>-<pid>
+}
@@ -0,0 +1,110 @@
+"""
+Monitor de salud del driver: memoria de Chrome, heap JS y latencia de comandos
+"""
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+from config import DRIVER_HEALTH_CONFIG
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+MB = 1024 * 1024
+_psutil_warned = False
+
+
+def _warn_missing_psutil():
+    """Avisa una sola vez por proceso, cuando se mide la memoria por primera vez"""
+    global _psutil_warned
+    if not _psutil_warned:
+        _psutil_warned = True
+        print("⚠️  psutil no está instalado; no se medirá la memoria de Chrome. Instala con: pip install psutil")
+
+
+def chrome_rss_mb(driver) -> Optional[float]:
+    """Memoria residente de todos los procesos Chrome que cuelgan del chromedriver"""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        service_process = psutil.Process(driver.service.process.pid)
+        # Con el backend CDP el proceso de servicio es el propio navegador
+        total = 0 if "chromedriver" in service_process.name().lower() else service_process.memory_info().rss
+        for child in service_process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / MB
+    except Exception:
+        return None
+
+
+class DriverHealthMonitor:
+    """Mide periódicamente el driver activo y decide cuándo reciclarlo"""
+
+    def __init__(self, config: Dict[str, Any] = DRIVER_HEALTH_CONFIG,
+                 read_rss: Callable[[Any], Optional[float]] = chrome_rss_mb):
+        self.config = config
+        self.read_rss = read_rss
+        self.latencies = deque(maxlen=config["latency_window"])
+        self.pages = 0
+        self.last_sample = {}
+        self._metrics_enabled = False
+
+    def reset(self):
+        """Nuevo driver: se reinician contadores y mediciones"""
+        self.latencies.clear()
+        self.pages = 0
+        self.last_sample = {}
+        self._metrics_enabled = False
+
+    def sample(self, driver) -> Dict[str, Any]:
+        """Toma una muestra de memoria, heap JS, nodos DOM y latencia"""
+        started = time.perf_counter()
+        driver.execute_script("return 1;")
+        self.latencies.append((time.perf_counter() - started) * 1000)
+
+        metrics = {}
+        try:
+            if not self._metrics_enabled:
+                driver.execute_cdp_cmd("Performance.enable", {})
+                self._metrics_enabled = True
+            result = driver.execute_cdp_cmd("Performance.getMetrics", {})
+            metrics = {m["name"]: m["value"] for m in result.get("metrics", [])}
+        except Exception:
+            pass
+
+        if self.read_rss is chrome_rss_mb and not PSUTIL_AVAILABLE:
+            _warn_missing_psutil()
+        self.last_sample = {
+            "rss_mb": self.read_rss(driver),
+            "js_heap_mb": metrics["JSHeapUsedSize"] / MB if "JSHeapUsedSize" in metrics else None,
+            "dom_nodes": metrics.get("Nodes"),
+            "latency_ms": sum(self.latencies) / len(self.latencies),
+            "pages": self.pages
+        }
+        return self.last_sample
+
+    def check(self, driver) -> Optional[str]:
+        """Devuelve el motivo para reciclar el driver o None si está sano"""
+        self.pages += 1
+        if self.pages >= self.config["max_pages"]:
+            return f"{self.pages} páginas con el mismo driver"
+        if self.pages % self.config["check_every"]:
+            return None
+
+        sample = self.sample(driver)
+        limits = (
+            ("rss_mb", "max_rss_mb", "memoria de Chrome {:.0f} MB"),
+            ("js_heap_mb", "max_js_heap_mb", "heap JS {:.0f} MB"),
+            ("dom_nodes", "max_dom_nodes", "{:.0f} nodos DOM"),
+            ("latency_ms", "max_latency_ms", "latencia {:.0f} ms")
+        )
+        for key, limit, message in limits:
+            value = sample.get(key)
+            if value is not None and value > self.config[limit]:
+                return message.format(value)
+        return None
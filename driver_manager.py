@@ -5,29 +5,169 @@ import tempfile
 import os
 import random
 import shutil
+import threading
 import time
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.wait import WebDriverWait
-from config import CHROME_OPTIONS, TIMEOUTS
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from config import (
+    PAGE_LOAD_CONFIG, BROWSER_BACKEND, CHROME_LAUNCH_PROFILE, CHROME_LAUNCH_PROFILES, TIMEOUTS, IDENTITY_CONFIG, PROFILE_CONFIG, DRIVER_HEALTH_CONFIG, WATCHDOG_CONFIG
+)
+from captcha_handler import CaptchaHandler, CAPTCHA_WATCHER_JS
+from identity_rotation import CaptchaRateTracker, IdentityPool
+from instrumentation import command_recorder
+from run_report import run_report
+from metrics_exporter import INFLIGHT_PAGES
+from scraper_logging import get_logger
+from driver_health import DriverHealthMonitor
+from driver_watchdog import DriverWatchdog, DriverHungError, kill_driver_processes, record_incident
+from process_janitor import register_profile
+from browser_profile import template_available, prepare_worker_profile, acquire_cache_dir, release_cache_dir
+
+logger = get_logger(__name__)
+
+# Sondeo de espera: en una sola llamada devuelve los elementos buscados y el
+# veredicto del observador de CAPTCHA, para cortar la espera si aparece uno.
+WAIT_POLL_JS = """
+const selector = arguments[0];
+const clickable = arguments[1];
+const watch = window.__captchaWatch;
+const captcha = watch && watch.verdict !== 'none' ? watch.verdict : null;
+let elements = Array.from(document.querySelectorAll(selector));
+if (clickable) {
+    elements = elements.filter(el => {
+        const rect = el.getBoundingClientRect();
+        const style = window.getComputedStyle(el);
+        return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && !el.disabled;
+    });
+}
+return {captcha: captcha, elements: elements};
+"""
+
+
+# Compuerta de carga: en una sola llamada asíncrona espera el estado de carga del tipo
+# de página y los módulos que se van a leer; corta la espera si aparece un CAPTCHA.
+# Mientras siga en window la marca puesta antes de navegar, el documento es el anterior
+# y devuelve {stale: true}.
+PAGE_GATE_JS = """
+const marker = arguments[0];
+const readyTarget = arguments[1];
+const groups = arguments[2];
+const timeoutMs = arguments[3];
+const stopWhenReady = arguments[4];
+const done = arguments[arguments.length - 1];
+if (window.__navMarker === marker) {
+    done({stale: true});
+    return;
+}
+const readyOk = () => readyTarget === 'complete' ? document.readyState === 'complete'
+    : readyTarget === 'interactive' ? document.readyState !== 'loading' : true;
+const missing = () => groups.filter(selector => {
+    try { return !document.querySelector(selector); } catch (e) { return false; }
+});
+const captcha = () => {
+    const watch = window.__captchaWatch;
+    return watch && watch.verdict !== 'none' ? watch.verdict : null;
+};
+let finished = false, scheduled = false, observer = null, timer = null;
+const finish = ready => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer);
+    document.removeEventListener('readystatechange', check);
+    const pending = missing();
+    const stopped = ready && stopWhenReady && pending.length === 0 && document.readyState !== 'complete';
+    if (stopped) window.stop();
+    // Recursos servidos por la caché HTTP (los de otro origen sin Timing-Allow-Origin no se pueden medir)
+    const resources = performance.getEntriesByType('resource').filter(r => r.decodedBodySize > 0);
+    done({
+        ready: ready, missing: pending, captcha: captcha(), ready_state: document.readyState,
+        stopped: stopped, elapsed_ms: Math.round(performance.now()),
+        cache: {hits: resources.filter(r => r.transferSize === 0).length, total: resources.length}
+    });
+};
+const check = () => {
+    scheduled = false;
+    if (captcha()) return finish(false);
+    if (readyOk() && missing().length === 0) finish(true);
+};
+check();
+if (!finished) {
+    observer = new MutationObserver(() => {
+        if (!scheduled) { scheduled = true; setTimeout(check, 50); }
+    });
+    observer.observe(document, {childList: true, subtree: true});
+    document.addEventListener('readystatechange', check);
+    timer = setTimeout(() => finish(false), timeoutMs);
+}
+"""
+
+READY_STATES = {"normal": "complete", "eager": "interactive", "none": None}
 
 
 class DriverManager:
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, launch_profile: str = None, backend: str = None):
         self.driver = None
+        self.backend = backend or BROWSER_BACKEND
         self.user_data_dir = None
         self.headless = headless
+        self.launch_profile_name = launch_profile or CHROME_LAUNCH_PROFILE
+        self.launch_profile = CHROME_LAUNCH_PROFILES[self.launch_profile_name]
+        self.identity = None
+        self.captcha_handler = None
+        self.identity_pool = IdentityPool()
+        self.captcha_tracker = CaptchaRateTracker()
+        self.rotations = 0
+        self.recycles = 0
+        self.health = DriverHealthMonitor()
+        self.watchdog = DriverWatchdog(self._on_watchdog_timeout)
+        self.incidents = []
+        self._spare = None
+        self._spare_thread = None
+        self._spare_lock = threading.Lock()
+        self._cache_leases = {}
     
     def setup_driver(self) -> bool:
         """Configuración segura del driver que no afecta otras instancias de Chrome"""
+        identity = self.identity_pool.next_identity()
+        self._activate(*self._launch_driver(identity), identity)
+        return True
+    
+    def _activate(self, driver, user_data_dir: str, identity: dict):
+        """Convierte un driver recién lanzado en el driver activo"""
+        self.driver = driver
+        self.user_data_dir = user_data_dir
+        self.identity = identity
+        self.captcha_handler = CaptchaHandler(driver, refresh=self.refresh_page)
+        self.captcha_tracker.reset()
+        self.health.reset()
+        
+        # Configuración de tiempos de espera
+        self.wait = WebDriverWait(driver, TIMEOUTS["short"])
+        self.long_wait = WebDriverWait(driver, TIMEOUTS["long"])
+    
+    def _launch_driver(self, identity: dict, with_cookies: bool = None):
+        """Lanza un Chrome aislado con la identidad indicada; devuelve (driver, user_data_dir)"""
+        user_data_dir = None
+        if with_cookies is None:
+            with_cookies = PROFILE_CONFIG["persist_cookies"]
         try:
             # Configuración de opciones de Chrome
             chrome_options = Options()
             
-            # Configuración de directorio de usuario único y aislado
-            self.user_data_dir = tempfile.mkdtemp(prefix='chrome_scraper_')
-            chrome_options.add_argument(f"--user-data-dir={self.user_data_dir}")
+            # Directorio de usuario único: copia de la plantilla pre-calentada si existe
+            warm_profile = template_available()
+            if warm_profile:
+                user_data_dir = prepare_worker_profile(with_cookies)
+            else:
+                user_data_dir = tempfile.mkdtemp(prefix='chrome_scraper_')
+            # Registro de dueño: si el proceso muere, el janitor sabrá que el perfil quedó huérfano
+            register_profile(user_data_dir)
+            chrome_options.add_argument(f"--user-data-dir={user_data_dir}")
             
             # Configuración para evitar conflictos con otras instancias
             chrome_options.add_argument("--no-first-run")
@@ -40,65 +180,100 @@ class DriverManager:
                 chrome_options.add_argument("--headless=new")
                 chrome_options.add_argument("--disable-gpu")
             
-            # Configuraciones de privacidad y rendimiento
-            chrome_options.add_argument("--incognito")
-            chrome_options.add_argument("--disable-application-cache")
-            chrome_options.add_argument("--disable-cache")
+            # Configuraciones de privacidad y rendimiento: con plantilla se conserva una
+            # caché de disco compartida (incógnito la descartaría al cerrar)
+            cache_dir = acquire_cache_dir() if warm_profile else None
+            profile = self.launch_profile
+            cache_size_mb = profile["cache_size_mb"]
+            if cache_dir:
+                self._cache_leases[user_data_dir] = cache_dir
+                disk_cache_mb = min(PROFILE_CONFIG['cache_size_mb'], cache_size_mb or PROFILE_CONFIG['cache_size_mb'])
+                chrome_options.add_argument(f"--disk-cache-dir={cache_dir}")
+                chrome_options.add_argument(f"--disk-cache-size={disk_cache_mb * 1024 * 1024}")
+            else:
+                chrome_options.add_argument("--incognito")
+                chrome_options.add_argument("--disable-application-cache")
+                chrome_options.add_argument("--disable-cache")
+                # En incógnito la caché vive en memoria: el tope del perfil también la limita
+                if cache_size_mb:
+                    chrome_options.add_argument(f"--disk-cache-size={cache_size_mb * 1024 * 1024}")
+            if cache_size_mb and not any(arg.startswith("--media-cache-size") for arg in profile["args"]):
+                chrome_options.add_argument(f"--media-cache-size={cache_size_mb * 1024 * 1024}")
             chrome_options.add_argument("--disable-dev-shm-usage")
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-web-security")
             chrome_options.add_argument("--disable-extensions")
-            chrome_options.add_argument(f"--window-size={CHROME_OPTIONS['window_size']}")
+            chrome_options.add_argument(f"--window-size={profile['window_size']}")
+            
+            # Ajustes del perfil de lanzamiento (límites de renderers, funciones desactivadas...)
+            for argument in profile["args"]:
+                chrome_options.add_argument(argument)
             
             # Configuraciones anti-detección
             chrome_options.add_argument("--disable-blink-features=AutomationControlled")
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             
-            # Rotación de user agents
-            user_agent = random.choice(CHROME_OPTIONS["user_agents"])
-            chrome_options.add_argument(f"--user-agent={user_agent}")
+            # Identidad: user agent y proxy opcional
+            chrome_options.add_argument(f"--user-agent={identity['user_agent']}")
+            if identity.get("proxy"):
+                chrome_options.add_argument(f"--proxy-server={identity['proxy']}")
             
             # Configuración de preferencias
             prefs = {
-                "profile.managed_default_content_settings.images": 1,
+                "profile.managed_default_content_settings.images": 1 if profile["images"] else 2,
                 "profile.default_content_setting_values.notifications": 2,
                 "profile.default_content_setting_values.geolocation": 2,
                 "credentials_enable_service": False,
                 "profile.password_manager_enabled": False
             }
             chrome_options.add_experimental_option("prefs", prefs)
+            chrome_options.page_load_strategy = PAGE_LOAD_CONFIG["session_strategy"]
             
-            # Configuración del servicio con manejo de logs
-            service = ChromeService(
-                log_path=os.path.devnull,
-                service_args=['--verbose']
-            )
+            if self.backend == "cdp":
+                # Mismos argumentos, pero Chrome se controla por DevTools sin chromedriver
+                from cdp_backend import launch_cdp_driver
+                driver = launch_cdp_driver(chrome_options.arguments, user_data_dir, prefs)
+            else:
+                # Configuración del servicio con manejo de logs
+                service = ChromeService(
+                    log_path=os.path.devnull,
+                    service_args=['--verbose']
+                )
+                
+                # Creación del driver con manejo de errores
+                try:
+                    driver = webdriver.Chrome(service=service, options=chrome_options)
+                except Exception as e:
+                    # Intento alternativo sin service_args si falla
+                    service = ChromeService(log_path=os.path.devnull)
+                    driver = webdriver.Chrome(service=service, options=chrome_options)
+            register_profile(user_data_dir, driver.service.process.pid)
             
-            # Creación del driver con manejo de errores
-            try:
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            except Exception as e:
-                # Intento alternativo sin service_args si falla
-                service = ChromeService(log_path=os.path.devnull)
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            # Cada comando al navegador se contabiliza por fase (ver instrumentation)
+            command_recorder.attach(driver)
             
-            # Scripts anti-detección mejorados
-            self._apply_stealth_scripts()
+            # La espera de carga la decide cada tipo de página (ver navigate)
+            if self.backend == "cdp":
+                driver.page_load_strategy = PAGE_LOAD_CONFIG["session_strategy"]
             
-            # Configuración de tiempos de espera
-            self.wait = WebDriverWait(self.driver, TIMEOUTS["short"])
-            self.long_wait = WebDriverWait(self.driver, TIMEOUTS["long"])
+            # Plazos duros: ni una carga ni un script asíncrono pueden bloquear indefinidamente
+            driver.set_page_load_timeout(TIMEOUTS["page_load_timeout"])
+            driver.set_script_timeout(TIMEOUTS["script_timeout"])
             
-            return True
+            # Scripts anti-detección mejorados
+            self._apply_stealth_scripts(driver)
+            
+            return driver, user_data_dir
             
         except Exception as e:
-            print(f"Error al configurar el driver: {str(e)}")
-            self._cleanup_temp_dir()
+            logger.error("Error al configurar el driver: %s", e)
+            self._cleanup_temp_dir(user_data_dir)
             raise
     
-    def _apply_stealth_scripts(self):
+    def _apply_stealth_scripts(self, driver=None):
         """Aplica scripts anti-detección al driver"""
+        driver = driver or self.driver
         stealth_js = """
         Object.defineProperty(navigator, 'webdriver', {
             get: () => undefined,
@@ -119,67 +294,289 @@ class DriverManager:
             }
         };
         """
-        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
             "source": stealth_js
         })
+        
+        # Observador de CAPTCHA: marca el veredicto apenas se inserta el overlay
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+            "source": CAPTCHA_WATCHER_JS
+        })
     
-    def reload_page_with_retry(self, url: str, max_retries: int = 3) -> bool:
-        """Recarga la página con reintentos si hay problemas"""
-        from captcha_handler import CaptchaHandler
+    def record_page_load(self, captcha: bool):
+        """Registra una carga de página y prepara un repuesto si la tasa de CAPTCHA sube"""
+        self.captcha_tracker.record(captcha)
+        if self.captcha_tracker.rate >= IDENTITY_CONFIG["warm_at"]:
+            self._start_spare()
+    
+    def maybe_rotate_identity(self) -> bool:
+        """Rota la identidad entre páginas si la tasa de CAPTCHA superó el umbral"""
+        rate = self.captcha_tracker.rate
+        if rate < IDENTITY_CONFIG["rotate_at"]:
+            return False
+        logger.warning("Tasa de CAPTCHA %.0f%% en las últimas %d páginas, rotando identidad",
+                       rate * 100, len(self.captcha_tracker.loads))
+        self.rotate_identity()
+        return True
+    
+    def rotate_identity(self):
+        """Reemplaza el driver actual por uno nuevo (el repuesto si ya está listo)"""
+        spare = self._take_spare()
+        if spare is None:
+            identity = self.identity_pool.next_identity(self.identity)
+            spare = (*self._launch_driver(identity, with_cookies=False), identity)
+        
+        self._replace_driver(spare)
+        self.rotations += 1
+        logger.info("Identidad rotada", extra={"rotation": self.rotations, "proxy": self.identity.get('proxy')})
+    
+    def recycle_driver(self, reason: str):
+        """Reemplaza un driver degradado; usa el repuesto si hay uno, si no la misma identidad"""
+        logger.warning("Reciclando driver: %s", reason)
+        spare = self._take_spare()
+        if spare is None:
+            spare = (*self._launch_driver(self.identity), self.identity)
+        self._replace_driver(spare)
+        self.recycles += 1
+    
+    def _replace_driver(self, spare: tuple):
+        old_driver, old_dir = self.driver, self.user_data_dir
+        self._activate(*spare)
         
-        captcha_handler = CaptchaHandler(self.driver)
+        # El driver retirado se cierra en segundo plano para no frenar el scraping
+        threading.Thread(target=self._retire_driver, args=(old_driver, old_dir), daemon=True).start()
+    
+    @contextmanager
+    def guarded(self, label: str, seconds: float = None):
+        """
+        Ejecuta el bloque bajo el watchdog. Si se pasa del plazo el driver se mata,
+        se reemplaza y se lanza DriverHungError para que el llamador reencole la URL.
+        """
+        seconds = seconds or WATCHDOG_CONFIG["detail_deadline"]
+        self.watchdog.arm(seconds, label)
+        try:
+            yield
+        except Exception:
+            if not self.watchdog.fired:
+                raise
+        finally:
+            fired = self.watchdog.disarm()
+        if fired:
+            self.recycle_driver(f"watchdog ({label})")
+            raise DriverHungError(label, seconds)
+    
+    def _on_watchdog_timeout(self, label: str, seconds: float):
+        """Hilo del watchdog: registra el incidente y mata el driver bloqueado"""
+        incident = {
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "label": label,
+            "deadline_s": seconds,
+            "user_agent": (self.identity or {}).get("user_agent"),
+            "proxy": (self.identity or {}).get("proxy")
+        }
+        self.incidents.append(incident)
+        record_incident(incident)
+        logger.error("Watchdog: '%s' superó %.0fs, matando el driver colgado", label, seconds)
+        kill_driver_processes(self.driver)
+    
+    def between_products(self):
+        """Mantenimiento entre productos: revisa la salud y deja la pestaña en blanco"""
+        if not self.driver:
+            return
+        try:
+            reason = self.health.check(self.driver)
+        except Exception as e:
+            reason = f"driver sin respuesta ({e})"
+        if reason:
+            try:
+                self.recycle_driver(reason)
+            except Exception as e:
+                # Se sigue con el driver actual; el próximo producto vuelve a intentarlo
+                logger.error("No se pudo reciclar el driver: %s", e, extra={"reason": reason})
+            return
         
+        # about:blank libera el renderer de la página anterior antes de la siguiente
+        if DRIVER_HEALTH_CONFIG["blank_between_pages"]:
+            try:
+                self.driver.get("about:blank")
+            except Exception:
+                pass
+    
+    def _start_spare(self):
+        """Lanza en segundo plano un driver de repuesto con una identidad nueva"""
+        with self._spare_lock:
+            if self._spare is not None or (self._spare_thread and self._spare_thread.is_alive()):
+                return
+            identity = self.identity_pool.next_identity(self.identity)
+            self._spare_thread = threading.Thread(target=self._build_spare, args=(identity,), daemon=True)
+            self._spare_thread.start()
+    
+    def _build_spare(self, identity: dict):
+        try:
+            # Identidad nueva: sin las cookies de la sesión desafiada
+            driver, user_data_dir = self._launch_driver(identity, with_cookies=False)
+        except Exception as e:
+            logger.warning("No se pudo preparar el driver de repuesto: %s", e)
+            return
+        with self._spare_lock:
+            self._spare = (driver, user_data_dir, identity)
+    
+    def _take_spare(self):
+        """Devuelve el repuesto (esperando si se está lanzando) o None"""
+        thread = self._spare_thread
+        if thread and thread.is_alive():
+            thread.join(IDENTITY_CONFIG["spare_timeout"])
+        with self._spare_lock:
+            spare, self._spare = self._spare, None
+        return spare
+    
+    def _retire_driver(self, driver, user_data_dir: str):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._cleanup_temp_dir(user_data_dir)
+    
+    def navigate(self, url: str, page_type: str = "default") -> dict:
+        """
+        Navega y espera lo que necesita el tipo de página: su estado de carga y la
+        compuerta de selectores. Devuelve el resultado de la compuerta.
+        """
+        return self._load(lambda: self.driver.get(url), page_type)
+    
+    def refresh_page(self, page_type: str = "default") -> dict:
+        """Recarga la página actual pasando por la misma compuerta que navigate"""
+        return self._load(self.driver.refresh, page_type)
+    
+    def _mark_document(self) -> str:
+        """
+        Marca el documento actual antes de navegar. Con la estrategia "none" get() no
+        espera la navegación; la marca distingue el documento viejo del nuevo sin
+        comparar el reloj de Chrome con el de Python.
+        """
+        marker = os.urandom(8).hex()
+        try:
+            self.driver.execute_script("window.__navMarker = arguments[0];", marker)
+        except WebDriverException:
+            # Sin documento que marcar: cualquier documento que aparezca es el nuevo
+            pass
+        return marker
+    
+    def _load(self, start_navigation, page_type: str) -> dict:
+        page_types = PAGE_LOAD_CONFIG["page_types"]
+        config = page_types.get(page_type, page_types["default"])
+        marker = self._mark_document()
+        INFLIGHT_PAGES.inc()
+        try:
+            try:
+                start_navigation()
+            except TimeoutException:
+                # Se alcanzó page_load_timeout: detener la carga y trabajar con lo que hay
+                logger.info("Carga detenida tras %ss", TIMEOUTS['page_load_timeout'])
+                self.driver.execute_script("window.stop();")
+            result = self.wait_for_page(config, marker)
+        finally:
+            INFLIGHT_PAGES.dec()
+        run_report.record_cache(page_type, result.get("cache"))
+        return result
+    
+    def wait_for_page(self, config: dict, marker: str) -> dict:
+        """Ejecuta la compuerta de carga hasta que se cumple o vence gate_timeout"""
+        deadline = time.time() + config.get("gate_timeout", PAGE_LOAD_CONFIG["gate_timeout"])
+        ready_state = READY_STATES[config["strategy"]]
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return {"ready": False, "missing": config["gate"], "captcha": None}
+            try:
+                result = self.driver.execute_async_script(
+                    PAGE_GATE_JS, marker, ready_state, config["gate"], int(remaining * 1000), config["stop"]
+                )
+            except WebDriverException:
+                # El documento se reemplazó mientras esperábamos: volver a armar la compuerta
+                time.sleep(0.1)
+                continue
+            if result and not result.get("stale"):
+                return result
+            time.sleep(0.05)
+    
+    def active_browsers(self) -> int:
+        """Navegadores vivos de este manager: el activo y el de reserva"""
+        return (self.driver is not None) + (self._spare is not None)
+    
+    def reload_page_with_retry(self, url: str, max_retries: int = 3, page_type: str = "default") -> bool:
+        """Recarga la página con reintentos si hay problemas"""
         for attempt in range(max_retries):
             try:
-                print(f"Cargando página... Intento {attempt + 1}/{max_retries}")
-                self.driver.get(url)
-                time.sleep(TIMEOUTS["page_load"])
+                # Entre cargas (nunca a mitad de página) se puede cambiar de identidad
+                self.maybe_rotate_identity()
+                captcha_handler = self.captcha_handler
+                logger.debug("Cargando página, intento %d/%d", attempt + 1, max_retries, extra={"page_type": page_type})
+                page = self.navigate(url, page_type)
+                if not page.get("ready") and not page.get("captcha"):
+                    logger.info("Módulos aún no presentes", extra={"missing": page.get('missing')})
                 
                 # Verificar si la página cargó correctamente
                 if self.driver.current_url and not "error" in self.driver.current_url.lower():
                     # Verificar CAPTCHA inmediatamente
                     captcha_solved = captcha_handler.handle_slider_captcha_advanced()
+                    self.record_page_load(captcha_handler.last_detected)
                     if captcha_solved or not captcha_handler.is_captcha_present():
-                        print("Página cargada correctamente")
+                        logger.debug("Página cargada", extra={"elapsed_ms": page.get("elapsed_ms")})
                         return True
+                    run_report.retry("page_load", "captcha")
+                else:
+                    run_report.retry("page_load", "error_page")
                 
-                print(f"Página no cargó correctamente, reintentando...")
+                logger.warning("Página no cargó correctamente, reintentando", extra={"attempt": attempt + 1})
                 time.sleep(random.uniform(*TIMEOUTS["retry_wait"]))
                 
             except Exception as e:
-                print(f"Error en intento {attempt + 1}: {e}")
+                logger.warning("Error en intento %d: %s", attempt + 1, e, extra={"error_type": type(e).__name__})
+                run_report.retry("page_load", type(e).__name__)
                 time.sleep(random.uniform(*TIMEOUTS["retry_wait"]))
         
-        print(f"No se pudo cargar la página después de {max_retries} intentos")
+        logger.error("No se pudo cargar la página después de %d intentos", max_retries, extra={"url": url})
+        run_report.failure("page_load", page_type)
         return False
     
+    def _wait_for_selector(self, selector: str, timeout: float, clickable: bool = False) -> list:
+        """
+        Espera elementos del selector. Si el observador marca un CAPTCHA la espera
+        se corta de inmediato, se intenta resolver y se continúa con el tiempo restante.
+        """
+        def poll(driver):
+            result = driver.execute_script(WAIT_POLL_JS, selector, clickable)
+            if result and (result.get('captcha') or result.get('elements')):
+                return result
+            return False
+        
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return []
+            try:
+                result = WebDriverWait(self.driver, remaining, poll_frequency=0.25).until(poll)
+            except TimeoutException:
+                return []
+            
+            if result.get('elements'):
+                return result['elements']
+            
+            logger.info("CAPTCHA detectado durante la espera de '%s'", selector, extra={"verdict": result['captcha']})
+            self.captcha_tracker.mark_captcha()
+            if not self.captcha_handler.handle_slider_captcha_advanced():
+                return []
+    
     def wait_for_element_clickable(self, selector: str, timeout: int = 5):
         """Espera dinámica para que un elemento sea clickeable"""
-        from selenium.webdriver.support import expected_conditions as EC
-        from selenium.webdriver.common.by import By
-        from selenium.common.exceptions import TimeoutException
-        
-        try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-            )
-            return element
-        except TimeoutException:
-            return None
+        elements = self._wait_for_selector(selector, timeout, clickable=True)
+        return elements[0] if elements else None
     
     def wait_for_elements_presence(self, selector: str, timeout: int = 5):
         """Espera dinámica para la presencia de elementos"""
-        from selenium.webdriver.support import expected_conditions as EC
-        from selenium.webdriver.common.by import By
-        from selenium.common.exceptions import TimeoutException
-        
-        try:
-            elements = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, selector))
-            )
-            return elements
-        except TimeoutException:
-            return []
+        return self._wait_for_selector(selector, timeout)
     
     def smart_scroll(self):
         """Scroll inteligente que detecta cuando ya no hay más contenido"""
@@ -203,16 +600,21 @@ class DriverManager:
         
         self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
     
-    def _cleanup_temp_dir(self):
+    def _cleanup_temp_dir(self, user_data_dir: str = None):
         """Limpia el directorio temporal si falla"""
-        if self.user_data_dir:
+        user_data_dir = user_data_dir or self.user_data_dir
+        release_cache_dir(self._cache_leases.pop(user_data_dir, None))
+        if user_data_dir:
             try:
-                shutil.rmtree(self.user_data_dir, ignore_errors=True)
+                shutil.rmtree(user_data_dir, ignore_errors=True)
             except:
                 pass
     
     def close(self):
         """Cierra el navegador y limpia recursos"""
+        spare = self._take_spare()
+        if spare:
+            self._retire_driver(spare[0], spare[1])
         if self.driver:
             self.driver.quit()
         self._cleanup_temp_dir() 
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Watchdog de operaciones del driver: mata un chromedriver colgado pasado su plazo
+"""
+import json
+import threading
+import time
+from typing import Any, Callable, Dict
+from config import WATCHDOG_CONFIG
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+class DriverHungError(Exception):
+    """La operación superó su plazo y el driver fue reemplazado"""
+
+    def __init__(self, label: str, deadline: float):
+        super().__init__(f"'{label}' superó el plazo de {deadline:.0f}s")
+        self.label = label
+        self.deadline = deadline
+
+
+def kill_driver_processes(driver):
+    """Mata el chromedriver y sus procesos Chrome hijos sin pasar por WebDriver"""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if not process:
+        return
+    if PSUTIL_AVAILABLE:
+        try:
+            parent = psutil.Process(process.pid)
+            for child in parent.children(recursive=True):
+                try:
+                    child.kill()
+                except psutil.NoSuchProcess:
+                    pass
+        except psutil.NoSuchProcess:
+            pass
+    try:
+        process.kill()
+    except Exception:
+        pass
+
+
+def record_incident(incident: Dict[str, Any], filename: str = WATCHDOG_CONFIG["incidents_file"]):
+    """Agrega el incidente al registro JSON Lines"""
+    try:
+        with open(filename, "a", encoding="utf-8") as f:
+            f.write(json.dumps(incident, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"⚠️ No se pudo registrar el incidente: {e}")
+
+
+class DriverWatchdog:
+    """Hilo vigilante: una operación armada a la vez (el scraping es de un solo hilo)"""
+
+    def __init__(self, on_timeout: Callable[[str, float], None],
+                 poll_interval: float = WATCHDOG_CONFIG["poll_interval"]):
+        self.on_timeout = on_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._deadline = None
+        self._seconds = 0.0
+        self._label = None
+        self.fired = False
+        self._thread = None
+
+    def arm(self, seconds: float, label: str):
+        with self._lock:
+            self._deadline = time.monotonic() + seconds
+            self._seconds = seconds
+            self._label = label
+            self.fired = False
+        if not self._thread or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def disarm(self) -> bool:
+        """Desarma el plazo; devuelve True si llegó a dispararse"""
+        with self._lock:
+            self._deadline = None
+            return self.fired
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                expired = self._deadline is not None and not self.fired and time.monotonic() > self._deadline
+                if expired:
+                    self.fired = True
+                    label, seconds = self._label, self._seconds
+            if expired:
+                try:
+                    self.on_timeout(label, seconds)
+                except Exception as e:
+                    print(f"⚠️ Error del watchdog: {e}")
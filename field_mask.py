@@ -0,0 +1,67 @@
+"""
+Proyección de campos del producto según el consumidor (CSV, JSON, API)
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+from config import FIELD_MASKS, ACTIVE_CONSUMERS
+
+# Subcampos conocidos de los campos anidados que producen los scripts de extracción
+NESTED_FIELDS = {
+    "iframe_content": ["html", "text", "images", "reconstructed_html"],
+    "supplier_info": ["name", "type", "years_on_alibaba", "location", "performance"]
+}
+
+
+def project(product: Dict[str, Any], consumer: str) -> Dict[str, Any]:
+    """Devuelve una copia del producto con solo los campos que pide el consumidor"""
+    mask = FIELD_MASKS[consumer]
+    projected = {}
+    for field, spec in mask.items():
+        if field not in product:
+            continue
+        value = product[field]
+        if isinstance(spec, dict):
+            # Se aplana: cada subclave pasa a su campo de primer nivel, sin pisar
+            # un campo que el producto ya trae (p. ej. supplier_name)
+            if isinstance(value, dict):
+                for key, target in spec.items():
+                    if key in value:
+                        projected.setdefault(target, value[key])
+        elif spec is True or not isinstance(value, dict):
+            projected[field] = value
+        else:
+            projected[field] = {key: value[key] for key in spec if key in value}
+    return projected
+
+
+@lru_cache(maxsize=None)
+def _merged_mask(consumers: tuple) -> Dict[str, Any]:
+    merged = {}
+    for consumer in consumers:
+        for field, spec in FIELD_MASKS[consumer].items():
+            current = merged.get(field)
+            if current is True or spec is True:
+                merged[field] = True
+            else:
+                merged[field] = sorted(set(current or []) | set(spec))
+    return merged
+
+
+def requested_fields(consumers: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Unión de las máscaras de los consumidores (por defecto, los activos)"""
+    return _merged_mask(tuple(consumers or ACTIVE_CONSUMERS))
+
+
+def wanted_fields(consumers: Optional[Iterable[str]] = None) -> List[str]:
+    """Campos de primer nivel que debe calcular la extracción"""
+    return list(requested_fields(consumers).keys())
+
+
+def wanted_subfields(field: str, consumers: Optional[Iterable[str]] = None) -> List[str]:
+    """Subcampos de un campo anidado que debe calcular la extracción"""
+    spec = requested_fields(consumers).get(field)
+    if spec is None:
+        return []
+    if spec is True:
+        return list(NESTED_FIELDS.get(field, []))
+    return list(spec)
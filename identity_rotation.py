@@ -0,0 +1,62 @@
+"""
+Seguimiento de la tasa de CAPTCHA por driver y selección de nuevas identidades
+"""
+import random
+from collections import deque
+from typing import Any, Dict, Optional
+from config import CHROME_OPTIONS, IDENTITY_CONFIG
+
+
+class CaptchaRateTracker:
+    """Ventana deslizante de cargas de página: True si la carga trajo CAPTCHA"""
+
+    def __init__(self, window: int = IDENTITY_CONFIG["window"], min_pages: int = IDENTITY_CONFIG["min_pages"]):
+        self.min_pages = min_pages
+        self.loads = deque(maxlen=window)
+        self.total_pages = 0
+        self.total_captchas = 0
+
+    def record(self, captcha: bool):
+        self.loads.append(bool(captcha))
+        self.total_pages += 1
+        self.total_captchas += int(bool(captcha))
+
+    def mark_captcha(self):
+        """Marca la última carga como desafiada (CAPTCHA aparecido después de cargar)"""
+        if self.loads and not self.loads[-1]:
+            self.loads[-1] = True
+            self.total_captchas += 1
+        elif not self.loads:
+            self.record(True)
+
+    @property
+    def rate(self) -> float:
+        if len(self.loads) < self.min_pages:
+            return 0.0
+        return sum(self.loads) / len(self.loads)
+
+    def reset(self):
+        self.loads.clear()
+        self.total_pages = 0
+        self.total_captchas = 0
+
+
+class IdentityPool:
+    """Combina user agents y proxies; nunca repite la identidad actual si hay alternativa"""
+
+    def __init__(self, user_agents=None, proxies=None):
+        self.user_agents = list(user_agents or CHROME_OPTIONS["user_agents"])
+        self.proxies = list(proxies if proxies is not None else IDENTITY_CONFIG["proxies"])
+        self.proxy_index = random.randrange(len(self.proxies)) if self.proxies else 0
+
+    def next_identity(self, current: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        user_agents = [ua for ua in self.user_agents if not current or ua != current.get("user_agent")]
+        proxy = None
+        if self.proxies:
+            # Los proxies se recorren en orden para repartir la carga
+            proxy = self.proxies[self.proxy_index % len(self.proxies)]
+            self.proxy_index += 1
+        return {
+            "user_agent": random.choice(user_agents or self.user_agents),
+            "proxy": proxy
+        }
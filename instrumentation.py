@@ -0,0 +1,336 @@
+"""
+Instrumentación de las idas y vueltas al navegador: cada comando del driver se cuenta
+por tipo y por la fase del scraper que lo originó (search, detail, supplier, iframe,
+captcha, images), con histograma de latencias y bytes transferidos.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+from config import INSTRUMENTATION_CONFIG
+
+# Fases abiertas del contexto actual (la más interna al final)
+_phase_stack: ContextVar[tuple] = ContextVar("phase_stack", default=())
+_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+# Logger del scraper (scraper_logging configura sus handlers; importarlo aquí sería circular)
+logger = logging.getLogger("scraper.instrumentation")
+
+UNSCOPED = "other"
+
+
+def add_phase_listener(listener: Callable[[str, Dict[str, Any]], None]):
+    """Suscribe un callback listener(event, record) a la apertura ("start") y cierre ("end") de fases"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_phase_listener(listener: Callable[[str, Dict[str, Any]], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def current_phase() -> str:
+    stack = _phase_stack.get()
+    return stack[-1] if stack else UNSCOPED
+
+
+def _notify(event: str, record: Dict[str, Any]):
+    for listener in list(_listeners):
+        try:
+            listener(event, record)
+        except Exception as e:
+            print(f"⚠️ Error en el suscriptor de fases: {e}")
+
+
+@contextmanager
+def phase(name: str, /, **attrs):
+    """
+    Marca una fase del scraper. Se puede anidar (los comandos cuentan para la más
+    interna) y usar como decorador. El registro que se entrega a los suscriptores
+    es un dict; quien abre la fase puede completar record["attrs"] antes de cerrarla.
+    """
+    stack = _phase_stack.get()
+    record = {
+        "name": name,
+        "attrs": attrs,
+        "parent": stack[-1] if stack else None,
+        "started_at": time.time(),
+        "duration": None,
+        "error": None
+    }
+    token = _phase_stack.set(stack + (name,))
+    _notify("start", record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["duration"] = time.perf_counter() - started
+        _phase_stack.reset(token)
+        _notify("end", record)
+
+
+class CommandStats:
+    """Acumulado de un (fase, comando): conteo, errores, latencias y bytes"""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets", "bytes_out", "bytes_in")
+
+    def __init__(self, bucket_count: int):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (bucket_count + 1)  # el último es el desborde
+        self.bytes_out = 0
+        self.bytes_in = 0
+
+    def add(self, bucket: int, ms: float, bytes_out: int, bytes_in: int, error: bool):
+        self.count += 1
+        self.errors += error
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bucket] += 1
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+
+    def merge(self, other: "CommandStats"):
+        self.count += other.count
+        self.errors += other.errors
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.bytes_out += other.bytes_out
+        self.bytes_in += other.bytes_in
+
+
+class CommandRecorder:
+    """Envuelve el ejecutor de comandos del driver y acumula estadísticas por fase"""
+
+    def __init__(self, config: Dict[str, Any] = INSTRUMENTATION_CONFIG):
+        self.config = config
+        self.bucket_bounds = list(config["latency_buckets_ms"])
+        self.run: Dict[tuple, CommandStats] = {}
+        self.product: Dict[tuple, CommandStats] = {}
+        self.products: List[Dict[str, Any]] = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def attach(self, driver):
+        """Instrumenta un driver Selenium (command_executor) o CDP (connection.send)"""
+        if not self.config["enabled"] or getattr(driver, "_command_recorder", None) is self:
+            return driver
+        if hasattr(driver, "connection"):
+            self._wrap_cdp(driver.connection)
+        else:
+            self._wrap_executor(driver.command_executor)
+        driver._command_recorder = self
+        return driver
+
+    def _wrap_executor(self, executor):
+        original = executor.execute
+        # Tamaños del comando en curso en este hilo, leídos del transporte HTTP
+        sizes = threading.local()
+        if self.config["measure_bytes"]:
+            self._wrap_transport(executor, sizes)
+
+        def execute(command, params=None):
+            phase_name = current_phase()
+            sizes.bytes_out = sizes.bytes_in = 0
+            started = time.perf_counter()
+            response, error = None, False
+            try:
+                response = original(command, params)
+                return response
+            except Exception:
+                error = True
+                raise
+            finally:
+                ms = (time.perf_counter() - started) * 1000
+                self.record(phase_name, command, ms, sizes.bytes_out, sizes.bytes_in, error)
+
+        executor.execute = execute
+
+    @staticmethod
+    def _wrap_transport(executor, sizes):
+        """Mide el cuerpo ya serializado y la respuesta cruda sin volver a serializar"""
+        original_request = getattr(executor, "_request", None)
+        if original_request is not None:
+            def request(method, url, body=None):
+                sizes.bytes_out += len(body or "")
+                return original_request(method, url, body)
+
+            executor._request = request
+
+        # Solo con keep_alive hay un pool persistente que envolver
+        connection = getattr(executor, "_conn", None)
+        if connection is not None:
+            original_send = connection.request
+
+            def send(*args, **kwargs):
+                response = original_send(*args, **kwargs)
+                length = response.headers.get("Content-Length")
+                sizes.bytes_in += int(length) if length else len(response.data or b"")
+                return response
+
+            connection.request = send
+
+    def _wrap_cdp(self, connection):
+        # call() y pipeline() pasan por send(): se mide cada comando aunque vaya en lote.
+        # CDPConnection deja en el future el largo del mensaje y del frame de respuesta.
+        original = connection.send
+        measure = self.config["measure_bytes"]
+
+        def send(method, params=None):
+            phase_name = current_phase()
+            started = time.perf_counter()
+
+            def done(future):
+                error = future.exception() is not None
+                bytes_out = getattr(future, "bytes_out", 0) if measure else 0
+                bytes_in = getattr(future, "bytes_in", 0) if measure else 0
+                self.record(phase_name, method, (time.perf_counter() - started) * 1000, bytes_out, bytes_in, error)
+
+            future = original(method, params)
+            future.add_done_callback(done)
+            return future
+
+        connection.send = send
+
+    def record(self, phase_name: str, command: str, ms: float, bytes_out: int = 0, bytes_in: int = 0,
+               error: bool = False):
+        bucket = bisect_left(self.bucket_bounds, ms)
+        key = (phase_name, command)
+        with self._lock:
+            for stats in (self.run, self.product):
+                entry = stats.get(key)
+                if entry is None:
+                    entry = stats[key] = CommandStats(len(self.bucket_bounds))
+                entry.add(bucket, ms, bytes_out, bytes_in, error)
+
+    def on_phase(self, event: str, record: Dict[str, Any]):
+        """Suscriptor de fases: delimita el acumulado por producto"""
+        if record["name"] != "product":
+            return
+        with self._lock:
+            if event == "start":
+                self.product = {}
+                return
+            product_stats, self.product = self.product, {}
+        summary = self.summarize(product_stats)
+        summary["url"] = record["attrs"].get("url")
+        summary["duration_s"] = round(record["duration"], 3)
+        self.products.append({k: summary[k] for k in ("url", "duration_s", "total", "by_phase")})
+        if self.config["log_per_product"]:
+            self.log_product_summary(summary)
+
+    def percentile(self, buckets: List[int], q: float) -> Optional[float]:
+        """Percentil aproximado: límite superior del bucket que lo contiene"""
+        total = sum(buckets)
+        if not total:
+            return None
+        target = q * total
+        seen = 0
+        for i, count in enumerate(buckets):
+            seen += count
+            if seen >= target:
+                return self.bucket_bounds[i] if i < len(self.bucket_bounds) else float("inf")
+        return float("inf")
+
+    def _describe(self, stats: CommandStats) -> Dict[str, Any]:
+        return {
+            "count": stats.count,
+            "errors": stats.errors,
+            "total_ms": round(stats.total_ms, 1),
+            "avg_ms": round(stats.total_ms / stats.count, 2) if stats.count else 0,
+            "max_ms": round(stats.max_ms, 1),
+            "p50_ms": self.percentile(stats.buckets, 0.5),
+            "p95_ms": self.percentile(stats.buckets, 0.95),
+            "bytes_out": stats.bytes_out,
+            "bytes_in": stats.bytes_in,
+            "histogram": stats.buckets
+        }
+
+    def summarize(self, stats: Dict[tuple, CommandStats]) -> Dict[str, Any]:
+        """Agrega un acumulado por total, por fase, por comando y por (fase, comando)"""
+        bucket_count = len(self.bucket_bounds)
+        total = CommandStats(bucket_count)
+        by_phase, by_command = {}, {}
+        for (phase_name, command), entry in stats.items():
+            total.merge(entry)
+            by_phase.setdefault(phase_name, CommandStats(bucket_count)).merge(entry)
+            by_command.setdefault(command, CommandStats(bucket_count)).merge(entry)
+        return {
+            "total": self._describe(total),
+            "by_phase": {name: self._describe(s) for name, s in by_phase.items()},
+            "by_command": {name: self._describe(s) for name, s in by_command.items()},
+            "by_phase_command": {f"{p}/{c}": self._describe(s) for (p, c), s in stats.items()}
+        }
+
+    def run_summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.run)
+        summary = self.summarize(stats)
+        summary["latency_buckets_ms"] = self.bucket_bounds
+        summary["started_at"] = self.started_at
+        summary["elapsed_s"] = round(time.time() - self.started_at, 1)
+        summary["products"] = self.products
+        return summary
+
+    def log_product_summary(self, summary: Dict[str, Any]):
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        total = summary["total"]
+        logger.info("Comandos del driver en este producto: %d", total["count"], extra={
+            "url": summary["url"],
+            "commands": total["count"],
+            "commands_ms": total["total_ms"],
+            "commands_kb": round((total["bytes_out"] + total["bytes_in"]) / 1024, 1),
+            "commands_by_phase": {name: s["count"] for name, s in summary["by_phase"].items()}
+        })
+
+    def print_run_summary(self, summary: Dict[str, Any], top: int = 10):
+        total = summary["total"]
+        print(f"\n=== COMANDOS DEL DRIVER ===")
+        line = f"Total: {total['count']} comandos, {total['total_ms'] / 1000:.1f}s"
+        if self.config["measure_bytes"]:
+            line += f", {total['bytes_out'] / 1024:.0f} KB enviados, {total['bytes_in'] / 1024:.0f} KB recibidos"
+        print(line)
+        if summary["products"]:
+            per_product = sum(p["total"]["count"] for p in summary["products"]) / len(summary["products"])
+            print(f"Promedio por producto: {per_product:.1f} comandos")
+        print("Por fase:")
+        for name, s in sorted(summary["by_phase"].items(), key=lambda item: -item[1]["total_ms"]):
+            print(f"  {name:<10} {s['count']:>6} comandos  {s['total_ms'] / 1000:>7.1f}s  "
+                  f"p50 {s['p50_ms']}ms  p95 {s['p95_ms']}ms")
+        print("Puntos calientes (fase/comando):")
+        hot = sorted(summary["by_phase_command"].items(), key=lambda item: -item[1]["total_ms"])[:top]
+        for name, s in hot:
+            print(f"  {name:<35} {s['count']:>6} x {s['avg_ms']:>7.1f}ms = {s['total_ms'] / 1000:.1f}s")
+
+    def report(self, filename: Optional[str] = None) -> Dict[str, Any]:
+        """Imprime el resumen de la ejecución y lo guarda en JSON"""
+        summary = self.run_summary()
+        if not summary["total"]["count"]:
+            return summary
+        self.print_run_summary(summary)
+        filename = filename or self.config["summary_file"]
+        if filename:
+            try:
+                with open(filename, "w", encoding="utf-8") as f:
+                    json.dump(summary, f, ensure_ascii=False, indent=2)
+                print(f"Resumen de comandos guardado en {filename}")
+            except OSError as e:
+                print(f"⚠️ No se pudo guardar el resumen de comandos: {e}")
+        return summary
+
+
+# Instancia global
+command_recorder = CommandRecorder()
+add_phase_listener(command_recorder.on_phase)
@@ -0,0 +1,226 @@
+"""
+Perfilado del lado Chrome de los scripts de extracción. Con el modo activo, cada script
+se ejecuta entre Profiler.start/stop y dos lecturas de Performance.getMetrics, con las
+APIs del DOM instrumentadas para contar consultas. Por script y página se reporta el
+tiempo propio del script, el del recolector de basura, los layouts/recálculos de estilo
+y las llamadas al DOM. Apagado, execute() es un execute_script normal.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+from config import JS_PROFILING_CONFIG
+
+# Cuenta llamadas a las APIs del DOM (métodos y getters costosos) mientras corre el
+# script y las restaura al terminar. %s es el cuerpo original del script.
+DOM_COUNTER_WRAPPER_JS = """
+const __domCalls = {};
+const __restore = [];
+const __count = name => { __domCalls[name] = (__domCalls[name] || 0) + 1; };
+const __wrapMethod = (owner, name) => {
+    const original = owner && owner[name];
+    if (typeof original !== 'function') return;
+    owner[name] = function() { __count(name); return original.apply(this, arguments); };
+    __restore.push(() => { owner[name] = original; });
+};
+const __wrapGetter = (proto, name) => {
+    const descriptor = Object.getOwnPropertyDescriptor(proto, name);
+    if (!descriptor || !descriptor.get) return;
+    Object.defineProperty(proto, name, Object.assign({}, descriptor, {
+        get() { __count(name); return descriptor.get.call(this); }
+    }));
+    __restore.push(() => Object.defineProperty(proto, name, descriptor));
+};
+[Document.prototype, Element.prototype, DocumentFragment.prototype].forEach(proto => {
+    ['querySelector', 'querySelectorAll', 'getElementsByTagName', 'getElementsByClassName'].forEach(
+        name => { if (Object.prototype.hasOwnProperty.call(proto, name)) __wrapMethod(proto, name); });
+});
+__wrapMethod(Document.prototype, 'getElementById');
+__wrapMethod(Node.prototype, 'cloneNode');
+__wrapMethod(Element.prototype, 'getBoundingClientRect');
+__wrapMethod(window, 'getComputedStyle');
+__wrapGetter(Node.prototype, 'textContent');
+__wrapGetter(HTMLElement.prototype, 'innerText');
+__wrapGetter(Element.prototype, 'innerHTML');
+__wrapGetter(Element.prototype, 'outerHTML');
+__wrapGetter(HTMLElement.prototype, 'offsetHeight');
+try {
+    const __result = (function() {
+%s
+    }).apply(this, arguments);
+    return {result: __result, dom_calls: __domCalls};
+} finally {
+    __restore.reverse().forEach(restore => restore());
+}
+"""
+
+PERFORMANCE_METRICS = [
+    "ScriptDuration", "TaskDuration", "LayoutCount", "LayoutDuration",
+    "RecalcStyleCount", "RecalcStyleDuration", "JSHeapUsedSize", "Nodes"
+]
+
+_SPECIAL_NODES = {"(root)", "(program)", "(idle)", "(garbage collector)"}
+
+
+def _metrics(driver) -> Dict[str, float]:
+    result = driver.execute_cdp_cmd("Performance.getMetrics", {})
+    return {m["name"]: m["value"] for m in result.get("metrics", []) if m["name"] in PERFORMANCE_METRICS}
+
+
+def analyze_cpu_profile(profile: Dict[str, Any], top: int = 5) -> Dict[str, Any]:
+    """
+    Tiempo propio por nodo a partir de samples/timeDeltas. Los scripts inyectados no
+    tienen URL; lo que tiene URL es JavaScript de la propia página que corrió a la vez.
+    """
+    nodes = {node["id"]: node["callFrame"] for node in profile.get("nodes", [])}
+    self_us: Dict[int, float] = {}
+    for node_id, delta in zip(profile.get("samples", []), profile.get("timeDeltas", [])):
+        self_us[node_id] = self_us.get(node_id, 0) + delta
+
+    script_us, page_us, gc_us = 0.0, 0.0, 0.0
+    functions: Dict[str, float] = {}
+    for node_id, micros in self_us.items():
+        frame = nodes.get(node_id, {})
+        name = frame.get("functionName") or "(anónima)"
+        if name == "(garbage collector)":
+            gc_us += micros
+        elif name in _SPECIAL_NODES:
+            continue
+        elif frame.get("url"):
+            page_us += micros
+        else:
+            script_us += micros
+            label = f"{name}:{frame.get('lineNumber', 0) + 1}"
+            functions[label] = functions.get(label, 0) + micros
+    hottest = sorted(functions.items(), key=lambda item: -item[1])[:top]
+    return {
+        "script_self_ms": round(script_us / 1000, 2),
+        "gc_ms": round(gc_us / 1000, 2),
+        "page_js_ms": round(page_us / 1000, 2),
+        "top_functions": [{"function": name, "self_ms": round(micros / 1000, 2)} for name, micros in hottest]
+    }
+
+
+class JSProfiler:
+    """Ejecuta scripts de extracción con perfilado CDP cuando el modo está activo"""
+
+    def __init__(self, config: Dict[str, Any] = JS_PROFILING_CONFIG):
+        self.config = config
+        self.enabled = config["enabled"]
+        self.output_dir = os.path.join(config["output_dir"], time.strftime("%Y%m%d-%H%M%S"))
+        self.records: List[Dict[str, Any]] = []
+
+    def execute(self, driver, label: str, script: str, *args):
+        if not self.enabled:
+            return driver.execute_script(script, *args)
+        try:
+            self._prepare(driver)
+            before = _metrics(driver)
+            driver.execute_cdp_cmd("Profiler.start", {})
+        except Exception as e:
+            print(f"⚠️ Perfilado JS no disponible ({e}); se ejecuta sin perfilar")
+            return driver.execute_script(script, *args)
+
+        started = time.perf_counter()
+        try:
+            wrapped = driver.execute_script(DOM_COUNTER_WRAPPER_JS % script, *args)
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000
+            profile = driver.execute_cdp_cmd("Profiler.stop", {}).get("profile", {})
+        after = _metrics(driver)
+
+        self._record(driver, label, wall_ms, profile, before, after, (wrapped or {}).get("dom_calls", {}))
+        return (wrapped or {}).get("result")
+
+    def _prepare(self, driver):
+        """Habilita los dominios una vez por driver (cambian al rotar o reciclar)"""
+        if getattr(driver, "_js_profiling_ready", False):
+            return
+        driver.execute_cdp_cmd("Performance.enable", {"timeDomain": "timeTicks"})
+        driver.execute_cdp_cmd("Profiler.enable", {})
+        driver.execute_cdp_cmd("Profiler.setSamplingInterval", {"interval": self.config["sampling_interval_us"]})
+        driver._js_profiling_ready = True
+
+    def _record(self, driver, label: str, wall_ms: float, profile: Dict[str, Any],
+                before: Dict[str, float], after: Dict[str, float], dom_calls: Dict[str, int]):
+        delta = {name: after.get(name, 0) - before.get(name, 0) for name in PERFORMANCE_METRICS}
+        try:
+            url = driver.current_url
+        except Exception:
+            url = None
+        record = {
+            "label": label,
+            "url": url,
+            "at": time.time(),
+            "wall_ms": round(wall_ms, 1),
+            **analyze_cpu_profile(profile),
+            "script_duration_ms": round(delta["ScriptDuration"] * 1000, 2),
+            "layout_count": int(delta["LayoutCount"]),
+            "layout_ms": round(delta["LayoutDuration"] * 1000, 2),
+            "recalc_style_count": int(delta["RecalcStyleCount"]),
+            "recalc_style_ms": round(delta["RecalcStyleDuration"] * 1000, 2),
+            "heap_delta_kb": round(delta["JSHeapUsedSize"] / 1024, 1),
+            "dom_nodes": int(after.get("Nodes", 0)),
+            "dom_calls": dom_calls,
+            "dom_calls_total": sum(dom_calls.values())
+        }
+        self.records.append(record)
+        print(f"🧪 JS {label}: {record['script_self_ms']}ms propio, GC {record['gc_ms']}ms, "
+              f"{record['layout_count']} layouts, {record['dom_calls_total']} llamadas al DOM")
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(os.path.join(self.output_dir, "js_profile.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if self.config["save_cpuprofile"] and profile:
+                filename = f"{label}-{len(self.records):04d}.cpuprofile"
+                with open(os.path.join(self.output_dir, filename), "w", encoding="utf-8") as f:
+                    json.dump(profile, f)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el perfil JS: {e}")
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Promedios por script"""
+        by_label: Dict[str, List[Dict[str, Any]]] = {}
+        for record in self.records:
+            by_label.setdefault(record["label"], []).append(record)
+        summary = {}
+        for label, records in by_label.items():
+            n = len(records)
+            dom_calls: Dict[str, float] = {}
+            for record in records:
+                for name, count in record["dom_calls"].items():
+                    dom_calls[name] = dom_calls.get(name, 0) + count / n
+            summary[label] = {
+                "pages": n,
+                **{key: round(sum(r[key] for r in records) / n, 2)
+                   for key in ("wall_ms", "script_self_ms", "gc_ms", "layout_count", "recalc_style_count", "dom_calls_total")},
+                "dom_calls": {name: round(count, 1) for name, count in sorted(dom_calls.items(), key=lambda i: -i[1])}
+            }
+        return summary
+
+    def print_summary(self):
+        if not self.records:
+            return
+        print("\n=== PERFIL DE LOS SCRIPTS DE EXTRACCIÓN (promedio por página) ===")
+        for label, stats in self.summary().items():
+            print(f"{label}: {stats['pages']} páginas, {stats['script_self_ms']}ms propio, GC {stats['gc_ms']}ms, "
+                  f"{stats['layout_count']} layouts, {stats['dom_calls_total']} llamadas al DOM")
+            top = ", ".join(f"{name} {count}" for name, count in list(stats["dom_calls"].items())[:5])
+            if top:
+                print(f"  DOM: {top}")
+        print(f"Detalle en {self.output_dir}")
+
+
+def configure_js_profiling(enabled: Optional[bool] = None) -> JSProfiler:
+    """Activa el modo por argumento o con SCRAPER_JS_PROFILE=1"""
+    if enabled is None:
+        enabled = os.environ.get("SCRAPER_JS_PROFILE", "").lower() in ("1", "true", "yes")
+    if enabled and not js_profiler.enabled:
+        js_profiler.enabled = True
+        print("🧪 Perfilado de scripts de extracción activo (CDP Profiler/Performance)")
+    return js_profiler
+
+
+# Instancia global
+js_profiler = JSProfiler()
@@ -13,8 +13,24 @@ from api_utils import (
     send_products_to_api
 )
 from config import API_URLS
+from run_report import run_report
+from profiling_hooks import configure_profiling, stop_profiling
+from js_profiling import configure_js_profiling, js_profiler
+from scraper_logging import shutdown_logging
 
 def main():
+    run_report.start("main")
+    configure_profiling()
+    configure_js_profiling()
+    try:
+        _main()
+    finally:
+        run_report.finish()
+        stop_profiling()
+        js_profiler.print_summary()
+        shutdown_logging()
+
+def _main():
     start_time = time.time()
     print("Iniciando Alibaba Scraper Modular...")
     print(f"Tiempo de inicio: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))}")
@@ -108,6 +124,7 @@ def main():
                                 products_with_details.append(product)
                                 successfully_processed_ids.append(product['original_product_id'])
                                 details_success = True
+                                run_report.product_done("ok")
                                 print(f"✓ Detalles obtenidos exitosamente")
                                 print(f"  - Atributos: {len(details.get('attributes', {}))}")
                                 print(f"  - Imágenes: {len(details.get('images', []))}")
@@ -120,6 +137,7 @@ def main():
                             time.sleep(random.uniform(2, 4))
                     if not details_success:
                         print(f"✗ No se pudieron obtener detalles después de {max_detail_retries} intentos")
+                        run_report.product_done("failed")
                     time.sleep(random.uniform(2, 3))
 
             # FASE 3: Guardar solo productos con detalles completos
@@ -2,24 +2,33 @@
 Script principal refactorizado para scraping de Alibaba optimizado y modular
 Versión 3.0 - Estructura completamente modular
 """
+import argparse
 import time
 import random
 import threading
+from collections import deque
 from typing import List, Dict, Any
 from driver_manager import DriverManager
+from driver_watchdog import DriverHungError
+from process_janitor import process_janitor
 from product_extractor import ProductExtractor
-from captcha_handler import CaptchaHandler
 from api_utils import (
     get_products_to_scrap_from_api,
-    mark_products_completed_batch,
     mark_single_product_completed,
-    save_to_csv,
-    save_images_report,
-    send_products_to_api,
     send_single_product_to_api
 )
-from config import API_URLS, RETRY_CONFIG, TIMEOUTS
-from notification_handler import notification_handler
+from output_writers import ProductOutputWriter
+from instrumentation import phase, command_recorder
+from run_report import run_report
+from tracing import tracer
+from profiling_hooks import configure_profiling, stop_profiling
+from js_profiling import configure_js_profiling, js_profiler
+from scraper_logging import configure_logging, get_logger, shutdown_logging
+from metrics_exporter import metrics, metrics_exporter, QUEUE_DEPTH, ACTIVE_BROWSERS, PRODUCTS, OUTBOX_BACKLOG
+from config import API_URLS, RETRY_CONFIG, TIMEOUTS, WATCHDOG_CONFIG
+from notification_handler import notification_dispatcher
+
+logger = get_logger(__name__)
 
 
 class AlibabaScraperOrchestrator:
@@ -29,10 +38,10 @@ class AlibabaScraperOrchestrator:
         self.headless = headless
         self.driver_manager = None
         self.product_extractor = None
-        self.captcha_handler = None
         self.products = []
         self.lock = threading.Lock()
         self.page_retry_count = 0
+        self.output_writer = None
     
     def initialize(self):
         """Inicializa todos los componentes necesarios"""
@@ -40,20 +49,25 @@ class AlibabaScraperOrchestrator:
         self.driver_manager = DriverManager(headless=self.headless)
         self.driver_manager.setup_driver()
         self.product_extractor = ProductExtractor(self.driver_manager)
-        self.captcha_handler = CaptchaHandler(self.driver_manager.driver)
+        metrics.register_collector(self._collect_metrics)
         print("✓ Componentes inicializados correctamente")
     
+    def _collect_metrics(self):
+        """Gauges que se leen del estado actual al exponer las métricas"""
+        ACTIVE_BROWSERS.set(self.driver_manager.active_browsers() if self.driver_manager else 0)
+        OUTBOX_BACKLOG.set(notification_dispatcher.queue.qsize(), outbox="notifications")
+    
     def search_products_optimized(self, search_term: str, max_pages: int = 5) -> List[Dict[str, Any]]:
         """Búsqueda optimizada con manejo de errores mejorado"""
         if not self.driver_manager or not self.product_extractor:
-            print("Componentes no inicializados")
+            logger.error("Componentes no inicializados")
             return []
             
         base_url = f"https://www.alibaba.com/trade/search?fsb=y&IndexArea=product_en&keywords={search_term.replace(' ', '+')}"
         
         # Intentar cargar la página con reintentos
-        if not self.driver_manager.reload_page_with_retry(base_url):
-            print(f"No se pudo cargar la página de búsqueda para '{search_term}'")
+        if not self.driver_manager.reload_page_with_retry(base_url, page_type="search"):
+            logger.warning("No se pudo cargar la página de búsqueda para '%s'", search_term)
             return []
         
         # Esperar a que se carguen los productos
@@ -62,7 +76,7 @@ class AlibabaScraperOrchestrator:
         page_products = []
         
         for page in range(1, max_pages + 1):
-            print(f"Scrapeando página {page} para '{search_term}'...")
+            logger.info("Scrapeando página %d para '%s'", page, search_term)
             
             try:
                 # Scroll inteligente
@@ -72,7 +86,8 @@ class AlibabaScraperOrchestrator:
                 current_page_products = self.product_extractor.extract_products_optimized()
                 page_products.extend(current_page_products)
                 
-                print(f"Página {page}: {len(current_page_products)} productos encontrados")
+                logger.info("Página %d: %d productos encontrados", page, len(current_page_products),
+                            extra={"search_term": search_term})
                 
                 # Navegación a siguiente página
                 if page < max_pages:
@@ -81,108 +96,121 @@ class AlibabaScraperOrchestrator:
                         timeout=3
                     )
                     
-                    if next_button and self.driver_manager.driver and self.captcha_handler:
+                    if next_button and self.driver_manager.driver:
                         self.driver_manager.driver.execute_script("arguments[0].click();", next_button)
                         time.sleep(2)
                         
                         # Verificar CAPTCHA después de cambio de página
-                        if not self.captcha_handler.handle_slider_captcha_advanced():
-                            print("No se pudo resolver CAPTCHA en cambio de página")
+                        if not self.driver_manager.captcha_handler.handle_slider_captcha_advanced():
+                            logger.warning("No se pudo resolver CAPTCHA en cambio de página", extra={"page": page})
                             break
                         
                         self.driver_manager.wait_for_elements_presence(".m-gallery-product-item-v2", timeout=5)
                     else:
-                        print("No se encontró botón de siguiente página")
+                        logger.warning("No se encontró botón de siguiente página", extra={"page": page})
                         break
                 
                 time.sleep(random.uniform(*TIMEOUTS["between_requests"]))
                 
             except Exception as e:
-                print(f"Error en página {page}: {e}")
+                logger.warning("Error en página %d: %s", page, e, extra={"error_type": type(e).__name__})
                 continue
         
         return page_products
     
-    def process_products_batch(self, products_to_scrap: List[Dict]) -> tuple:
-        """Procesa un lote de productos en fases"""
-        all_found_products = []
+    def _process_original_product(self, product: Dict) -> tuple:
+        """
+        Busca un producto original y detalla cada listado encontrado.
+        Devuelve (listados encontrados, resúmenes detallados, marcado como completado)
+        """
         products_with_details = []
-        successfully_processed_ids = []
-        failed_products = []
-        completed_original_ids = set()  # Para trackear qué productos originales se completaron
+        completed = False
         
-        # FASE 1: Buscar todos los productos primero
-        print("\n=== FASE 1: BÚSQUEDA DE PRODUCTOS ===")
-        for idx, product in enumerate(products_to_scrap):
-            print(f"\n--- Buscando producto {idx + 1}/{len(products_to_scrap)} ---")
-            print(f"Producto: {product['name']} (ID: {product['id']})")
-            
-            search_retry_count = 0
-            max_search_retries = RETRY_CONFIG["max_search_retries"]
-            search_success = False
-            current_product_found_products = []  # Productos encontrados para este producto específico
-            
-            while search_retry_count < max_search_retries and not search_success:
-                try:
-                    search_retry_count += 1
-                    print(f"Intento de búsqueda {search_retry_count}/{max_search_retries}")
-                    
-                    # Buscar productos
-                    search_term = product['name']
+        search_retry_count = 0
+        max_search_retries = RETRY_CONFIG["max_search_retries"]
+        search_success = False
+        current_product_found_products = []  # Productos encontrados para este producto específico
+        
+        while search_retry_count < max_search_retries and not search_success:
+            try:
+                search_retry_count += 1
+                logger.debug("Intento de búsqueda %d/%d", search_retry_count, max_search_retries)
+                
+                # Buscar productos
+                search_term = product['name']
+                with self.driver_manager.guarded(f"búsqueda '{search_term}'", WATCHDOG_CONFIG["search_deadline"]), \
+                        phase("search", term=search_term):
                     found_products = self.search_products_optimized(search_term, max_pages=1)
-                    
-                    if found_products:
-                        print(f"✓ Encontrados {len(found_products)} productos para '{search_term}'")
-                        # Tomar el primer producto (más relevante)
-                        for p in found_products:
-                            p['original_product_id'] = product['id']
-                            p['category_id'] = product.get('category_id', 'N/A')
-                        current_product_found_products.extend(found_products)
-                        all_found_products.extend(found_products)
-                        search_success = True
-                    else:
-                        print(f"✗ No se encontraron productos para '{search_term}'")
-                        if search_retry_count >= max_search_retries:
-                            failed_products.append(product)
-                    
-                    # Pausa entre búsquedas
-                    time.sleep(random.uniform(*TIMEOUTS["between_requests"]))
-                    
-                except Exception as e:
-                    print(f"✗ Error en búsqueda (intento {search_retry_count}): {e}")
+                
+                if found_products:
+                    logger.info("Encontrados %d productos para '%s'", len(found_products), search_term,
+                                extra={"found": len(found_products)})
+                    # Tomar el primer producto (más relevante)
+                    for p in found_products:
+                        p['original_product_id'] = product['id']
+                        p['category_id'] = product.get('category_id', 'N/A')
+                    current_product_found_products.extend(found_products)
+                    search_success = True
+                else:
+                    logger.warning("No se encontraron productos para '%s'", search_term,
+                                   extra={"attempt": search_retry_count})
                     if search_retry_count >= max_search_retries:
-                        failed_products.append(product)
-                    time.sleep(random.uniform(*TIMEOUTS["retry_wait"]))
+                        run_report.failure("search", "no_results")
+                    else:
+                        run_report.retry("search", "no_results")
+                
+                # Pausa entre búsquedas
+                time.sleep(random.uniform(*TIMEOUTS["between_requests"]))
+            
+            except Exception as e:
+                logger.warning("Error en búsqueda (intento %d): %s", search_retry_count, e,
+                               extra={"error_type": type(e).__name__})
+                if search_retry_count >= max_search_retries:
+                    run_report.failure("search", type(e).__name__)
+                else:
+                    run_report.retry("search", type(e).__name__)
+                time.sleep(random.uniform(*TIMEOUTS["retry_wait"]))
+        
+        if not search_success:
+            logger.error("Producto ID %s falló en la búsqueda", product['id'])
+        
+        # FASE 2: Procesar detalles de los productos encontrados para este producto específico
+        if current_product_found_products:
+            logger.info("Obteniendo detalles de %d productos encontrados", len(current_product_found_products))
             
-            if not search_success:
-                print(f"✗ Producto ID {product['id']} falló en la búsqueda")
+            products_processed_for_this_original = 0
             
-            # FASE 2: Procesar detalles de los productos encontrados para este producto específico
-            if current_product_found_products:
-                print(f"\n=== PROCESANDO DETALLES PARA PRODUCTO ORIGINAL ID {product['id']} ===")
-                print(f"Obteniendo detalles de {len(current_product_found_products)} productos encontrados...")
+            # Cola de detalle: una URL que cuelga el driver vuelve al final de la cola
+            pending = deque(current_product_found_products)
+            requeues = {}
+            idx = 0
+            
+            while pending:
+                QUEUE_DEPTH.set(len(pending), queue="detail")
+                alibaba_product = pending.popleft()
+                idx += 1
+                logger.info("Detallando producto Alibaba %d/%d: %s", idx, idx + len(pending),
+                            alibaba_product.get('description', '')[:80])
                 
-                products_processed_for_this_original = 0
+                if alibaba_product.get('product_url', 'N/A') == 'N/A':
+                    logger.warning("Producto sin URL válida, se omite")
+                    continue
                 
-                for idx, alibaba_product in enumerate(current_product_found_products):
-                    print(f"\n--- Detallando producto Alibaba {idx + 1}/{len(current_product_found_products)} ---")
-                    print(f"Producto: {alibaba_product.get('description', '')[:80]}...")
-                    
-                    if alibaba_product.get('product_url', 'N/A') == 'N/A':
-                        print("✗ Producto sin URL válida, saltando...")
-                        continue
-                    
-                    detail_retry_count = 0
-                    max_detail_retries = RETRY_CONFIG["max_detail_retries"]
-                    details_success = False
-                    
+                detail_retry_count = 0
+                max_detail_retries = RETRY_CONFIG["max_detail_retries"]
+                details_success = False
+                requeued = False
+                
+                # Los comandos del driver de todos los intentos se acumulan por producto
+                with phase("product", url=alibaba_product['product_url'], outcome="failed") as product_phase:
                     while detail_retry_count < max_detail_retries and not details_success:
                         try:
                             detail_retry_count += 1
-                            print(f"Intento de detalles {detail_retry_count}/{max_detail_retries}")
+                            logger.debug("Intento de detalles %d/%d", detail_retry_count, max_detail_retries)
                             
                             if self.product_extractor:
-                                details = self.product_extractor.get_detailed_product_info_fast(alibaba_product['product_url'])
+                                with self.driver_manager.guarded(alibaba_product['product_url']):
+                                    details = self.product_extractor.get_detailed_product_info_fast(alibaba_product['product_url'])
                             else:
                                 details = {}
                             
@@ -192,70 +220,155 @@ class AlibabaScraperOrchestrator:
                                 details.get('detailed_description_text', 'N/A') != 'N/A' or
                                 details.get('images', [])
                             ):
-                                alibaba_product.update(details)
-                                products_with_details.append(alibaba_product)
-                                successfully_processed_ids.append(alibaba_product['original_product_id'])
+                                # El producto detallado se escribe y se envía de inmediato;
+                                # en memoria solo queda un resumen liviano
+                                detailed_product = {**alibaba_product, **details}
+                                if self.output_writer:
+                                    with phase("write"):
+                                        self.output_writer.write(detailed_product)
+                                products_with_details.append(self._summarize_product(detailed_product))
                                 products_processed_for_this_original += 1
                                 details_success = True
-                                print(f"✓ Detalles obtenidos exitosamente")
-                                print(f"  - Atributos: {len(details.get('attributes', {}))}")
-                                print(f"  - Imágenes: {len(details.get('images', []))}")
-                                print(f"  - Precios: {len(details.get('prices', []))}")
+                                product_phase["attrs"]["outcome"] = "ok"
+                                logger.info("Detalles obtenidos", extra={
+                                    "attributes": len(details.get('attributes', {})),
+                                    "images": len(details.get('images', [])),
+                                    "prices": len(details.get('prices', []))
+                                })
                                 
                                 # Enviar producto individualmente a la API inmediatamente
-                                print(f"📤 Enviando producto a la API...")
-                                send_success = send_single_product_to_api(alibaba_product)
+                                with phase("send"):
+                                    send_success = send_single_product_to_api(detailed_product)
+                                del detailed_product, details
                                 if send_success:
-                                    print(f"✅ Producto enviado y guardado localmente")
+                                    logger.info("Producto enviado y guardado localmente")
                                 else:
-                                    print(f"⚠️ Producto guardado localmente pero no enviado a la API")
+                                    logger.warning("Producto guardado localmente pero no enviado a la API")
+                                    run_report.failure("send", "api")
+                                    OUTBOX_BACKLOG.inc(outbox="api_unsent")
                             else:
-                                print(f"✗ Detalles incompletos, reintentando...")
+                                logger.warning("Detalles incompletos, reintentando", extra={"attempt": detail_retry_count})
+                                run_report.retry("detail", "incomplete")
                                 time.sleep(random.uniform(*TIMEOUTS["retry_wait"]))
-                                
+                        
+                        except DriverHungError as e:
+                            # El driver ya fue reemplazado: reencolar la URL en lugar de reintentarla ya
+                            url = alibaba_product['product_url']
+                            logger.warning("%s", e, extra={"error_type": "DriverHungError"})
+                            if requeues.get(url, 0) < WATCHDOG_CONFIG["max_requeues"]:
+                                requeues[url] = requeues.get(url, 0) + 1
+                                pending.append(alibaba_product)
+                                requeued = True
+                                product_phase["attrs"]["outcome"] = "requeued"
+                                run_report.retry("detail", "driver_hung")
+                                logger.info("Producto reencolado al final de la cola", extra={"requeues": requeues[url]})
+                            break
+                        
                         except Exception as e:
-                            print(f"✗ Error obteniendo detalles (intento {detail_retry_count}): {e}")
+                            logger.warning("Error obteniendo detalles (intento %d): %s", detail_retry_count, e,
+                                           extra={"error_type": type(e).__name__})
+                            run_report.retry("detail", type(e).__name__)
                             time.sleep(random.uniform(*TIMEOUTS["retry_wait"]))
-                    
-                    if not details_success:
-                        print(f"✗ No se pudieron obtener detalles después de {max_detail_retries} intentos")
-                    
-                    # Pausa entre productos para evitar bloqueos
-                    time.sleep(random.uniform(*TIMEOUTS["between_products"]))
                 
-                # Marcar el producto original como completado si se procesó al menos un producto
-                if products_processed_for_this_original > 0:
-                    print(f"\n🎯 PRODUCTO ORIGINAL ID {product['id']} COMPLETADO")
-                    print(f"Se procesaron {products_processed_for_this_original} productos de Alibaba")
-                    
-                    # Marcar como completado
-                    if mark_single_product_completed(product['id']):
-                        completed_original_ids.add(product['id'])
-                        print(f"✅ Producto original ID {product['id']} marcado como completado")
-                    else:
-                        print(f"❌ Error marcando producto original ID {product['id']} como completado")
+                PRODUCTS.inc(outcome=product_phase["attrs"]["outcome"])
+                
+                if not details_success and not requeued:
+                    logger.error("No se pudieron obtener detalles después de %d intentos", max_detail_retries)
+                    run_report.failure("detail", "exhausted")
+                
+                # Revisar la salud del driver (y reciclarlo si hace falta) antes del siguiente
+                self.driver_manager.between_products()
+                
+                # Pausa entre productos para evitar bloqueos
+                time.sleep(random.uniform(*TIMEOUTS["between_products"]))
+            
+            # Marcar el producto original como completado si se procesó al menos un producto
+            if products_processed_for_this_original > 0:
+                logger.info("Producto original completado: %d productos de Alibaba procesados",
+                            products_processed_for_this_original)
+                
+                # Marcar como completado
+                with phase("mark_completed"):
+                    marked = mark_single_product_completed(product['id'])
+                if marked:
+                    completed = True
+                    logger.info("Producto original ID %s marcado como completado", product['id'])
                 else:
-                    print(f"\n⚠️ Producto original ID {product['id']} no se pudo procesar completamente")
+                    logger.error("Error marcando producto original ID %s como completado", product['id'])
+                    run_report.failure("mark_completed", "api")
+            else:
+                logger.warning("Producto original ID %s no se pudo procesar completamente", product['id'])
+        
+        return current_product_found_products, products_with_details, completed
+    
+    def process_products_batch(self, products_to_scrap: List[Dict]) -> tuple:
+        """Procesa un lote de productos en fases"""
+        all_found_products = []
+        products_with_details = []
+        failed_products = []
+        completed_original_ids = set()  # Para trackear qué productos originales se completaron
+        
+        # FASE 1: Buscar todos los productos primero
+        logger.info("Fase 1: búsqueda de productos", extra={"products": len(products_to_scrap)})
+        for idx, product in enumerate(products_to_scrap):
+            QUEUE_DEPTH.set(len(products_to_scrap) - idx, queue="search")
+            # Una traza por producto original: su búsqueda y cada listado detallado
+            with phase("original_product", id=product['id'], name=product['name']):
+                logger.info("Buscando producto %d/%d: %s", idx + 1, len(products_to_scrap), product['name'])
+                found, details, completed = self._process_original_product(product)
+            all_found_products.extend(found)
+            products_with_details.extend(details)
+            if not found:
+                failed_products.append(product)
+            if completed:
+                completed_original_ids.add(product['id'])
         
-        print(f"\n=== RESUMEN FASE 1 ===")
-        print(f"Productos encontrados: {len(all_found_products)}")
-        print(f"Productos no encontrados: {len(failed_products)}")
-        print(f"Productos originales completados: {len(completed_original_ids)}")
+        QUEUE_DEPTH.set(0, queue="search")
+        QUEUE_DEPTH.set(0, queue="detail")
+        logger.info("Resumen fase 1", extra={
+            "found": len(all_found_products),
+            "not_found": len(failed_products),
+            "originals_completed": len(completed_original_ids)
+        })
         
         return all_found_products, products_with_details, list(completed_original_ids), failed_products
     
+    @staticmethod
+    def _summarize_product(product: Dict) -> Dict:
+        """Resumen liviano de un producto ya escrito en disco"""
+        return {
+            'description': product.get('description', ''),
+            'price': product.get('price', 'N/A'),
+            'company': product.get('company', 'N/A'),
+            'original_product_id': product.get('original_product_id', 'N/A'),
+            'category_id': product.get('category_id', 'N/A'),
+            'attribute_count': len(product.get('attributes', {})),
+            'image_count': len(product.get('images', []))
+        }
+    
+    def open_output(self):
+        """Abre los escritores incrementales de salida"""
+        if not self.output_writer:
+            self.output_writer = ProductOutputWriter()
+            self.output_writer.open()
+    
+    def finalize_output(self):
+        """Cierra y publica los archivos de salida"""
+        if self.output_writer:
+            self.output_writer.finalize()
+            self.output_writer = None
+    
     def save_results(self, products_with_details: List[Dict]):
-        """Guarda los resultados en archivos"""
+        """Publica los archivos de salida (los productos ya se escribieron durante el proceso)"""
         if products_with_details:
             print(f"\n=== FASE 3: GUARDADO DE DATOS ===")
             print(f"Productos con detalles completos: {len(products_with_details)}")
             
-            # Asignar solo los productos con detalles al scraper
+            # Asignar solo los resúmenes de productos con detalles al scraper
             self.products = products_with_details
             
-            # Guardar datos
-            save_to_csv(products_with_details)
-            save_images_report(products_with_details)
+            # Publicar datos
+            self.finalize_output()
             print("✓ Datos guardados exitosamente")
             
             # Mostrar resumen de productos guardados
@@ -266,9 +379,10 @@ class AlibabaScraperOrchestrator:
                 print(f"   Empresa: {product.get('company', 'N/A')}")
                 print(f"   ID Original: {product.get('original_product_id', 'N/A')}")
                 print(f"   Category ID: {product.get('category_id', 'N/A')}")
-                print(f"   Atributos: {len(product.get('attributes', {}))}")
-                print(f"   Imágenes: {len(product.get('images', []))}")
+                print(f"   Atributos: {product['attribute_count']}")
+                print(f"   Imágenes: {product['image_count']}")
         else:
+            self.finalize_output()
             print("\n✗ No se obtuvieron productos con detalles completos")
     
     def mark_completed_and_send(self, successfully_processed_ids: List[int], products_with_details: List[Dict]):
@@ -278,7 +392,7 @@ class AlibabaScraperOrchestrator:
             print(f"Productos marcados como completados durante el procesamiento: {len(successfully_processed_ids)}")
             
             # Notificación final de resumen
-            notification_handler.send_success_notification(
+            notification_dispatcher.send_success_notification(
                 f"Proceso completado: {len(successfully_processed_ids)} productos procesados y marcados como completados"
             )
         else:
@@ -286,6 +400,23 @@ class AlibabaScraperOrchestrator:
     
     def run(self) -> bool:
         """Ejecuta el proceso completo de scraping"""
+        run_report.start("mainv3")
+        metrics_exporter.start()
+        success = False
+        try:
+            success = self._run()
+            return success
+        finally:
+            # Resumen de comandos del driver por fase y reporte de la ejecución, también si falla
+            command_recorder.report()
+            run_report.finish(success)
+            tracer.flush()
+            stop_profiling()
+            js_profiler.print_summary()
+            metrics_exporter.stop()
+            shutdown_logging()
+    
+    def _run(self) -> bool:
         start_time = time.time()
         print("Iniciando Alibaba Scraper Optimizado v3.0...")
         print(f"Tiempo de inicio: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_time))}")
@@ -293,6 +424,13 @@ class AlibabaScraperOrchestrator:
         max_execution_retries = RETRY_CONFIG["max_execution_retries"]
         execution_attempt = 0
         
+        # Reclamar perfiles y procesos Chrome de ejecuciones anteriores que murieron
+        process_janitor.sweep()
+        process_janitor.start()
+        
+        # Las salidas se abren una sola vez: lo escrito sobrevive a los reintentos
+        self.open_output()
+        
         while execution_attempt < max_execution_retries:
             try:
                 execution_attempt += 1
@@ -307,6 +445,7 @@ class AlibabaScraperOrchestrator:
                 if not products_to_scrap:
                     print("No hay productos para scrapear. Saliendo...")
                     self.close()
+                    self.finalize_output()
                     return True
                 
                 print(f"Productos a scrapear: {len(products_to_scrap)}")
@@ -340,7 +479,7 @@ class AlibabaScraperOrchestrator:
                     print(f"Velocidad promedio: {len(products_with_details)/elapsed_time:.2f} productos/segundo")
                 
                 # Enviar notificación de éxito
-                notification_handler.send_success_notification(
+                notification_dispatcher.send_success_notification(
                     f"Scraping completado. {len(products_with_details)} productos procesados en {elapsed_time/60:.1f} minutos."
                 )
                 
@@ -349,6 +488,7 @@ class AlibabaScraperOrchestrator:
             except KeyboardInterrupt:
                 print("\nScraping interrumpido por el usuario")
                 self.close()
+                self.finalize_output()
                 return False
                 
             except Exception as e:
@@ -358,7 +498,7 @@ class AlibabaScraperOrchestrator:
                 traceback.print_exc()
                 
                 # Enviar notificación de error
-                notification_handler.send_error_notification(
+                notification_dispatcher.send_error_notification(
                     f"Error en ejecución {execution_attempt}: {str(e)[:100]}..."
                 )
                 
@@ -370,22 +510,42 @@ class AlibabaScraperOrchestrator:
                     time.sleep(wait_time)
                 else:
                     print("Se agotaron todos los intentos de ejecución")
-                    notification_handler.send_error_notification(
+                    notification_dispatcher.send_error_notification(
                         "Se agotaron todos los intentos de ejecución. El scraper se ha detenido."
                     )
                     break
         
+        self.finalize_output()
         print("Programa terminado")
         return False
     
     def close(self):
         """Cierra todos los recursos"""
         if self.driver_manager:
+            run_report.count("identity_rotations", self.driver_manager.rotations)
+            run_report.count("driver_recycles", self.driver_manager.recycles)
+            run_report.count("driver_incidents", len(self.driver_manager.incidents))
             self.driver_manager.close()
+        notification_dispatcher.flush()
 
 
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Alibaba Scraper Optimizado v3.0")
+    parser.add_argument("--profile", metavar="FASES",
+                        help="Perfila estas fases separadas por comas (search,detail,send,... o all)")
+    parser.add_argument("--profile-every", type=int, metavar="N", help="Perfila uno de cada N productos")
+    parser.add_argument("--profile-mode", choices=["sampling", "deterministic"])
+    parser.add_argument("--js-profile", action="store_true", default=None,
+                        help="Perfila en Chrome los scripts de extracción (CDP Profiler/Performance)")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--log-format", choices=["json", "text"])
+    args = parser.parse_args()
+    if args.log_level or args.log_format:
+        configure_logging(args.log_level, args.log_format)
+    configure_profiling(args.profile, args.profile_every, args.profile_mode)
+    configure_js_profiling(args.js_profile)
+    
     orchestrator = AlibabaScraperOrchestrator(headless=False)
     success = orchestrator.run()
     
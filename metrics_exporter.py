@@ -0,0 +1,246 @@
+"""
+Métricas del scraper en formato de exposición de Prometheus, servidas por HTTP en
+/metrics o escritas periódicamente para el colector textfile de node-exporter.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence
+from config import METRICS_CONFIG
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Contador, gauge o histograma con etiquetas"""
+
+    def __init__(self, kind: str, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Optional[Sequence[float]] = None):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = list(buckets or []) + [float("inf")] if kind == "histogram" else None
+        self.values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def get(self, **labels) -> float:
+        value = self.values.get(self._key(labels), 0)
+        return value["count"] if isinstance(value, dict) else value
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][i] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observa la duración del bloque (histogramas)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _label_text(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{self._label_text(key)} {_format_value(value)}")
+                continue
+            for bound, count in zip(self.buckets, value["buckets"]):
+                le = 'le="%s"' % _format_value(bound)
+                lines.append(f"{self.name}_bucket{self._label_text(key, le)} {count}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(value['sum'])}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {value['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas y recolectores que se evalúan justo antes de exponerlas"""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def _add(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Metric:
+        return self._add(Metric("counter", name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Metric:
+        return self._add(Metric("gauge", name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = METRICS_CONFIG["latency_buckets_s"]) -> Metric:
+        return self._add(Metric("histogram", name, help_text, labels, buckets))
+
+    def register_collector(self, collector: Callable[[], None]):
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], None]):
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def render(self) -> str:
+        for collector in list(self.collectors):
+            try:
+                collector()
+            except Exception as e:
+                print(f"⚠️ Error en un recolector de métricas: {e}")
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Instancia global y métricas del scraper
+metrics = MetricsRegistry()
+
+QUEUE_DEPTH = metrics.gauge("scraper_queue_depth", "Elementos pendientes por cola", ["queue"])
+ACTIVE_BROWSERS = metrics.gauge("scraper_active_browsers", "Navegadores Chrome vivos, incluido el de reserva")
+INFLIGHT_PAGES = metrics.gauge("scraper_inflight_pages", "Páginas cargándose en este momento")
+PRODUCTS = metrics.counter("scraper_products_total", "Productos de Alibaba detallados por resultado", ["outcome"])
+CAPTCHA_ENCOUNTERS = metrics.counter("scraper_captcha_encounters_total", "CAPTCHAs encontrados por veredicto", ["verdict"])
+CAPTCHA_RESULTS = metrics.counter("scraper_captcha_results_total", "Episodios de CAPTCHA por resultado", ["result"])
+CAPTCHA_SOLVE_RATIO = metrics.gauge("scraper_captcha_solve_ratio", "Fracción de episodios de CAPTCHA resueltos")
+API_LATENCY = metrics.histogram("scraper_api_request_seconds", "Latencia de las llamadas a la API", ["endpoint"])
+API_ERRORS = metrics.counter("scraper_api_errors_total", "Llamadas a la API fallidas", ["endpoint"])
+OUTBOX_BACKLOG = metrics.gauge("scraper_outbox_backlog", "Elementos pendientes de entrega por salida", ["outbox"])
+
+
+def _collect_captcha_ratio():
+    solved = CAPTCHA_RESULTS.get(result="solved")
+    total = sum(CAPTCHA_RESULTS.get(result=result) for result in ("solved", "failed", "blocked"))
+    CAPTCHA_SOLVE_RATIO.set(solved / total if total else 0)
+
+
+metrics.register_collector(_collect_captcha_ratio)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    """Expone el registro por HTTP o lo vuelca a un archivo .prom cada cierto tiempo"""
+
+    def __init__(self, registry: MetricsRegistry = metrics, config: Dict = METRICS_CONFIG):
+        self.registry = registry
+        self.config = config
+        self.server = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> bool:
+        if not self.config["enabled"] or self._thread:
+            return False
+        self._stop.clear()
+        if self.config["mode"] == "textfile":
+            self._thread = threading.Thread(target=self._textfile_loop, daemon=True)
+            self._thread.start()
+            print(f"📡 Métricas escritas en {self.config['textfile_path']} cada {self.config['textfile_interval']}s")
+            return True
+        try:
+            self.server = ThreadingHTTPServer((self.config["address"], self.config["port"]), _MetricsRequestHandler)
+        except OSError as e:
+            print(f"⚠️ No se pudo abrir el endpoint de métricas en el puerto {self.config['port']}: {e}")
+            return False
+        self.server.registry = self.registry
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"📡 Métricas disponibles en http://{self.config['address']}:{self.server.server_port}/metrics")
+        return True
+
+    def write_textfile(self):
+        """Escritura atómica: node-exporter nunca lee un archivo a medias"""
+        path = self.config["textfile_path"]
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.render())
+        os.replace(tmp_path, path)
+
+    def _textfile_loop(self):
+        while True:
+            try:
+                self.write_textfile()
+            except OSError as e:
+                print(f"⚠️ No se pudo escribir el archivo de métricas: {e}")
+            if self._stop.wait(self.config["textfile_interval"]):
+                break
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self._thread.join(timeout=5)
+        self._thread = None
+        if self.config["mode"] == "textfile":
+            try:
+                self.write_textfile()
+            except OSError:
+                pass
+
+
+# Instancia global
+metrics_exporter = MetricsExporter()
@@ -3,20 +3,35 @@ Manejador de notificaciones para diferentes sistemas operativos
 """
 import platform
 import os
+import queue
+import threading
 import time
-from typing import Optional
+import atexit
+from typing import Callable, Dict, Optional
+from config import NOTIFICATION_CONFIG
 
 
 class NotificationHandler:
     """Manejador de notificaciones multiplataforma"""
     
-    def __init__(self):
+    def __init__(self, sink: str = NOTIFICATION_CONFIG["sink"]):
         self.system = platform.system().lower()
         self.notification_sound = None
+        self.sink = self._resolve_sink(sink)
         self._setup_notification_system()
     
+    def _resolve_sink(self, sink: str) -> str:
+        """En servidores sin escritorio las notificaciones solo se registran en el log"""
+        if sink != "auto":
+            return sink
+        if self.system == "linux" and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+            return "log"
+        return "desktop"
+    
     def _setup_notification_system(self):
         """Configura el sistema de notificaciones según el SO"""
+        if self.sink != "desktop":
+            return
         if self.system == "windows":
             try:
                 from win10toast import ToastNotifier
@@ -51,6 +66,10 @@ class NotificationHandler:
         Returns:
             bool: True si la notificación se envió exitosamente
         """
+        if self.sink == "none":
+            return True
+        if self.sink == "log":
+            return self._send_log_notification(title, message)
         try:
             if self.system == "windows" and hasattr(self, 'windows_available') and self.windows_available:
                 return self._send_windows_notification(title, message, duration)
@@ -103,6 +122,11 @@ class NotificationHandler:
             print(f"Error en notificación Linux: {e}")
             return False
     
+    def _send_log_notification(self, title: str, message: str) -> bool:
+        """Notificación sin escritorio: solo una línea en la salida"""
+        print(f"🔔 {title} - {message}")
+        return True
+    
     def _send_fallback_notification(self, message: str) -> bool:
         """Notificación de respaldo usando beep y print"""
         try:
@@ -138,5 +162,157 @@ class NotificationHandler:
         )
 
 
-# Instancia global para usar en otros módulos
-notification_handler = NotificationHandler() 
\ No newline at end of file
+def describe_window(seconds: float) -> str:
+    """Texto de la ventana de agrupación para los resúmenes ("el último minuto", ...)"""
+    if seconds == 60:
+        return "el último minuto"
+    if seconds > 60 and seconds % 60 == 0:
+        return f"los últimos {int(seconds // 60)} minutos"
+    return f"los últimos {seconds:g} segundos"
+
+
+class NotificationDispatcher:
+    """
+    Despacha notificaciones desde un hilo en segundo plano con una cola acotada.
+    Las ráfagas de una misma categoría se agrupan en un único resumen.
+    """
+    
+    _FLUSH = object()
+    _STOP = object()
+    
+    def __init__(self, handler: NotificationHandler,
+                 queue_size: int = NOTIFICATION_CONFIG["queue_size"],
+                 rate_limits: Optional[Dict] = None,
+                 digests: Optional[Dict] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.handler = handler
+        self.clock = clock
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.rate_limits = rate_limits if rate_limits is not None else NOTIFICATION_CONFIG["rate_limits"]
+        self.digests = digests if digests is not None else NOTIFICATION_CONFIG["digests"]
+        self.windows = {}
+        self.dropped = 0
+        self.worker = None
+        self.start_lock = threading.Lock()
+    
+    def _ensure_worker(self):
+        if self.worker and self.worker.is_alive():
+            return
+        with self.start_lock:
+            if not (self.worker and self.worker.is_alive()):
+                self.worker = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+                self.worker.start()
+    
+    def notify(self, message: str, title: str = "Alibaba Scraper", duration: int = 10,
+               category: Optional[str] = None) -> bool:
+        """Encola una notificación; nunca bloquea al llamador"""
+        if self.handler.sink == "none":
+            return True
+        self._ensure_worker()
+        try:
+            self.queue.put_nowait((category, title, message, duration))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+    
+    def send_captcha_alert(self, message: str = "¡CAPTCHA detectado!",
+                           title: str = "Alibaba Scraper",
+                           duration: int = 10, category: Optional[str] = "captcha") -> bool:
+        return self.notify(message, title, duration, category)
+    
+    def send_success_notification(self, message: str = "Scraping completado exitosamente",
+                                  category: Optional[str] = None) -> bool:
+        return self.notify(message, "Alibaba Scraper - Éxito", 5, category)
+    
+    def send_error_notification(self, message: str = "Error en el scraping",
+                                category: Optional[str] = None) -> bool:
+        return self.notify(message, "Alibaba Scraper - Error", 8, category)
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera a que se entreguen las notificaciones pendientes (y sus resúmenes)"""
+        if not (self.worker and self.worker.is_alive()):
+            return True
+        done = threading.Event()
+        try:
+            self.queue.put((self._FLUSH, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Entrega lo pendiente y detiene el hilo"""
+        if self.worker and self.worker.is_alive():
+            self.flush(timeout)
+            self.queue.put((self._STOP, None))
+            self.worker.join(timeout)
+    
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self._seconds_to_next_digest())
+            except queue.Empty:
+                item = None
+            if item and item[0] is self._STOP:
+                break
+            if item and item[0] is self._FLUSH:
+                self._emit_digests(force=True)
+                item[1].set()
+                continue
+            if item:
+                self._handle(*item)
+            self._emit_digests()
+    
+    def _seconds_to_next_digest(self) -> Optional[float]:
+        pending = [w for w in self.windows.values() if w["suppressed"]]
+        if not pending:
+            return None
+        now = self.clock()
+        return max(0.05, min(w["start"] + w["window"] - now for w in pending))
+    
+    def _handle(self, category: Optional[str], title: str, message: str, duration: int):
+        limit = self.rate_limits.get(category) if category else None
+        if not limit:
+            self._deliver(title, message, duration)
+            return
+        max_immediate, window = limit
+        now = self.clock()
+        state = self.windows.get(category)
+        if state is None or now - state["start"] >= window:
+            if state is not None:
+                self._emit_digest(category, state)
+            state = {"start": now, "window": window, "count": 0, "suppressed": 0,
+                     "title": title, "duration": duration}
+            self.windows[category] = state
+        state["count"] += 1
+        if state["count"] <= max_immediate:
+            self._deliver(title, message, duration)
+        else:
+            state["suppressed"] += 1
+    
+    def _emit_digests(self, force: bool = False):
+        now = self.clock()
+        for category, state in list(self.windows.items()):
+            if force or now - state["start"] >= state["window"]:
+                self._emit_digest(category, state)
+                del self.windows[category]
+    
+    def _emit_digest(self, category: str, state: Dict):
+        if not state["suppressed"]:
+            return
+        template = self.digests.get(category, "{count} notificaciones '" + category + "' en {window}")
+        message = template.format(count=state["count"], window=describe_window(state["window"]))
+        self._deliver(state["title"], message, state["duration"])
+        state["suppressed"] = 0
+    
+    def _deliver(self, title: str, message: str, duration: int):
+        try:
+            self.handler.send_captcha_alert(message=message, title=title, duration=duration)
+        except Exception as e:
+            print(f"Error enviando notificación: {e}")
+
+
+# Instancias globales para usar en otros módulos
+notification_handler = NotificationHandler()
+notification_dispatcher = NotificationDispatcher(notification_handler)
+atexit.register(notification_dispatcher.close, 2.0) 
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Escritores incrementales de salida: cada producto se escribe en cuanto se detalla
+"""
+import csv
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from config import OUTPUT_FILES, CSV_FIELDS, OUTPUT_BACKENDS
+from field_mask import project
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+PART_SUFFIX = ".part"
+
+
+def build_csv_row(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte un producto en una fila del CSV (campos anidados como JSON)"""
+    product = project(product, "csv")
+    row = {k: v for k, v in product.items() if k in CSV_FIELDS}
+    if "prices" in product:
+        row["prices"] = json.dumps(product.get("prices", []))
+    if "attributes" in product:
+        row["attributes"] = json.dumps(product.get("attributes", {}))
+    if "packaging_info" in product:
+        row["packaging_info"] = json.dumps(product.get("packaging_info", {}))
+    if "delivery_lead_times" in product:
+        row["delivery_lead_times"] = json.dumps(product.get("delivery_lead_times", {}))
+    if "images" in product:
+        row["images"] = json.dumps(product.get("images", []))
+    if "iframe_content" in product:
+        row["iframe_content_text"] = product['iframe_content'].get('text', '')[:1000]
+        row["iframe_content_html"] = product['iframe_content'].get('reconstructed_html', '')
+        row["iframe_content_images"] = json.dumps(product['iframe_content'].get('images', []))
+    else:
+        row["iframe_content_text"] = ""
+        row["iframe_content_html"] = ""
+        row["iframe_content_images"] = "[]"
+
+    # Agregar category_id
+    row["category_id"] = product.get("category_id", "N/A")
+
+    # Agregar URL del detalle de Alibaba
+    row["alibaba_detail_url"] = product.get("alibaba_detail_url", "N/A")
+
+    # Manejar información del proveedor
+    if "supplier_name" in product:
+        row["supplier_name"] = product["supplier_name"]
+    elif "supplier_info" in product:
+        supplier = product["supplier_info"]
+        row["supplier_name"] = supplier.get("name", "N/A")
+        row["supplier_type"] = supplier.get("type", "N/A")
+        row["supplier_years"] = supplier.get("years_on_alibaba", "N/A")
+        row["supplier_location"] = supplier.get("location", "N/A")
+        row["supplier_performance"] = json.dumps(supplier.get("performance", {}))
+    else:
+        row["supplier_name"] = "N/A"
+    return row
+
+
+def publish_file(part_path: str, final_path: str):
+    """Publica un archivo de forma atómica conservando la versión anterior como .prev"""
+    if os.path.exists(final_path):
+        os.replace(final_path, final_path + ".prev")
+    os.replace(part_path, final_path)
+
+
+def recover_part_file(final_path: str) -> Optional[str]:
+    """Renombra un .part huérfano de una ejecución interrumpida para no perderlo"""
+    part_path = final_path + PART_SUFFIX
+    if not os.path.exists(part_path) or os.path.getsize(part_path) == 0:
+        return None
+    root, ext = os.path.splitext(final_path)
+    recovered = f"{root}.recovered-{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+    os.replace(part_path, recovered)
+    print(f"⚠️ Salida parcial de una ejecución anterior recuperada en {recovered}")
+    return recovered
+
+
+class PartFileSink(ABC):
+    """Base de los escritores: escriben en <archivo>.part y publican al finalizar"""
+
+    newline = None
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.part_path = filename + PART_SUFFIX
+        self.file = None
+
+    def open(self):
+        recover_part_file(self.filename)
+        self.file = open(self.part_path, mode="a", newline=self.newline, encoding="utf-8")
+        if self.file.tell() == 0:
+            self.write_header()
+
+    def write_header(self):
+        pass
+
+    @abstractmethod
+    def write(self, product: Dict[str, Any]):
+        """Agrega un producto al archivo .part"""
+
+    def finalize(self, publish: bool = True):
+        """Cierra el archivo y lo publica (o lo descarta si no hubo productos)"""
+        if not self.file:
+            return
+        self.file.close()
+        self.file = None
+        if publish:
+            publish_file(self.part_path, self.filename)
+            self.on_published()
+        else:
+            os.remove(self.part_path)
+
+    def on_published(self):
+        print(f"Datos guardados en {self.filename}")
+
+
+class CsvAppender(PartFileSink):
+    """Agrega filas al CSV a medida que llegan; la cabecera se escribe una sola vez"""
+
+    newline = ""
+
+    def __init__(self, filename: str = OUTPUT_FILES['csv']):
+        super().__init__(filename)
+        self.writer = None
+
+    def open(self):
+        super().open()
+        self.writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+
+    def write_header(self):
+        csv.DictWriter(self.file, fieldnames=CSV_FIELDS).writeheader()
+        self.file.flush()
+
+    def write(self, product: Dict[str, Any]):
+        self.writer.writerow(build_csv_row(product))
+        self.file.flush()
+
+
+class JsonLinesWriter(PartFileSink):
+    """Escribe un producto por línea (JSON Lines) y al publicar genera el JSON completo"""
+
+    def __init__(self, filename: str = OUTPUT_FILES['jsonl'], json_filename: Optional[str] = OUTPUT_FILES['json']):
+        super().__init__(filename)
+        self.json_filename = json_filename
+
+    def write(self, product: Dict[str, Any]):
+        self.file.write(json.dumps(project(product, "json"), ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def on_published(self):
+        super().on_published()
+        if self.json_filename:
+            self._write_json_array()
+            print(f"Datos también guardados en {self.json_filename}")
+
+    def _write_json_array(self):
+        """Genera el JSON (arreglo) línea a línea, sin cargar todos los productos"""
+        part_path = self.json_filename + PART_SUFFIX
+        with open(self.filename, encoding="utf-8") as source, \
+                open(part_path, "w", encoding="utf-8") as target:
+            target.write("[")
+            first = True
+            for line in source:
+                line = line.strip()
+                if not line:
+                    continue
+                target.write("\n" if first else ",\n")
+                target.write(line)
+                first = False
+            target.write("\n]\n")
+        publish_file(part_path, self.json_filename)
+
+
+class ImagesReportAppender(PartFileSink):
+    """Versión incremental de save_images_report"""
+
+    def __init__(self, filename: str = OUTPUT_FILES['images_report']):
+        super().__init__(filename)
+        self.count = 0
+
+    def write_header(self):
+        self.file.write("REPORTE DE IMÁGENES DE PRODUCTOS\n")
+        self.file.write("=" * 50 + "\n\n")
+
+    def write(self, product: Dict[str, Any]):
+        self.count += 1
+        if not product.get('images'):
+            return
+        self.file.write(f"Producto {self.count}: {product.get('description', 'Sin descripción')[:100]}...\n")
+        self.file.write(f"URL del producto: {product.get('product_url', 'N/A')}\n")
+        self.file.write(f"Total de imágenes: {len(product['images'])}\n")
+        self.file.write("Imágenes:\n")
+        for j, img_url in enumerate(product['images']):
+            self.file.write(f"  {j+1}. {img_url}\n")
+        self.file.write("\n" + "-" * 50 + "\n\n")
+        self.file.flush()
+
+    def on_published(self):
+        print(f"Reporte de imágenes guardado en {self.filename}")
+
+
+def create_sinks(backends: Optional[List[str]] = None) -> List[Any]:
+    """Construye los escritores de los backends configurados"""
+    sinks = []
+    for backend in backends or OUTPUT_BACKENDS:
+        if backend == "csv":
+            sinks.append(CsvAppender())
+        elif backend == "jsonl":
+            sinks.append(JsonLinesWriter())
+        elif backend == "images_report":
+            sinks.append(ImagesReportAppender())
+        elif backend == "sqlite":
+            from sqlite_store import SQLiteProductStore
+            sinks.append(SQLiteProductStore())
+        else:
+            print(f"⚠️ Backend de salida desconocido: {backend}")
+    return sinks
+
+
+class ProductOutputWriter:
+    """Reparte cada producto entre todos los escritores de salida"""
+
+    def __init__(self, sinks: Optional[List[Any]] = None):
+        self.sinks = sinks if sinks is not None else create_sinks()
+        self.count = 0
+        self.is_open = False
+
+    def open(self):
+        for sink in self.sinks:
+            sink.open()
+        self.is_open = True
+
+    def write(self, product: Dict[str, Any]):
+        """Escribe el producto en todas las salidas; el llamador puede liberarlo después"""
+        for sink in self.sinks:
+            try:
+                sink.write(product)
+            except Exception as e:
+                logger.error("Error escribiendo en %s: %s", type(sink).__name__, e)
+        self.count += 1
+
+    def finalize(self):
+        """Cierra y publica atómicamente todas las salidas (se descartan si no hubo productos)"""
+        if not self.is_open:
+            return
+        for sink in self.sinks:
+            try:
+                sink.finalize(publish=self.count > 0)
+            except Exception as e:
+                logger.error("Error finalizando %s: %s", type(sink).__name__, e)
+        self.is_open = False
@@ -0,0 +1,173 @@
+"""
+Limpieza de perfiles temporales y procesos Chrome dejados por ejecuciones muertas
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from config import JANITOR_CONFIG
+from browser_profile import pid_alive
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+PROFILE_PREFIX = "chrome_scraper_"
+OWNER_FILE = "scraper_owner.json"
+
+
+def register_profile(user_data_dir: str, chromedriver_pid: Optional[int] = None):
+    """Anota en el perfil qué proceso del scraper (y qué chromedriver) lo usa"""
+    owner = {"pid": os.getpid(), "chromedriver_pid": chromedriver_pid, "created": time.time()}
+    try:
+        with open(os.path.join(user_data_dir, OWNER_FILE), "w", encoding="utf-8") as f:
+            json.dump(owner, f)
+    except OSError as e:
+        print(f"⚠️ No se pudo registrar el perfil {user_data_dir}: {e}")
+
+
+def read_owner(user_data_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(user_data_dir, OWNER_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total / (1024 * 1024)
+
+
+class ProcessJanitor:
+    """Barre perfiles y procesos cuyo dueño ya no existe, al inicio y periódicamente"""
+
+    def __init__(self, config: Dict[str, Any] = JANITOR_CONFIG):
+        self.config = config
+        self.temp_dir = config.get("temp_dir") or tempfile.gettempdir()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def profile_dirs(self) -> List[str]:
+        try:
+            names = os.listdir(self.temp_dir)
+        except OSError:
+            return []
+        return [os.path.join(self.temp_dir, n) for n in names
+                if n.startswith(PROFILE_PREFIX) and os.path.isdir(os.path.join(self.temp_dir, n))]
+
+    def is_stale(self, user_data_dir: str) -> bool:
+        """Un perfil es huérfano si su dueño murió (o, sin registro, si es antiguo)"""
+        if not os.path.isdir(user_data_dir):
+            return True
+        owner = read_owner(user_data_dir)
+        if owner:
+            return not pid_alive(int(owner.get("pid") or 0))
+        try:
+            age = time.time() - os.path.getmtime(user_data_dir)
+        except OSError:
+            return False
+        return age > self.config["grace_period"]
+
+    def _chrome_processes(self) -> Dict[str, list]:
+        """Procesos Chrome del scraper agrupados por su --user-data-dir"""
+        by_dir = {}
+        for proc in psutil.process_iter(["pid", "cmdline"]):
+            try:
+                for arg in proc.info["cmdline"] or []:
+                    if arg.startswith("--user-data-dir="):
+                        path = arg.split("=", 1)[1].strip('"')
+                        if os.path.basename(path).startswith(PROFILE_PREFIX):
+                            by_dir.setdefault(os.path.normpath(path), []).append(proc)
+                        break
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return by_dir
+
+    def _kill_tree(self, processes: list, chromedriver_pid: Optional[int]) -> int:
+        """Mata los Chrome del perfil y su chromedriver; devuelve cuántos procesos terminó"""
+        victims = {}
+        for proc in processes:
+            victims[proc.pid] = proc
+            try:
+                parent = proc.parent()
+                if parent and "chromedriver" in (parent.name() or "").lower():
+                    victims[parent.pid] = parent
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if chromedriver_pid and chromedriver_pid not in victims:
+            try:
+                proc = psutil.Process(chromedriver_pid)
+                # Un PID reutilizado por otro programa nunca se toca
+                if "chromedriver" in (proc.name() or "").lower():
+                    victims[proc.pid] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+        killed = 0
+        for proc in victims.values():
+            try:
+                proc.kill()
+                killed += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if victims:
+            psutil.wait_procs(list(victims.values()), timeout=5)
+        return killed
+
+    def sweep(self) -> Dict[str, Any]:
+        """Un barrido completo: procesos primero (liberan los archivos) y luego perfiles"""
+        result = {"profiles": 0, "processes": 0, "freed_mb": 0.0}
+        stale_dirs = {os.path.normpath(d) for d in self.profile_dirs() if self.is_stale(d)}
+
+        if PSUTIL_AVAILABLE:
+            for path, processes in self._chrome_processes().items():
+                # También se matan los Chrome cuyo perfil ya fue borrado
+                if path in stale_dirs or not os.path.isdir(path):
+                    owner = read_owner(path) or {}
+                    result["processes"] += self._kill_tree(processes, owner.get("chromedriver_pid"))
+
+        for path in stale_dirs:
+            size = _dir_size_mb(path)
+            shutil.rmtree(path, ignore_errors=True)
+            if not os.path.exists(path):
+                result["profiles"] += 1
+                result["freed_mb"] += size
+
+        if result["profiles"] or result["processes"]:
+            print(f"🧹 Limpieza: {result['profiles']} perfiles huérfanos ({result['freed_mb']:.0f} MB) "
+                  f"y {result['processes']} procesos Chrome terminados")
+        return result
+
+    def start(self):
+        """Barridos periódicos en un hilo de fondo"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.config["interval"]):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️ Error en la limpieza periódica: {e}")
+
+
+# Instancia global del janitor
+process_janitor = ProcessJanitor()
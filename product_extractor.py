@@ -7,12 +7,22 @@ import re
 from typing import List, Dict, Any
 from selenium.webdriver.common.by import By
 from config import SELECTORS, TIMEOUTS
+from field_mask import wanted_fields, wanted_subfields
+from instrumentation import phase
+from js_profiling import js_profiler
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class ProductExtractor:
     def __init__(self, driver_manager):
         self.driver_manager = driver_manager
-        self.driver = driver_manager.driver
+    
+    @property
+    def driver(self):
+        """Driver activo (cambia cuando el DriverManager rota la identidad)"""
+        return self.driver_manager.driver
     
     def extract_products_optimized(self) -> List[Dict[str, Any]]:
         """Extracción optimizada de productos"""
@@ -48,250 +58,274 @@ class ProductExtractor:
         """
         
         try:
-            products_data = self.driver.execute_script(js_extract, product_elements)
+            products_data = js_profiler.execute(self.driver, "search_listing", js_extract, product_elements)
             for product in products_data:
                 if product['description'] != 'N/A' or product['price'] != 'N/A':
                     page_products.append(product)
         except Exception as e:
-            print(f"Error en extracción: {e}")
+            logger.warning("Error en extracción: %s", e)
         
         return page_products
     
+    @phase("detail")
     def get_detailed_product_info_fast(self, product_url: str) -> Dict[str, Any]:
         """Obtiene información detallada del producto con manejo de errores mejorado"""
         try:
-            if not self.driver_manager.reload_page_with_retry(product_url):
-                print(f"No se pudo cargar la página del producto: {product_url}")
+            if not self.driver_manager.reload_page_with_retry(product_url, page_type="detail"):
+                logger.warning("No se pudo cargar la página del producto", extra={"url": product_url})
                 return {}
             
             self.driver_manager.wait_for_element_clickable(SELECTORS["price_container"], timeout=5)
             
+            # Solo se extraen los campos que piden los consumidores activos
+            fields = wanted_fields()
+            
             # Extracción con JavaScript
-            details = self._extract_product_details_js()
+            details = self._extract_product_details_js(fields)
             
             # Información del proveedor
-            try:
-                supplier_section = self.driver.find_element(
-                    By.CSS_SELECTOR, SELECTORS["supplier_section"]
-                )
-                supplier_info = self._extract_supplier_info(supplier_section)
-                details['supplier_info'] = supplier_info
-            except:
-                details['supplier_info'] = {}
+            if 'supplier_info' in fields:
+                with phase("supplier"):
+                    try:
+                        supplier_section = self.driver.find_element(
+                            By.CSS_SELECTOR, SELECTORS["supplier_section"]
+                        )
+                        supplier_info = self._extract_supplier_info(supplier_section)
+                        details['supplier_info'] = supplier_info
+                    except:
+                        details['supplier_info'] = {}
             
             # Obtener contenido del iframe
-            details['iframe_content'] = self._extract_iframe_content()
+            if 'iframe_content' in fields:
+                with phase("iframe"):
+                    details['iframe_content'] = self._extract_iframe_content()
             
-            if not details.get('images') or len(details['images']) == 0:
-                details['images'] = self._extract_images_selenium()
+            if 'images' in fields and (not details.get('images') or len(details['images']) == 0):
+                with phase("images"):
+                    details['images'] = self._extract_images_selenium()
             
-            print(f"Imágenes encontradas: {len(details.get('images', []))}")
+            logger.debug("Imágenes encontradas: %d", len(details.get('images', [])))
             
             return details
             
         except Exception as e:
-            print(f"Error obteniendo detalles del producto: {e}")
+            logger.warning("Error obteniendo detalles del producto: %s", e, extra={"error_type": type(e).__name__})
             return {}
     
-    def _extract_product_details_js(self) -> Dict[str, Any]:
-        """Extrae detalles del producto usando JavaScript"""
+    def _extract_product_details_js(self, fields: List[str]) -> Dict[str, Any]:
+        """Extrae detalles del producto usando JavaScript (solo los campos pedidos)"""
         details_js = """
         const details = {};
+        const requested = new Set(arguments[0]);
+        const wants = field => requested.has(field);
         
         // Precios
-        details.prices = [];
-        
-        // Intentar extraer precios con estructura de escalera (múltiples rangos)
-        const priceContainer = document.querySelector('div[data-testid="ladder-price"]');
-        if (priceContainer) {
-            const priceItems = priceContainer.querySelectorAll('.price-item');
-            priceItems.forEach(item => {
-                const allDivs = item.querySelectorAll('div');
-                let quantityText = '';
-                let priceText = '';
+        if (wants('prices')) {
+            details.prices = [];
+        
+            // Intentar extraer precios con estructura de escalera (múltiples rangos)
+            const priceContainer = document.querySelector('div[data-testid="ladder-price"]');
+            if (priceContainer) {
+                const priceItems = priceContainer.querySelectorAll('.price-item');
+                priceItems.forEach(item => {
+                    const allDivs = item.querySelectorAll('div');
+                    let quantityText = '';
+                    let priceText = '';
                 
-                allDivs.forEach(div => {
-                    const classes = div.className || '';
-                    if (classes.includes('text-sm') && classes.includes('666') && !quantityText) {
-                        quantityText = div.textContent.trim();
-                    }
-                });
+                    allDivs.forEach(div => {
+                        const classes = div.className || '';
+                        if (classes.includes('text-sm') && classes.includes('666') && !quantityText) {
+                            quantityText = div.textContent.trim();
+                        }
+                    });
                 
-                const priceSpans = item.querySelectorAll('span');
-                if (priceSpans.length > 0) {
-                    priceText = priceSpans[0].textContent.trim();
-                }
+                    const priceSpans = item.querySelectorAll('span');
+                    if (priceSpans.length > 0) {
+                        priceText = priceSpans[0].textContent.trim();
+                    }
                 
-                if (!quantityText && allDivs.length > 0) {
-                    quantityText = allDivs[0].textContent.trim();
-                }
+                    if (!quantityText && allDivs.length > 0) {
+                        quantityText = allDivs[0].textContent.trim();
+                    }
                 
-                if (quantityText && priceText) {
-                    details.prices.push({
-                        quantity: quantityText,
-                        price: priceText
-                    });
-                }
-            });
-        }
+                    if (quantityText && priceText) {
+                        details.prices.push({
+                            quantity: quantityText,
+                            price: priceText
+                        });
+                    }
+                });
+            }
         
-        // Si no hay precios con estructura de escalera, intentar con estructura de rango único
-        if (details.prices.length === 0) {
-            const singlePriceContainer = document.querySelector('div[data-testid="range-price"]');
-            if (singlePriceContainer) {
-                // Extraer cantidad mínima de pedido - tomar el primer div
-                const firstDiv = singlePriceContainer.querySelector('div');
-                const moqText = firstDiv ? firstDiv.textContent.trim() : '';
+            // Si no hay precios con estructura de escalera, intentar con estructura de rango único
+            if (details.prices.length === 0) {
+                const singlePriceContainer = document.querySelector('div[data-testid="range-price"]');
+                if (singlePriceContainer) {
+                    // Extraer cantidad mínima de pedido - tomar el primer div
+                    const firstDiv = singlePriceContainer.querySelector('div');
+                    const moqText = firstDiv ? firstDiv.textContent.trim() : '';
                 
-                // Extraer rango de precios - tomar el primer span
-                const firstSpan = singlePriceContainer.querySelector('span');
-                const priceText = firstSpan ? firstSpan.textContent.trim() : '';
+                    // Extraer rango de precios - tomar el primer span
+                    const firstSpan = singlePriceContainer.querySelector('span');
+                    const priceText = firstSpan ? firstSpan.textContent.trim() : '';
                 
-                if (moqText && priceText) {
-                    details.prices.push({
-                        quantity: moqText,
-                        price: priceText
-                    });
-                } else if (priceText) {
-                    details.prices.push({
-                        quantity: 'Cantidad mínima no especificada',
-                        price: priceText
-                    });
+                    if (moqText && priceText) {
+                        details.prices.push({
+                            quantity: moqText,
+                            price: priceText
+                        });
+                    } else if (priceText) {
+                        details.prices.push({
+                            quantity: 'Cantidad mínima no especificada',
+                            price: priceText
+                        });
+                    }
                 }
             }
         }
         
         // Atributos
-        let attrContainer = document.querySelector('div[data-testid="module-attribute"]');
-        if (!attrContainer) {
-            attrContainer = document.querySelector('div[data-module-name="module_attribute"]');
+        let attrContainer = null;
+        if (wants('attributes') || wants('packaging_info')) {
+            attrContainer = document.querySelector('div[data-testid="module-attribute"]');
+            if (!attrContainer) {
+                attrContainer = document.querySelector('div[data-module-name="module_attribute"]');
+            }
         }
         
-        details.attributes = {};
-        if (attrContainer) {
-            // Buscar TODAS las filas de atributos en cualquier nivel del contenedor
-            const allAttrRows = attrContainer.querySelectorAll('div.id-grid');
+        if (wants('attributes')) {
+            details.attributes = {};
+            if (attrContainer) {
+                // Buscar TODAS las filas de atributos en cualquier nivel del contenedor
+                const allAttrRows = attrContainer.querySelectorAll('div.id-grid');
             
-            allAttrRows.forEach(row => {
-                // Verificar que esta fila no esté en la sección de embalaje
-                const isInPackagingSection = row.closest('div').querySelector('h3') && 
-                                           row.closest('div').querySelector('h3').textContent.includes('Embalaje y entrega');
+                allAttrRows.forEach(row => {
+                    // Verificar que esta fila no esté en la sección de embalaje
+                    const isInPackagingSection = row.closest('div').querySelector('h3') && 
+                                               row.closest('div').querySelector('h3').textContent.includes('Embalaje y entrega');
                 
-                if (!isInPackagingSection) {
-                    // Buscar todos los divs dentro de la fila que tengan las clases específicas
-                    const keyDiv = row.querySelector('div[class*="id-bg-[#f8f8f8]"]');
-                    const valueDiv = row.querySelector('div[class*="id-font-medium"]');
+                    if (!isInPackagingSection) {
+                        // Buscar todos los divs dentro de la fila que tengan las clases específicas
+                        const keyDiv = row.querySelector('div[class*="id-bg-[#f8f8f8]"]');
+                        const valueDiv = row.querySelector('div[class*="id-font-medium"]');
                     
-                    if (keyDiv && valueDiv) {
-                        // Extraer texto de los elementos internos o del div mismo
-                        const keyElement = keyDiv.querySelector('.id-line-clamp-2') || keyDiv;
-                        const valueElement = valueDiv.querySelector('.id-line-clamp-2') || valueDiv;
+                        if (keyDiv && valueDiv) {
+                            // Extraer texto de los elementos internos o del div mismo
+                            const keyElement = keyDiv.querySelector('.id-line-clamp-2') || keyDiv;
+                            const valueElement = valueDiv.querySelector('.id-line-clamp-2') || valueDiv;
                         
-                        const keyText = keyElement.textContent.trim();
-                        const valueText = valueElement.textContent.trim();
+                            const keyText = keyElement.textContent.trim();
+                            const valueText = valueElement.textContent.trim();
                         
-                        if (keyText && valueText) {
-                            details.attributes[keyText] = valueText;
+                            if (keyText && valueText) {
+                                details.attributes[keyText] = valueText;
+                            }
                         }
                     }
-                }
-            });
+                });
+            }
         }
         
         // Información del proveedor
-        details.supplier_name = 'N/A';
-        const companyContainer = document.querySelector('.product-company');
-        if (companyContainer) {
-            const companyNameElement = companyContainer.querySelector('.company-name a');
-            if (companyNameElement) {
-                details.supplier_name = companyNameElement.textContent.trim();
-            } else {
-                // Fallback: buscar cualquier enlace con el nombre de la empresa
-                const companyLink = companyContainer.querySelector('a[title]');
-                if (companyLink) {
-                    details.supplier_name = companyLink.getAttribute('title') || companyLink.textContent.trim();
+        if (wants('supplier_name')) {
+            details.supplier_name = 'N/A';
+            const companyContainer = document.querySelector('.product-company');
+            if (companyContainer) {
+                const companyNameElement = companyContainer.querySelector('.company-name a');
+                if (companyNameElement) {
+                    details.supplier_name = companyNameElement.textContent.trim();
+                } else {
+                    // Fallback: buscar cualquier enlace con el nombre de la empresa
+                    const companyLink = companyContainer.querySelector('a[title]');
+                    if (companyLink) {
+                        details.supplier_name = companyLink.getAttribute('title') || companyLink.textContent.trim();
+                    }
                 }
             }
         }
         
         // Información de embalaje (separar de atributos generales)
-        details.packaging_info = {};
-        if (attrContainer) {
-            // Buscar el h3 que contenga "Embalaje y entrega"
-            const h3Elements = attrContainer.querySelectorAll('h3');
-            let packagingSection = null;
-            for (const h3 of h3Elements) {
-                if (h3.textContent.includes('Embalaje y entrega')) {
-                    packagingSection = h3;
-                    break;
-                }
-            }
-            
-            // Si no se encuentra en h3, buscar en cualquier elemento que contenga el texto
-            if (!packagingSection) {
-                const allElements = attrContainer.querySelectorAll('*');
-                for (const element of allElements) {
-                    if (element.textContent && element.textContent.includes('Embalaje y entrega')) {
-                        packagingSection = element;
+        if (wants('packaging_info')) {
+            details.packaging_info = {};
+            if (attrContainer) {
+                // Buscar el h3 que contenga "Embalaje y entrega"
+                const h3Elements = attrContainer.querySelectorAll('h3');
+                let packagingSection = null;
+                for (const h3 of h3Elements) {
+                    if (h3.textContent.includes('Embalaje y entrega')) {
+                        packagingSection = h3;
                         break;
                     }
                 }
-            }
             
-            if (packagingSection) {
-                // Buscar el contenedor de embalaje - puede estar en diferentes estructuras
-                let packagingContainer = packagingSection.closest('div').querySelector('.id-grid');
-                if (!packagingContainer) {
-                    // Buscar en la estructura alternativa
-                    const nextDiv = packagingSection.closest('div').nextElementSibling;
-                    if (nextDiv) {
-                        packagingContainer = nextDiv.querySelector('.id-grid');
+                // Si no se encuentra en h3, buscar en cualquier elemento que contenga el texto
+                if (!packagingSection) {
+                    const allElements = attrContainer.querySelectorAll('*');
+                    for (const element of allElements) {
+                        if (element.textContent && element.textContent.includes('Embalaje y entrega')) {
+                            packagingSection = element;
+                            break;
+                        }
                     }
                 }
+            
+                if (packagingSection) {
+                    // Buscar el contenedor de embalaje - puede estar en diferentes estructuras
+                    let packagingContainer = packagingSection.closest('div').querySelector('.id-grid');
+                    if (!packagingContainer) {
+                        // Buscar en la estructura alternativa
+                        const nextDiv = packagingSection.closest('div').nextElementSibling;
+                        if (nextDiv) {
+                            packagingContainer = nextDiv.querySelector('.id-grid');
+                        }
+                    }
                 
-                if (packagingContainer) {
-                    const packagingRows = packagingContainer.querySelectorAll('div.id-grid');
-                    packagingRows.forEach(row => {
-                        const keyDiv = row.querySelector('div[class*="id-bg-[#f8f8f8]"]');
-                        const valueDiv = row.querySelector('div[class*="id-font-medium"]');
+                    if (packagingContainer) {
+                        const packagingRows = packagingContainer.querySelectorAll('div.id-grid');
+                        packagingRows.forEach(row => {
+                            const keyDiv = row.querySelector('div[class*="id-bg-[#f8f8f8]"]');
+                            const valueDiv = row.querySelector('div[class*="id-font-medium"]');
                         
-                        if (keyDiv && valueDiv) {
-                            const keyElement = keyDiv.querySelector('.id-line-clamp-2') || keyDiv;
-                            const valueElement = valueDiv.querySelector('.id-line-clamp-2') || valueDiv;
+                            if (keyDiv && valueDiv) {
+                                const keyElement = keyDiv.querySelector('.id-line-clamp-2') || keyDiv;
+                                const valueElement = valueDiv.querySelector('.id-line-clamp-2') || valueDiv;
                             
-                            const keyText = keyElement.textContent.trim();
-                            const valueText = valueElement.textContent.trim();
+                                const keyText = keyElement.textContent.trim();
+                                const valueText = valueElement.textContent.trim();
                             
-                            if (keyText && valueText) {
-                                details.packaging_info[keyText] = valueText;
+                                if (keyText && valueText) {
+                                    details.packaging_info[keyText] = valueText;
+                                }
                             }
-                        }
-                    });
+                        });
+                    }
                 }
             }
         }
         
         // Plazos de entrega
-        details.delivery_lead_times = {};
-        const leadTimeContainer = document.querySelector('div[data-module-name="module_lead"]');
-        if (leadTimeContainer) {
-            const table = leadTimeContainer.querySelector('table');
-            if (table) {
-                const rows = table.querySelectorAll('tr');
-                if (rows.length >= 2) {
-                    const headerRow = rows[0];
-                    const dataRow = rows[1];
+        if (wants('delivery_lead_times')) {
+            details.delivery_lead_times = {};
+            const leadTimeContainer = document.querySelector('div[data-module-name="module_lead"]');
+            if (leadTimeContainer) {
+                const table = leadTimeContainer.querySelector('table');
+                if (table) {
+                    const rows = table.querySelectorAll('tr');
+                    if (rows.length >= 2) {
+                        const headerRow = rows[0];
+                        const dataRow = rows[1];
                     
-                    const headers = headerRow.querySelectorAll('td');
-                    const values = dataRow.querySelectorAll('td');
+                        const headers = headerRow.querySelectorAll('td');
+                        const values = dataRow.querySelectorAll('td');
                     
-                    if (headers.length > 1 && values.length > 1) {
-                        // El primer td es el título, los demás son los rangos
-                        for (let i = 1; i < headers.length && i < values.length; i++) {
-                            const range = headers[i].textContent.trim();
-                            const time = values[i].textContent.trim();
-                            if (range && time) {
-                                details.delivery_lead_times[range] = time;
+                        if (headers.length > 1 && values.length > 1) {
+                            // El primer td es el título, los demás son los rangos
+                            for (let i = 1; i < headers.length && i < values.length; i++) {
+                                const range = headers[i].textContent.trim();
+                                const time = values[i].textContent.trim();
+                                if (range && time) {
+                                    details.delivery_lead_times[range] = time;
+                                }
                             }
                         }
                     }
@@ -300,97 +334,107 @@ class ProductExtractor:
         }
         
         // URL del detalle de Alibaba
-        details.alibaba_detail_url = window.location.href;
+        if (wants('alibaba_detail_url')) {
+            details.alibaba_detail_url = window.location.href;
+        }
         
         // Descripción
-        const descLayout = document.getElementById('description-layout') || 
-                            document.querySelector('.description-layout');
-        details.detailed_description_html = descLayout ? descLayout.outerHTML : 'N/A';
-        details.detailed_description_text = descLayout ? descLayout.textContent.trim() : 'N/A';
+        if (wants('detailed_description_html') || wants('detailed_description_text')) {
+            const descLayout = document.getElementById('description-layout') || 
+                                document.querySelector('.description-layout');
+            if (wants('detailed_description_html')) {
+                details.detailed_description_html = descLayout ? descLayout.outerHTML : 'N/A';
+            }
+            if (wants('detailed_description_text')) {
+                details.detailed_description_text = descLayout ? descLayout.textContent.trim() : 'N/A';
+            }
+        }
         
         // Imágenes
-        details.images = [];
-        
-        // Imágenes principales
-        const mainImages = document.querySelectorAll('img[data-testid="media-image"], div[data-testid="media-image"] img');
-        mainImages.forEach(img => {
-            const src = img.src || img.getAttribute('src');
-            if (src && !src.includes('data:') && !details.images.includes(src)) {
-                details.images.push(src);
-            }
-        });
+        if (wants('images')) {
+            details.images = [];
+        
+            // Imágenes principales
+            const mainImages = document.querySelectorAll('img[data-testid="media-image"], div[data-testid="media-image"] img');
+            mainImages.forEach(img => {
+                const src = img.src || img.getAttribute('src');
+                if (src && !src.includes('data:') && !details.images.includes(src)) {
+                    details.images.push(src);
+                }
+            });
         
-        // Imágenes del carrusel
-        const carouselImages = document.querySelectorAll([
-            'div[data-module="MainImage"] img[src*="alicdn.com"]',
-            'div.main-index img[src*="alicdn.com"]',
-            'img[alt*="producto"]',
-            'img[alt*="product"]',
-            'video[poster]'
-        ].join(','));
-        
-        carouselImages.forEach(element => {
-            let imgUrl = '';
-            if (element.tagName === 'VIDEO') {
-                imgUrl = element.getAttribute('poster');
-            } else {
-                imgUrl = element.src || element.getAttribute('src');
-            }
+            // Imágenes del carrusel
+            const carouselImages = document.querySelectorAll([
+                'div[data-module="MainImage"] img[src*="alicdn.com"]',
+                'div.main-index img[src*="alicdn.com"]',
+                'img[alt*="producto"]',
+                'img[alt*="product"]',
+                'video[poster]'
+            ].join(','));
+        
+            carouselImages.forEach(element => {
+                let imgUrl = '';
+                if (element.tagName === 'VIDEO') {
+                    imgUrl = element.getAttribute('poster');
+                } else {
+                    imgUrl = element.src || element.getAttribute('src');
+                }
             
-            if (imgUrl && !imgUrl.includes('data:') && !imgUrl.includes('.gif')) {
-                imgUrl = imgUrl.replace(/_\\d+x\\d+.*\\.jpg/, '_720x720q50.jpg');
-                if (!details.images.includes(imgUrl)) {
-                    details.images.push(imgUrl);
+                if (imgUrl && !imgUrl.includes('data:') && !imgUrl.includes('.gif')) {
+                    imgUrl = imgUrl.replace(/_\\d+x\\d+.*\\.jpg/, '_720x720q50.jpg');
+                    if (!details.images.includes(imgUrl)) {
+                        details.images.push(imgUrl);
+                    }
                 }
-            }
-        });
+            });
         
-        // Extraer videos del carrusel principal
-        const carouselVideos = document.querySelectorAll([
-            'div[data-module="MainImage"] video',
-            'div.main-index video',
-            '.detail-video-container video',
-            'div[data-submodule="ProductImageMain"] video'
-        ].join(','));
-        
-        carouselVideos.forEach(video => {
-            const videoSrc = video.src || video.getAttribute('src');
-            if (videoSrc && !videoSrc.includes('data:') && !details.images.includes(videoSrc)) {
-                details.images.push(videoSrc);
-            }
-        });
+            // Extraer videos del carrusel principal
+            const carouselVideos = document.querySelectorAll([
+                'div[data-module="MainImage"] video',
+                'div.main-index video',
+                '.detail-video-container video',
+                'div[data-submodule="ProductImageMain"] video'
+            ].join(','));
+        
+            carouselVideos.forEach(video => {
+                const videoSrc = video.src || video.getAttribute('src');
+                if (videoSrc && !videoSrc.includes('data:') && !details.images.includes(videoSrc)) {
+                    details.images.push(videoSrc);
+                }
+            });
         
-        // Extraer videos de elementos source dentro de video
-        const videoSources = document.querySelectorAll([
-            'div[data-module="MainImage"] video source',
-            'div.main-index video source',
-            '.detail-video-container video source',
-            'div[data-submodule="ProductImageMain"] video source'
-        ].join(','));
-        
-        videoSources.forEach(source => {
-            const sourceSrc = source.src || source.getAttribute('data-src');
-            if (sourceSrc && !sourceSrc.includes('data:') && !details.images.includes(sourceSrc)) {
-                details.images.push(sourceSrc);
-            }
-        });
+            // Extraer videos de elementos source dentro de video
+            const videoSources = document.querySelectorAll([
+                'div[data-module="MainImage"] video source',
+                'div.main-index video source',
+                '.detail-video-container video source',
+                'div[data-submodule="ProductImageMain"] video source'
+            ].join(','));
+        
+            videoSources.forEach(source => {
+                const sourceSrc = source.src || source.getAttribute('data-src');
+                if (sourceSrc && !sourceSrc.includes('data:') && !details.images.includes(sourceSrc)) {
+                    details.images.push(sourceSrc);
+                }
+            });
         
-        details.images = [...new Set(details.images)].map(url => {
-            if (url.startsWith('//')) {
-                return 'https:' + url;
-            }
-            return url;
-        });
+            details.images = [...new Set(details.images)].map(url => {
+                if (url.startsWith('//')) {
+                    return 'https:' + url;
+                }
+                return url;
+            });
         
-        // LIMITAR A MÁXIMO 15 IMÁGENES
-        if (details.images.length > 15) {
-            details.images = details.images.slice(0, 15);
+            // LIMITAR A MÁXIMO 15 IMÁGENES
+            if (details.images.length > 15) {
+                details.images = details.images.slice(0, 15);
+            }
         }
         
         return details;
         """
         
-        return self.driver.execute_script(details_js)
+        return js_profiler.execute(self.driver, "product_details", details_js, fields)
     
     def _extract_supplier_info(self, supplier_section) -> Dict[str, Any]:
         """Extrae información del proveedor"""
@@ -423,7 +467,7 @@ class ProductExtractor:
         """
         
         try:
-            supplier_info = self.driver.execute_script(supplier_js, supplier_section)
+            supplier_info = js_profiler.execute(self.driver, "supplier_info", supplier_js, supplier_section)
         except:
             supplier_info = {"name": "N/A", "type": "N/A", "years_on_alibaba": "N/A", "location": "N/A"}
         
@@ -455,30 +499,30 @@ class ProductExtractor:
                     else:
                         iframe_url = iframe_src
                     
-                    self.driver.get(iframe_url)
-                    time.sleep(1)
+                    self.driver_manager.navigate(iframe_url, page_type="iframe")
                     
-                    iframe_content = self._extract_iframe_content_js()
+                    iframe_content = self._extract_iframe_content_js(wanted_subfields('iframe_content'))
                     
-                    self.driver.get(current_url)
-                    time.sleep(1)
+                    self.driver_manager.navigate(current_url, page_type="detail")
                     
                     return iframe_content
                 else:
-                    print("Iframe encontrado pero sin src válido")
+                    logger.debug("Iframe encontrado pero sin src válido")
                     return {'html': '', 'text': '', 'images': [], 'reconstructed_html': ''}
             else:
-                print("No se encontró iframe de descripción")
+                logger.debug("No se encontró iframe de descripción")
                 return {'html': '', 'text': '', 'images': [], 'reconstructed_html': ''}
                 
         except Exception as e:
-            print(f"Error con iframe: {e}")
+            logger.warning("Error con iframe: %s", e)
             return {'html': '', 'text': '', 'images': [], 'reconstructed_html': ''}
     
-    def _extract_iframe_content_js(self) -> Dict[str, Any]:
-        """Extrae contenido del iframe usando JavaScript"""
+    def _extract_iframe_content_js(self, fields: List[str]) -> Dict[str, Any]:
+        """Extrae contenido del iframe usando JavaScript (solo los subcampos pedidos)"""
         iframe_content_js = """
         const content = {};
+        const requested = new Set(arguments[0]);
+        const wants = field => requested.has(field);
         
         // Crear una copia del body para trabajar sin modificar el original
         const bodyClone = document.body.cloneNode(true);
@@ -508,50 +552,61 @@ class ProductExtractor:
             });
         });
         
-        content.html = bodyClone.innerHTML;
-        content.text = bodyClone.innerText;
+        // El HTML crudo y el texto completo solo viajan si algún consumidor los pide
+        if (wants('html')) {
+            content.html = bodyClone.innerHTML;
+        }
+        if (wants('text')) {
+            content.text = bodyClone.innerText;
+        }
         
-        content.images = [];
+        if (wants('images')) {
+            content.images = [];
         
-        // Extraer imágenes
-        const imgs = bodyClone.querySelectorAll('img');
-        imgs.forEach(img => {
-            const src = img.src || img.getAttribute('data-src');
-            if (src && !src.includes('data:') && !src.includes('.gif')) {
-                content.images.push(src.startsWith('//') ? 'https:' + src : src);
-            }
-        });
+            // Extraer imágenes
+            const imgs = bodyClone.querySelectorAll('img');
+            imgs.forEach(img => {
+                const src = img.src || img.getAttribute('data-src');
+                if (src && !src.includes('data:') && !src.includes('.gif')) {
+                    content.images.push(src.startsWith('//') ? 'https:' + src : src);
+                }
+            });
         
-        // Extraer videos
-        const videos = bodyClone.querySelectorAll('video');
-        videos.forEach(video => {
-            const src = video.src || video.getAttribute('data-src');
-            if (src && !src.includes('data:')) {
-                content.images.push(src.startsWith('//') ? 'https:' + src : src);
-            }
-        });
+            // Extraer videos
+            const videos = bodyClone.querySelectorAll('video');
+            videos.forEach(video => {
+                const src = video.src || video.getAttribute('data-src');
+                if (src && !src.includes('data:')) {
+                    content.images.push(src.startsWith('//') ? 'https:' + src : src);
+                }
+            });
         
-        // Extraer videos de elementos iframe (videos embebidos)
-        const videoIframes = bodyClone.querySelectorAll('iframe[src*="video"], iframe[src*="youtube"], iframe[src*="vimeo"]');
-        videoIframes.forEach(iframe => {
-            const src = iframe.src;
-            if (src && !src.includes('data:')) {
-                content.images.push(src.startsWith('//') ? 'https:' + src : src);
-            }
-        });
+            // Extraer videos de elementos iframe (videos embebidos)
+            const videoIframes = bodyClone.querySelectorAll('iframe[src*="video"], iframe[src*="youtube"], iframe[src*="vimeo"]');
+            videoIframes.forEach(iframe => {
+                const src = iframe.src;
+                if (src && !src.includes('data:')) {
+                    content.images.push(src.startsWith('//') ? 'https:' + src : src);
+                }
+            });
         
-        // Extraer videos de elementos source dentro de video
-        const videoSources = bodyClone.querySelectorAll('video source');
-        videoSources.forEach(source => {
-            const src = source.src || source.getAttribute('data-src');
-            if (src && !src.includes('data:')) {
-                content.images.push(src.startsWith('//') ? 'https:' + src : src);
-            }
-        });
+            // Extraer videos de elementos source dentro de video
+            const videoSources = bodyClone.querySelectorAll('video source');
+            videoSources.forEach(source => {
+                const src = source.src || source.getAttribute('data-src');
+                if (src && !src.includes('data:')) {
+                    content.images.push(src.startsWith('//') ? 'https:' + src : src);
+                }
+            });
         
-        // LIMITAR A MÁXIMO 15 IMÁGENES
-        if (content.images.length > 15) {
-            content.images = content.images.slice(0, 15);
+            // LIMITAR A MÁXIMO 15 IMÁGENES
+            if (content.images.length > 15) {
+                content.images = content.images.slice(0, 15);
+            }
+        }
+
+        if (!wants('reconstructed_html')) {
+            return content;
         }
 
         // GENERAR HTML RECONSTRUIDO
@@ -698,7 +753,7 @@ class ProductExtractor:
         return content;
         """
         
-        return self.driver.execute_script(iframe_content_js)
+        return js_profiler.execute(self.driver, "iframe_content", iframe_content_js, fields)
     
     def _extract_images_selenium(self) -> List[str]:
         """Método de respaldo para extraer imágenes y videos usando Selenium"""
@@ -766,7 +821,7 @@ class ProductExtractor:
                     continue
             
         except Exception as e:
-            print(f"Error extrayendo imágenes y videos con Selenium: {e}")
+            logger.warning("Error extrayendo imágenes y videos con Selenium: %s", e)
         
         # LIMITAR A MÁXIMO 15 IMÁGENES/VIDEOS
         if len(images) > 15:
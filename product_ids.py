@@ -0,0 +1,16 @@
+"""
+Identificadores de productos de Alibaba compartidos por las salidas, los reportes y el logging
+"""
+import re
+
+_PRODUCT_ID_RE = re.compile(r'_(\d+)\.html')
+
+
+def canonical_product_id(url: str) -> str:
+    """Id estable de un producto de Alibaba a partir de su URL de detalle"""
+    if not url or url == 'N/A':
+        return ''
+    match = _PRODUCT_ID_RE.search(url)
+    if match:
+        return match.group(1)
+    return url.split('?')[0].split('#')[0]
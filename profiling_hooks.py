@@ -0,0 +1,200 @@
+"""
+Perfilado bajo demanda del lado Python del bucle de scraping. Perfila fases elegidas
+(ver instrumentation.phase) o uno de cada N productos, por muestreo de pilas o de forma
+determinista, y escribe un archivo de pilas colapsadas por fase listo para flame graphs
+(flamegraph.pl, speedscope, inferno). Apagado no registra nada: costo nulo.
+"""
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from config import PROFILING_CONFIG
+from instrumentation import add_phase_listener, remove_phase_listener
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Session:
+    """Perfilado en curso de una fase en un hilo"""
+
+    def __init__(self, root: str, record: Dict[str, Any]):
+        self.root = root
+        self.record = record
+        self.counts: Dict[str, float] = {}
+        self.stack: List[list] = []
+
+    def add(self, path: str, value: float):
+        self.counts[path] = self.counts.get(path, 0) + value
+
+    def trace(self, frame, event, arg):
+        """Gancho de sys.setprofile: tiempo propio (µs) por pila completa"""
+        now = time.perf_counter()
+        if event == "call":
+            self.stack.append([_frame_label(frame.f_code), now, 0.0])
+        elif event == "c_call":
+            self.stack.append([f"{getattr(arg, '__qualname__', arg)} (builtin)", now, 0.0])
+        elif self.stack:
+            # return, c_return, c_exception; las llamadas abiertas antes de empezar se ignoran
+            label, started, children = self.stack.pop()
+            elapsed = now - started
+            path = ";".join([self.root] + [entry[0] for entry in self.stack] + [label])
+            self.add(path, (elapsed - children) * 1e6)
+            if self.stack:
+                self.stack[-1][2] += elapsed
+
+
+class PhaseProfiler:
+    """Suscriptor de fases que abre una sesión de perfilado por fase elegida y hilo"""
+
+    def __init__(self, config: Dict[str, Any] = PROFILING_CONFIG):
+        self.config = config
+        self.mode = config["mode"]
+        self.phases = set(config["phases"])
+        self.every = config["every_n_products"]
+        self.output_dir = os.path.join(config["output_dir"], time.strftime("%Y%m%d-%H%M%S"))
+        self.sessions: Dict[int, _Session] = {}
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self.product_count = 0
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._stop = threading.Event()
+
+    def _wanted(self, name: str) -> bool:
+        if name in self.phases or "all" in self.phases:
+            return True
+        return name == "product" and self.every > 0 and self.product_count % self.every == 0
+
+    def on_phase(self, event: str, record: Dict[str, Any]):
+        thread_id = threading.get_ident()
+        session = self.sessions.get(thread_id)
+        name = record["name"]
+        if event == "start":
+            if name == "product":
+                self.product_count += 1
+            # Las fases anidadas quedan dentro de la sesión (y del archivo) de la exterior
+            if session is not None or not self._wanted(name):
+                return
+            session = _Session(name, record)
+            with self._lock:
+                self.sessions[thread_id] = session
+            if self.mode == "deterministic":
+                sys.setprofile(session.trace)
+            else:
+                self._ensure_sampler()
+            return
+
+        if session is None or session.record is not record:
+            return
+        if self.mode == "deterministic":
+            sys.setprofile(None)
+        with self._lock:
+            del self.sessions[thread_id]
+        self._merge(session)
+
+    def _ensure_sampler(self):
+        if self._sampler is None or not self._sampler.is_alive():
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        interval = self.config["interval_s"]
+        while not self._stop.wait(interval):
+            with self._lock:
+                sessions = list(self.sessions.items())
+            if not sessions:
+                continue
+            frames = sys._current_frames()
+            for thread_id, session in sessions:
+                frame = frames.get(thread_id)
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if labels:
+                    session.add(";".join([session.root] + labels[::-1]), 1)
+
+    def _merge(self, session: _Session):
+        with self._lock:
+            totals = self.totals.setdefault(session.root, {})
+            for path, value in session.counts.items():
+                totals[path] = totals.get(path, 0) + value
+            snapshot = dict(totals)
+        self._write(session.root, snapshot)
+
+    def path_for(self, phase_name: str) -> str:
+        return os.path.join(self.output_dir, f"{phase_name}.{self.mode}.collapsed")
+
+    def _write(self, phase_name: str, totals: Dict[str, float]):
+        """Reescribe el archivo de la fase: 'marco;marco;... valor' por línea"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.path_for(phase_name), "w", encoding="utf-8") as f:
+                for path, value in sorted(totals.items()):
+                    if round(value) > 0:
+                        f.write(f"{path} {round(value)}\n")
+        except OSError as e:
+            print(f"⚠️ No se pudo escribir el perfil de {phase_name}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+        if self.totals:
+            print(f"🔬 Perfiles de pilas colapsadas en {self.output_dir}")
+
+
+def load_config(phases: Optional[str] = None, every: Optional[int] = None,
+                mode: Optional[str] = None) -> Dict[str, Any]:
+    """Combina PROFILING_CONFIG, las variables SCRAPER_PROFILE* y los argumentos de línea de comandos"""
+    config = dict(PROFILING_CONFIG)
+    phases = phases if phases is not None else os.environ.get("SCRAPER_PROFILE")
+    every = every if every is not None else os.environ.get("SCRAPER_PROFILE_EVERY")
+    mode = mode or os.environ.get("SCRAPER_PROFILE_MODE")
+    if phases:
+        config["phases"] = [name.strip() for name in phases.split(",") if name.strip()]
+        config["enabled"] = True
+    if every:
+        config["every_n_products"] = int(every)
+        config["enabled"] = True
+    if mode:
+        config["mode"] = mode
+    if os.environ.get("SCRAPER_PROFILE_DIR"):
+        config["output_dir"] = os.environ["SCRAPER_PROFILE_DIR"]
+    return config
+
+
+# Perfilador activo (None mientras el perfilado está apagado)
+profiler: Optional[PhaseProfiler] = None
+
+
+def configure_profiling(phases: Optional[str] = None, every: Optional[int] = None,
+                        mode: Optional[str] = None) -> Optional[PhaseProfiler]:
+    """Activa el perfilado si la configuración, el entorno o los argumentos lo piden"""
+    global profiler
+    config = load_config(phases, every, mode)
+    if not config["enabled"] or profiler is not None:
+        return profiler
+    if config["mode"] not in ("sampling", "deterministic"):
+        print(f"⚠️ Modo de perfilado desconocido: {config['mode']}")
+        return None
+    profiler = PhaseProfiler(config)
+    add_phase_listener(profiler.on_phase)
+    targets = ", ".join(config["phases"]) or "ninguna fase"
+    if config["every_n_products"]:
+        targets += f" + 1 de cada {config['every_n_products']} productos"
+    print(f"🔬 Perfilado {config['mode']} activo: {targets}")
+    return profiler
+
+
+def stop_profiling():
+    global profiler
+    if profiler is None:
+        return
+    remove_phase_listener(profiler.on_phase)
+    profiler.stop()
+    profiler = None
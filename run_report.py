@@ -0,0 +1,251 @@
+"""
+Reporte de rendimiento por ejecución: duraciones por fase (p50/p95/p99), reintentos y
+fallos por causa, aciertos de caché y productos por minuto a lo largo de la ejecución.
+Cada reporte se agrega a un historial; `--compare` marca regresiones de throughput.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from statistics import median
+from typing import Any, Dict, List, Optional
+from config import RUN_REPORT_CONFIG
+from instrumentation import add_phase_listener, command_recorder
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Percentil con interpolación lineal entre los valores ordenados"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _round(value: Optional[float], digits: int = 3) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+class RunReport:
+    """Acumula las métricas de una ejecución a partir de las fases y de avisos explícitos"""
+
+    def __init__(self, config: Dict[str, Any] = RUN_REPORT_CONFIG):
+        self.config = config
+        self.start()
+
+    def start(self, script: str = "mainv3"):
+        self.script = script
+        self.started_at = time.time()
+        self.durations: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.retries: Dict[str, Dict[str, int]] = {}
+        self.failures: Dict[str, Dict[str, int]] = {}
+        self.outcomes: Dict[str, int] = {}
+        self.cache: Dict[str, List[int]] = {}
+        self.counters: Dict[str, int] = {}
+        self.completed_at: List[float] = []
+
+    @staticmethod
+    def _bump(table: Dict[str, Dict[str, int]], phase_name: str, cause: str, n: int = 1):
+        causes = table.setdefault(phase_name, {})
+        causes[cause] = causes.get(cause, 0) + n
+
+    def on_phase(self, event: str, record: Dict[str, Any]):
+        """Suscriptor de fases: duraciones, excepciones y resultado de cada producto"""
+        if event != "end":
+            return
+        name = record["name"]
+        self.durations.setdefault(name, []).append(record["duration"])
+        if record["error"]:
+            self._bump(self.errors, name, record["error"])
+        if name == "product":
+            self.product_done(record["attrs"].get("outcome", "unknown"))
+
+    def product_done(self, outcome: str):
+        """Resultado de un producto detallado ("ok" cuenta para el throughput)"""
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if outcome == "ok":
+            self.completed_at.append(time.time())
+
+    def retry(self, phase_name: str, cause: str):
+        """Un intento falló y se volverá a intentar"""
+        self._bump(self.retries, phase_name, cause)
+
+    def failure(self, phase_name: str, cause: str):
+        """Se abandonó la operación"""
+        self._bump(self.failures, phase_name, cause)
+
+    def record_cache(self, page_type: str, stats: Optional[Dict[str, int]]):
+        """Recursos servidos desde la caché HTTP del navegador en una carga de página"""
+        if not stats:
+            return
+        entry = self.cache.setdefault(page_type, [0, 0])
+        entry[0] += stats.get("hits", 0)
+        entry[1] += stats.get("total", 0)
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def _timeline(self, finished_at: float) -> List[Dict[str, Any]]:
+        bucket = self.config["timeline_bucket_s"]
+        slots = [0] * (int((finished_at - self.started_at) // bucket) + 1)
+        for completed in self.completed_at:
+            slots[min(int((completed - self.started_at) // bucket), len(slots) - 1)] += 1
+        return [{"t_s": i * bucket, "products_per_minute": round(n * 60 / bucket, 2)} for i, n in enumerate(slots)]
+
+    def build(self, success: Optional[bool] = None) -> Dict[str, Any]:
+        finished_at = time.time()
+        elapsed = finished_at - self.started_at
+        completed = len(self.completed_at)
+        commands = command_recorder.run_summary()
+        return {
+            "run_id": time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at)),
+            "script": self.script,
+            "started_at": self.started_at,
+            "finished_at": finished_at,
+            "elapsed_s": round(elapsed, 1),
+            "success": success,
+            "products": {"completed": completed, "outcomes": self.outcomes},
+            "throughput": {
+                "products_per_minute": round(completed * 60 / elapsed, 3) if elapsed > 0 else 0,
+                "timeline": self._timeline(finished_at)
+            },
+            "phases": {
+                name: {
+                    "count": len(values),
+                    "p50_s": _round(percentile(values, 0.5)),
+                    "p95_s": _round(percentile(values, 0.95)),
+                    "p99_s": _round(percentile(values, 0.99)),
+                    "max_s": _round(max(values)),
+                    "total_s": _round(sum(values), 1)
+                }
+                for name, values in self.durations.items()
+            },
+            "retries": self.retries,
+            "failures": self.failures,
+            "errors": self.errors,
+            "cache": {
+                page_type: {"hits": hits, "total": total, "hit_rate": round(hits / total, 3) if total else None}
+                for page_type, (hits, total) in self.cache.items()
+            },
+            "counters": self.counters,
+            "commands": {
+                "total": commands["total"]["count"],
+                "per_product": round(sum(p["total"]["count"] for p in commands["products"]) / len(commands["products"]), 1)
+                if commands["products"] else None
+            }
+        }
+
+    def finish(self, success: Optional[bool] = None) -> Dict[str, Any]:
+        """Genera el reporte, lo guarda y lo agrega al historial"""
+        report = self.build(success)
+        try:
+            with open(self.config["report_file"], "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            with open(self.config["history_file"], "a", encoding="utf-8") as f:
+                f.write(json.dumps(report, ensure_ascii=False) + "\n")
+            print(f"📈 Reporte de la ejecución guardado en {self.config['report_file']}")
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el reporte de la ejecución: {e}")
+        return report
+
+
+def load_history(filename: str = RUN_REPORT_CONFIG["history_file"]) -> List[Dict[str, Any]]:
+    if not os.path.exists(filename):
+        return []
+    history = []
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    history.append(json.loads(line))
+                except ValueError:
+                    continue
+    return history
+
+
+def compare_runs(history: List[Dict[str, Any]], baseline_runs: int = RUN_REPORT_CONFIG["baseline_runs"],
+                 threshold: float = RUN_REPORT_CONFIG["regression_threshold"]) -> Dict[str, Any]:
+    """
+    Compara la última ejecución con la mediana de las anteriores del mismo script
+    que completaron productos. Marca regresión si el throughput cae más que threshold;
+    las fases cuyo p95 empeora más que threshold se listan como advertencia.
+    """
+    if not history:
+        return {"regression": False, "reason": "sin historial"}
+    latest = history[-1]
+    previous = [
+        r for r in history[:-1]
+        if r.get("script") == latest.get("script") and r.get("products", {}).get("completed")
+    ][-baseline_runs:]
+    if not previous:
+        return {"regression": False, "reason": "sin ejecuciones anteriores comparables", "latest": latest["run_id"]}
+
+    baseline = median(r["throughput"]["products_per_minute"] for r in previous)
+    current = latest["throughput"]["products_per_minute"]
+    change = (current - baseline) / baseline if baseline else 0.0
+
+    slower_phases = {}
+    for name, stats in latest.get("phases", {}).items():
+        values = [r["phases"][name]["p95_s"] for r in previous if name in r.get("phases", {})]
+        if not values or stats["p95_s"] is None:
+            continue
+        reference = median(values)
+        if reference and (stats["p95_s"] - reference) / reference > threshold:
+            slower_phases[name] = {"p95_s": stats["p95_s"], "baseline_p95_s": round(reference, 3)}
+
+    return {
+        "latest": latest["run_id"],
+        "baseline_runs": [r["run_id"] for r in previous],
+        "products_per_minute": current,
+        "baseline_products_per_minute": round(baseline, 3),
+        "change": round(change, 3),
+        "regression": change < -threshold,
+        "slower_phases": slower_phases
+    }
+
+
+def print_comparison(result: Dict[str, Any]):
+    if "change" not in result:
+        print(f"Nada que comparar: {result['reason']}")
+        return
+    print(f"Ejecución {result['latest']} contra {len(result['baseline_runs'])} anteriores")
+    print(f"Productos/minuto: {result['products_per_minute']} (línea base {result['baseline_products_per_minute']}, "
+          f"{result['change'] * 100:+.1f}%)")
+    for name, stats in result["slower_phases"].items():
+        print(f"  ⚠️ {name}: p95 {stats['p95_s']}s (antes {stats['baseline_p95_s']}s)")
+    if result["regression"]:
+        print("❌ Regresión de throughput")
+    else:
+        print("✅ Sin regresión de throughput")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reportes de rendimiento de las ejecuciones del scraper")
+    parser.add_argument("--history", default=RUN_REPORT_CONFIG["history_file"])
+    parser.add_argument("--compare", action="store_true", help="Compara la última ejecución con las anteriores")
+    parser.add_argument("--baseline", type=int, default=RUN_REPORT_CONFIG["baseline_runs"])
+    parser.add_argument("--threshold", type=float, default=RUN_REPORT_CONFIG["regression_threshold"])
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    if args.compare:
+        result = compare_runs(history, args.baseline, args.threshold)
+        print_comparison(result)
+        sys.exit(1 if result["regression"] else 0)
+
+    for report in history[-10:]:
+        print(f"{report['run_id']}  {report['script']:<7} {report['products']['completed']:>5} productos  "
+              f"{report['throughput']['products_per_minute']:>7} /min  {report['elapsed_s']:>8}s")
+
+
+# Instancia global
+run_report = RunReport()
+add_phase_listener(run_report.on_phase)
+
+if __name__ == "__main__":
+    main()
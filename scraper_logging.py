@@ -0,0 +1,169 @@
+"""
+Logging estructurado de bajo costo. Los registros se encolan desde el hilo que los
+emite y un hilo de fondo los formatea y escribe, en JSON Lines o texto. Cada registro
+lleva el id del worker, la fase activa y el contexto del producto en curso
+(original_product_id, canonical_id), que se toma de las fases del scraper.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+from config import LOGGING_CONFIG
+from instrumentation import add_phase_listener, current_phase
+from product_ids import canonical_product_id
+
+ROOT_LOGGER = "scraper"
+
+_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+# Atributos propios de LogRecord: lo demás son campos pasados con extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "context"}
+
+
+@contextmanager
+def log_context(**fields):
+    """Agrega campos a todos los registros emitidos dentro del bloque"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def _on_phase(event: str, record: Dict[str, Any]):
+    """Toma el contexto del producto de las fases original_product y product"""
+    if record["name"] == "original_product":
+        fields = {"original_product_id": record["attrs"].get("id")}
+    elif record["name"] == "product":
+        fields = {"canonical_id": canonical_product_id(record["attrs"].get("url"))}
+    else:
+        return
+    if event == "start":
+        record["log_token"] = _context.set({**_context.get(), **fields})
+    elif "log_token" in record:
+        _context.reset(record.pop("log_token"))
+
+
+class ContextFilter(logging.Filter):
+    """Corre en el hilo que emite: captura worker, fase y contexto antes de encolar"""
+
+    def __init__(self, worker_id: str):
+        super().__init__()
+        self.worker_id = worker_id
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.worker_id = self.worker_id
+        record.phase = current_phase()
+        record.context = _context.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        entry.update(getattr(record, "context", {}))
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        context = getattr(record, "context", {})
+        where = " ".join(f"{k}={v}" for k, v in context.items() if v is not None)
+        line = (f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} "
+                f"[{record.phase}{' ' + where if where else ''}] {record.getMessage()}")
+        return line + ("\n" + record.exc_text if record.exc_text else "")
+
+
+class _BackgroundQueueHandler(QueueHandler):
+    """Encola el registro ya resuelto; el hilo escritor arranca con el primer registro"""
+
+    def __init__(self, log_queue: queue.Queue, target: logging.Handler):
+        super().__init__(log_queue)
+        self.listener = QueueListener(log_queue, target, respect_handler_level=True)
+        self._started = False
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Solo se resuelve el mensaje (y la traza de la excepción); el JSON y la
+        # escritura quedan para el hilo de fondo
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if not self._started:
+            with self._lock:
+                if not self._started:
+                    self.listener.start()
+                    self._started = True
+        super().enqueue(record)
+
+    def stop(self):
+        with self._lock:
+            if self._started:
+                self.listener.stop()
+                self._started = False
+
+
+_handler: Optional[_BackgroundQueueHandler] = None
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, filename: Optional[str] = None,
+                      worker_id: Optional[str] = None) -> logging.Logger:
+    """(Re)configura el logger raíz del scraper; argumentos > entorno > LOGGING_CONFIG"""
+    global _handler
+    level = level or os.environ.get("SCRAPER_LOG_LEVEL") or LOGGING_CONFIG["level"]
+    fmt = fmt or os.environ.get("SCRAPER_LOG_FORMAT") or LOGGING_CONFIG["format"]
+    filename = filename or os.environ.get("SCRAPER_LOG_FILE") or LOGGING_CONFIG["file"]
+    worker_id = (worker_id or os.environ.get("SCRAPER_WORKER_ID") or LOGGING_CONFIG["worker_id"]
+                 or f"{socket.gethostname()}-{os.getpid()}")
+
+    target = logging.FileHandler(filename, encoding="utf-8") if filename else logging.StreamHandler(sys.stdout)
+    target.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    if _handler:
+        _handler.stop()
+        logger.removeHandler(_handler)
+    _handler = _BackgroundQueueHandler(queue.SimpleQueue(), target)
+    _handler.addFilter(ContextFilter(worker_id))
+    logger.addHandler(_handler)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    if _handler is None:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name.rsplit('.', 1)[-1]}")
+
+
+def shutdown_logging():
+    """Vacía la cola y detiene el hilo escritor"""
+    if _handler:
+        _handler.stop()
+
+
+add_phase_listener(_on_phase)
+atexit.register(shutdown_logging)
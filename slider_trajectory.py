@@ -0,0 +1,129 @@
+"""
+Generador vectorizado de trayectorias humanas para el slider del CAPTCHA
+"""
+from typing import Any, Dict, List, NamedTuple
+import numpy as np
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from config import SLIDER_TRAJECTORY_CONFIG
+
+# Geometría del slider en una sola llamada: centro del botón y recorrido disponible
+SLIDER_GEOMETRY_JS = """
+const slider = arguments[0];
+const container = (slider.parentElement &&
+    slider.parentElement.closest('div.nc_wrapper, div[class*="slider"]')) || slider.parentElement;
+const s = slider.getBoundingClientRect();
+const c = container.getBoundingClientRect();
+return {
+    x: Math.round(s.left + s.width / 2),
+    y: Math.round(s.top + s.height / 2),
+    slider_width: s.width,
+    container_width: c.width,
+    distance: Math.round(c.width - s.width)
+};
+"""
+
+
+class Trajectory(NamedTuple):
+    """Arrastre escalado en píxeles: desplazamientos absolutos desde el inicio"""
+    xs: np.ndarray
+    ys: np.ndarray
+    durations_ms: np.ndarray
+
+
+def generate_paths(profile: Dict[str, Any], count: int, points: int, rng: np.random.Generator):
+    """Genera `count` trayectorias normalizadas (x en [0, 1+overshoot]) en una sola pasada"""
+    t = np.linspace(0.0, 1.0, points + 1)[None, 1:]
+    ease = rng.uniform(*profile["ease"], size=(count, 1))
+    x = 1.0 - (1.0 - t) ** ease
+
+    # El sobrepaso crece al final y vuelve a 1 en el último punto
+    overshoot = rng.uniform(*profile["overshoot"], size=(count, 1))
+    x = x * (1.0 + overshoot * np.sin(np.pi * t) * 2.0)
+    x[:, -1] = 1.0
+
+    # Temblor vertical acumulado, acotado a unos pocos píxeles
+    y = np.cumsum(rng.normal(0.0, profile["jitter"], size=(count, points)), axis=1)
+    y = np.clip(y, -3.0, 3.0)
+
+    # Duración total repartida en pasos irregulares
+    total = rng.uniform(*profile["duration"], size=(count, 1)) * 1000.0
+    weights = rng.uniform(0.6, 1.4, size=(count, points))
+    durations = weights / weights.sum(axis=1, keepdims=True) * total
+    return x, y, durations
+
+
+class TrajectoryLibrary:
+    """Cache de trayectorias pregeneradas por perfil; se renueva al agotarse"""
+
+    def __init__(self, config: Dict[str, Any] = SLIDER_TRAJECTORY_CONFIG, seed=None):
+        self.config = config
+        self.rng = np.random.default_rng(seed)
+        self.paths = {}
+        self.remaining = {}
+
+    def _refill(self, profile: str):
+        self.paths[profile] = generate_paths(
+            self.config["profiles"][profile],
+            self.config["library_size"],
+            self.config["points"],
+            self.rng
+        )
+        self.remaining[profile] = list(self.rng.permutation(self.config["library_size"]))
+
+    def sample(self, profile: str, distance: float) -> Trajectory:
+        """Toma una trayectoria del perfil y la escala a la distancia en píxeles"""
+        if not self.remaining.get(profile):
+            self._refill(profile)
+        index = self.remaining[profile].pop()
+        x, y, durations = self.paths[profile]
+        return Trajectory(
+            xs=np.rint(x[index] * distance).astype(int),
+            ys=np.rint(y[index]).astype(int),
+            durations_ms=np.maximum(np.rint(durations[index]), 1).astype(int)
+        )
+
+
+# Instancia global compartida por todos los manejadores de CAPTCHA
+trajectory_library = TrajectoryLibrary()
+
+
+def mouse_events(x0: int, y0: int, trajectory: Trajectory) -> List[Dict[str, Any]]:
+    """Eventos Input.dispatchMouseEvent (CDP) del arrastre completo"""
+    events = [{"type": "mousePressed", "x": x0, "y": y0, "button": "left", "clickCount": 1}]
+    for dx, dy, delay in zip(trajectory.xs.tolist(), trajectory.ys.tolist(), trajectory.durations_ms.tolist()):
+        events.append({"type": "mouseMoved", "x": x0 + dx, "y": y0 + dy, "button": "left", "delay": delay})
+    events.append({
+        "type": "mouseReleased", "x": x0 + int(trajectory.xs[-1]), "y": y0 + int(trajectory.ys[-1]),
+        "button": "left", "clickCount": 1
+    })
+    return events
+
+
+def perform_drag(driver, slider_element, profile: str, library: TrajectoryLibrary = None) -> int:
+    """Arrastra el slider hasta el final enviando todo el gesto en un único comando.
+
+    Devuelve la distancia recorrida en píxeles.
+    """
+    library = library or trajectory_library
+    geometry = driver.execute_script(SLIDER_GEOMETRY_JS, slider_element)
+    distance = geometry["distance"] + SLIDER_TRAJECTORY_CONFIG["margin"]
+    trajectory = library.sample(profile, distance)
+    x0, y0 = geometry["x"], geometry["y"]
+
+    # Backend CDP: lote de Input.dispatchMouseEvent
+    if hasattr(driver, "dispatch_mouse_events"):
+        driver.dispatch_mouse_events(mouse_events(x0, y0, trajectory))
+        return distance
+
+    # WebDriver: un solo payload de acciones W3C
+    builder = ActionBuilder(driver)
+    pointer = builder.pointer_action
+    pointer.move_to_location(x0, y0)
+    pointer.pointer_down()
+    pointer.pause(float(library.rng.uniform(0.05, 0.15)))
+    for dx, dy, delay in zip(trajectory.xs.tolist(), trajectory.ys.tolist(), trajectory.durations_ms.tolist()):
+        pointer.source.create_pointer_move(duration=delay, x=x0 + dx, y=max(0, y0 + dy), origin="viewport")
+    pointer.pause(float(library.rng.uniform(0.05, 0.2)))
+    pointer.pointer_up()
+    builder.perform()
+    return distance
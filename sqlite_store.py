@@ -0,0 +1,247 @@
+"""
+Almacén SQLite normalizado de productos scrapeados
+"""
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+from config import OUTPUT_FILES, SQLITE_CONFIG
+from field_mask import project
+from product_ids import canonical_product_id
+from scraper_logging import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppliers (
+    supplier_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    type TEXT,
+    years_on_alibaba TEXT,
+    location TEXT,
+    performance TEXT
+);
+
+CREATE TABLE IF NOT EXISTS products (
+    canonical_id TEXT PRIMARY KEY,
+    original_product_id INTEGER,
+    category_id TEXT,
+    supplier_id INTEGER REFERENCES suppliers(supplier_id),
+    description TEXT,
+    price TEXT,
+    company TEXT,
+    min_order TEXT,
+    img TEXT,
+    product_url TEXT,
+    alibaba_detail_url TEXT,
+    detailed_description_text TEXT,
+    detailed_description_html TEXT,
+    iframe_content_text TEXT,
+    iframe_content_html TEXT,
+    scraped_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS price_tiers (
+    canonical_id TEXT NOT NULL REFERENCES products(canonical_id),
+    position INTEGER NOT NULL,
+    quantity TEXT,
+    price TEXT,
+    PRIMARY KEY (canonical_id, position)
+);
+
+-- section: 'attribute', 'packaging' o 'lead_time'
+CREATE TABLE IF NOT EXISTS attributes (
+    canonical_id TEXT NOT NULL REFERENCES products(canonical_id),
+    section TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (canonical_id, section, name)
+);
+
+-- source: 'gallery' (images) o 'iframe' (iframe_content.images)
+CREATE TABLE IF NOT EXISTS images (
+    canonical_id TEXT NOT NULL REFERENCES products(canonical_id),
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (canonical_id, source, position)
+);
+
+CREATE INDEX IF NOT EXISTS idx_products_original ON products(original_product_id);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category_id);
+CREATE INDEX IF NOT EXISTS idx_products_supplier ON products(supplier_id);
+CREATE INDEX IF NOT EXISTS idx_attributes_name ON attributes(name);
+"""
+
+PRODUCT_COLUMNS = [
+    "canonical_id", "original_product_id", "category_id", "supplier_id", "description",
+    "price", "company", "min_order", "img", "product_url", "alibaba_detail_url",
+    "detailed_description_text", "detailed_description_html",
+    "iframe_content_text", "iframe_content_html", "scraped_at"
+]
+
+class SQLiteProductStore:
+    """Backend de salida SQLite con inserciones por lotes en una transacción"""
+
+    def __init__(self, filename: str = OUTPUT_FILES['sqlite'], batch_size: int = SQLITE_CONFIG['batch_size']):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.conn = None
+        self.pending = []
+
+    def open(self):
+        self.conn = sqlite3.connect(self.filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def write(self, product: Dict[str, Any]):
+        self.pending.append(project(product, "json"))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Inserta los productos pendientes en una sola transacción. Si el lote falla se
+        reintenta producto por producto: el que falla se omite y los demás se guardan.
+        """
+        if not self.pending or not self.conn:
+            return
+        try:
+            with self.conn:
+                for product in self.pending:
+                    self._upsert_product(product)
+        except Exception as e:
+            logger.warning("Falló el lote de %d productos (%s), se inserta uno por uno", len(self.pending), e)
+            for product in self.pending:
+                try:
+                    with self.conn:
+                        self._upsert_product(product)
+                except Exception as e:
+                    logger.error("Producto omitido en SQLite: %s", e, extra={
+                        "url": product.get('alibaba_detail_url') or product.get('product_url')
+                    })
+        self.pending = []
+
+    def finalize(self, publish: bool = True):
+        if not self.conn:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+        print(f"Datos guardados en {self.filename}")
+
+    def _upsert_supplier(self, product: Dict[str, Any]) -> Optional[int]:
+        supplier = product.get('supplier_info') or {}
+        name = supplier.get('name')
+        if not name or name == 'N/A':
+            name = product.get('supplier_name')
+        if not name or name == 'N/A':
+            name = product.get('company')
+        if not name or name == 'N/A':
+            return None
+        self.conn.execute(
+            """
+            INSERT INTO suppliers (name, type, years_on_alibaba, location, performance)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                type = COALESCE(excluded.type, type),
+                years_on_alibaba = COALESCE(excluded.years_on_alibaba, years_on_alibaba),
+                location = COALESCE(excluded.location, location),
+                performance = COALESCE(excluded.performance, performance)
+            """,
+            (
+                name,
+                supplier.get('type'),
+                supplier.get('years_on_alibaba'),
+                supplier.get('location'),
+                json.dumps(supplier['performance'], ensure_ascii=False) if supplier.get('performance') else None
+            )
+        )
+        row = self.conn.execute("SELECT supplier_id FROM suppliers WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _upsert_product(self, product: Dict[str, Any]):
+        canonical_id = canonical_product_id(product.get('alibaba_detail_url') or product.get('product_url'))
+        if not canonical_id:
+            return
+        supplier_id = self._upsert_supplier(product)
+        iframe = product.get('iframe_content') or {}
+
+        # Reemplazar las filas hijas de una ejecución anterior del mismo producto
+        for table in ("price_tiers", "attributes", "images"):
+            self.conn.execute(f"DELETE FROM {table} WHERE canonical_id = ?", (canonical_id,))
+
+        values = {
+            "canonical_id": canonical_id,
+            "original_product_id": product.get('original_product_id'),
+            "category_id": None if product.get('category_id') in (None, 'N/A') else str(product['category_id']),
+            "supplier_id": supplier_id,
+            "description": product.get('description'),
+            "price": product.get('price'),
+            "company": product.get('company'),
+            "min_order": product.get('min_order'),
+            "img": product.get('img'),
+            "product_url": product.get('product_url'),
+            "alibaba_detail_url": product.get('alibaba_detail_url'),
+            "detailed_description_text": product.get('detailed_description_text'),
+            "detailed_description_html": product.get('detailed_description_html'),
+            "iframe_content_text": iframe.get('text'),
+            "iframe_content_html": iframe.get('reconstructed_html'),
+            "scraped_at": time.time()
+        }
+        placeholders = ", ".join("?" for _ in PRODUCT_COLUMNS)
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO products ({', '.join(PRODUCT_COLUMNS)}) VALUES ({placeholders})",
+            [values[column] for column in PRODUCT_COLUMNS]
+        )
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO price_tiers (canonical_id, position, quantity, price) VALUES (?, ?, ?, ?)",
+            [(canonical_id, i, tier.get('quantity'), tier.get('price'))
+             for i, tier in enumerate(product.get('prices') or [])]
+        )
+
+        attribute_rows = []
+        for section, field in (("attribute", "attributes"), ("packaging", "packaging_info"),
+                               ("lead_time", "delivery_lead_times")):
+            for name, value in (product.get(field) or {}).items():
+                attribute_rows.append((canonical_id, section, name, value))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO attributes (canonical_id, section, name, value) VALUES (?, ?, ?, ?)",
+            attribute_rows
+        )
+
+        image_rows = [(canonical_id, "gallery", i, url) for i, url in enumerate(product.get('images') or [])]
+        image_rows += [(canonical_id, "iframe", i, url) for i, url in enumerate(iframe.get('images') or [])]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO images (canonical_id, source, position, url) VALUES (?, ?, ?, ?)",
+            image_rows
+        )
+
+
+def price_tiers_for_category(conn: sqlite3.Connection, category_id: Any) -> List[Dict[str, Any]]:
+    """Todos los rangos de precio de una categoría (usa idx_products_category)"""
+    rows = conn.execute(
+        """
+        SELECT p.canonical_id, p.description, t.position, t.quantity, t.price
+        FROM products p JOIN price_tiers t ON t.canonical_id = p.canonical_id
+        WHERE p.category_id = ?
+        ORDER BY p.canonical_id, t.position
+        """,
+        (str(category_id),)
+    ).fetchall()
+    return [
+        {"canonical_id": r[0], "description": r[1], "position": r[2], "quantity": r[3], "price": r[4]}
+        for r in rows
+    ]
+
+
+def products_for_original(conn: sqlite3.Connection, original_product_id: int) -> List[str]:
+    """Ids canónicos scrapeados para un producto original (usa idx_products_original)"""
+    rows = conn.execute(
+        "SELECT canonical_id FROM products WHERE original_product_id = ? ORDER BY canonical_id",
+        (original_product_id,)
+    ).fetchall()
+    return [r[0] for r in rows]
@@ -0,0 +1,37 @@
+"""
+Script de prueba para el selector adaptativo de estrategias de CAPTCHA
+"""
+import os
+import random
+import tempfile
+from captcha_strategy import CaptchaStrategySelector
+
+
+def test_prefers_successful_strategy():
+    """Tras registrar resultados, la estrategia que resuelve se elige primero"""
+    random.seed(7)
+    selector = CaptchaStrategySelector(["v1", "v2", "v3", "v4"], stats_file=None)
+    for _ in range(20):
+        selector.record("slider:div.nc_wrapper", "v1", False, 4.0)
+        selector.record("slider:div.nc_wrapper", "v3", True, 3.0)
+    picks = [selector.choose("slider:div.nc_wrapper") for _ in range(50)]
+    assert picks.count("v3") > 40
+    # Dentro de un episodio no se repite una estrategia ya probada
+    assert selector.choose("slider:div.nc_wrapper", exclude={"v3"}) != "v3"
+    print("✅ Selección adaptativa verificada")
+
+
+def test_stats_persist():
+    """Las estadísticas sobreviven entre ejecuciones"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stats.json")
+        selector = CaptchaStrategySelector(["v1", "v2"], stats_file=path)
+        selector.record("slider:x", "v2", True, 2.5)
+        reloaded = CaptchaStrategySelector(["v1", "v2"], stats_file=path)
+        assert reloaded.stats["slider:x"]["v2"]["successes"] == 1
+        print("✅ Persistencia verificada")
+
+
+if __name__ == "__main__":
+    test_prefers_successful_strategy()
+    test_stats_persist()
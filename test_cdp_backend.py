@@ -0,0 +1,75 @@
+"""
+Script de prueba para la conexión CDP (sin navegador: websocket simulado)
+"""
+import json
+import queue
+import pytest
+from selenium.common.exceptions import TimeoutException
+from cdp_backend import CDPConnection, CDPDriver, CDPElement
+
+
+class FakeWebSocket:
+    """Responde cada comando con un eco y emite antes un evento"""
+
+    def __init__(self):
+        self.messages = queue.Queue()
+        self.sent = []
+
+    def send(self, payload):
+        message = json.loads(payload)
+        self.sent.append(message["method"])
+        self.messages.put(json.dumps({"method": "Page.frameNavigated",
+                                      "params": {"frame": {"url": f"https://example.com/{message['id']}"}}}))
+        self.messages.put(json.dumps({"id": message["id"], "result": {"method": message["method"]}}))
+
+    def recv(self):
+        return self.messages.get()
+
+    def close(self):
+        self.messages.put("")
+
+
+def test_pipeline_and_events():
+    """Los comandos se envían sin esperar y las respuestas se emparejan por id"""
+    connection = CDPConnection(FakeWebSocket())
+    events = []
+    connection.on("Page.frameNavigated", events.append)
+    results = connection.pipeline([("DOM.enable", {}), ("Network.enable", {}), ("Page.enable", {})])
+    assert [r["method"] for r in results] == ["DOM.enable", "Network.enable", "Page.enable"]
+    assert len(events) == 3
+    connection.close()
+    print("✅ Pipelining y eventos verificados")
+
+
+class SilentWebSocket(FakeWebSocket):
+    """Nunca responde a Page.navigate"""
+
+    def send(self, payload):
+        if json.loads(payload)["method"] != "Page.navigate":
+            super().send(payload)
+
+
+def test_pipeline_timeout_is_selenium_timeout():
+    """Un comando en lote que no responde lanza TimeoutException, como call()"""
+    connection = CDPConnection(SilentWebSocket())
+    with pytest.raises(TimeoutException):
+        connection.pipeline([("Page.enable", {}), ("Page.navigate", {"url": "about:blank"})], timeout=0.05)
+    connection.close()
+    print("✅ Timeout del lote convertido a TimeoutException")
+
+
+def test_driver_tracks_url_and_elements():
+    """current_url sale de los eventos y los elementos viajan como referencias"""
+    driver = CDPDriver(CDPConnection(FakeWebSocket()))
+    assert driver.current_url.startswith("https://example.com/")
+    element = CDPElement(driver, "e7")
+    assert driver._encode([element, {"x": element}]) == [{"__ref__": "e7"}, {"x": {"__ref__": "e7"}}]
+    assert driver._decode({"slider": {"__ref__": "e7"}})["slider"] == element
+    driver.connection.close()
+    print("✅ URL y referencias de elementos verificadas")
+
+
+if __name__ == "__main__":
+    test_pipeline_and_events()
+    test_pipeline_timeout_is_selenium_timeout()
+    test_driver_tracks_url_and_elements()
@@ -0,0 +1,99 @@
+"""
+Script de prueba para la exportación columnar (Parquet / Arrow IPC)
+"""
+import os
+import tempfile
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+from columnar_export import build_schema, export_columnar, iter_products_sqlite
+from sqlite_store import SQLiteProductStore
+
+
+def _product(n, complete=True):
+    product = {
+        "description": f"Producto {n}",
+        "product_url": f"https://www.alibaba.com/product-detail/Item_{n}.html?s=p",
+        "alibaba_detail_url": f"https://www.alibaba.com/product-detail/Item_{n}.html",
+        "original_product_id": 7,
+        "category_id": 10 + n % 2
+    }
+    if complete:
+        product.update({
+            "company": "Fabrica SA",
+            "prices": [{"quantity": "1-9 Pieces", "price": "$18.00"}],
+            "attributes": {"Brand Name": "Custom"},
+            "images": ["https://img/a.jpg"],
+            "supplier_info": {"name": "Proveedor A", "type": "Manufacturer", "location": "Shenzhen"},
+            "iframe_content": {"text": "texto", "images": ["https://img/c.jpg"]}
+        })
+    return product
+
+
+def _products():
+    # Los productos impares no traen proveedor, precios ni iframe
+    return [_product(n, complete=n % 2 == 0) for n in range(7)]
+
+
+def test_parquet_chunks_and_nulls():
+    """Exporta por lotes y conserva el esquema y los nulos"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.parquet")
+        assert export_columnar(iter(_products()), path, "parquet", chunk_size=3) == 7
+
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_rows == 7
+        assert parquet_file.metadata.num_row_groups == 3
+
+        table = pq.read_table(path)
+        assert table.schema.equals(build_schema())
+        assert all(field.nullable for field in table.schema)
+        rows = table.to_pylist()
+        assert [row["canonical_id"] for row in rows] == [str(n) for n in range(7)]
+        assert rows[0]["supplier_name"] == "Proveedor A" and rows[0]["attributes"] == [("Brand Name", "Custom")]
+        assert rows[1]["company"] is None and rows[1]["supplier_name"] is None
+        assert rows[1]["iframe_content_text"] is None
+        assert rows[1]["prices"] == [] and rows[1]["images"] == []
+        print("✅ Parquet exportado por lotes con nulos correctos")
+
+
+def test_arrow_ipc_stream():
+    """El formato Arrow IPC se lee de vuelta con las mismas filas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.arrow")
+        assert export_columnar(iter(_products()), path, "arrow", chunk_size=2) == 7
+
+        with pa.OSFile(path, "rb") as source:
+            reader = pa.ipc.open_stream(source)
+            batches = list(reader)
+        assert [batch.num_rows for batch in batches] == [2, 2, 2, 1]
+        table = pa.Table.from_batches(batches)
+        assert table.schema.equals(build_schema())
+        assert table.column("category_id").to_pylist() == [str(10 + n % 2) for n in range(7)]
+        print("✅ Arrow IPC exportado y leído correctamente")
+
+
+def test_sqlite_source_round_trip():
+    """Los productos reconstruidos desde SQLite por bloques llegan completos al Parquet"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, "products.sqlite3")
+        store = SQLiteProductStore(store_path, batch_size=4)
+        store.open()
+        for product in _products():
+            store.write(product)
+        store.finalize()
+
+        path = os.path.join(tmp, "catalog.parquet")
+        assert export_columnar(iter_products_sqlite(store_path, chunk_size=3), path, "parquet", chunk_size=3) == 7
+        rows = {row["canonical_id"]: row for row in pq.read_table(path).to_pylist()}
+        assert rows["0"]["prices"] == [{"quantity": "1-9 Pieces", "price": "$18.00"}]
+        assert rows["0"]["iframe_images"] == ["https://img/c.jpg"]
+        assert rows["1"]["supplier_name"] is None
+        print("✅ Exportación desde SQLite correcta")
+
+
+if __name__ == "__main__":
+    test_parquet_chunks_and_nulls()
+    test_arrow_ipc_stream()
+    test_sqlite_source_round_trip()
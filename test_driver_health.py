@@ -0,0 +1,125 @@
+"""
+Script de prueba para el monitor de salud del driver
+"""
+import time
+from driver_health import DriverHealthMonitor, MB
+from driver_manager import DriverManager
+
+CONFIG = {
+    "check_every": 2,
+    "max_rss_mb": 1000,
+    "max_js_heap_mb": 100,
+    "max_dom_nodes": 5000,
+    "max_latency_ms": 50,
+    "latency_window": 3,
+    "max_pages": 10,
+    "blank_between_pages": True
+}
+
+
+class FakeDriver:
+    """Driver que devuelve las métricas de Performance indicadas"""
+
+    def __init__(self, heap_mb=10, nodes=100, delay=0.0):
+        self.heap_mb = heap_mb
+        self.nodes = nodes
+        self.delay = delay
+        self.scripts = 0
+        self.cdp = []
+
+    def execute_script(self, script, *args):
+        self.scripts += 1
+        time.sleep(self.delay)
+        return 1
+
+    def execute_cdp_cmd(self, cmd, args):
+        self.cdp.append(cmd)
+        if cmd == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": self.heap_mb * MB},
+                                {"name": "Nodes", "value": self.nodes}]}
+        return {}
+
+
+def _monitor(rss=200, **overrides):
+    return DriverHealthMonitor({**CONFIG, **overrides}, read_rss=lambda driver: rss)
+
+
+def test_healthy_driver_samples_every_n_pages():
+    """Un driver sano no se recicla y solo se mide cada check_every páginas"""
+    monitor, driver = _monitor(), FakeDriver()
+    assert [monitor.check(driver) for _ in range(6)] == [None] * 6
+    assert driver.scripts == 3
+    assert driver.cdp.count("Performance.enable") == 1
+    assert monitor.last_sample["rss_mb"] == 200 and monitor.last_sample["dom_nodes"] == 100
+    print("✅ Driver sano: mediciones cada check_every páginas")
+
+
+def test_thresholds_trigger_recycle():
+    """Cada umbral superado devuelve su motivo"""
+    monitor = _monitor(rss=1500)
+    monitor.check(FakeDriver())
+    assert monitor.check(FakeDriver()) == "memoria de Chrome 1500 MB"
+
+    monitor = _monitor()
+    monitor.pages = 1
+    assert monitor.check(FakeDriver(heap_mb=250)) == "heap JS 250 MB"
+
+    monitor = _monitor()
+    monitor.pages = 1
+    assert monitor.check(FakeDriver(nodes=9000)) == "9000 nodos DOM"
+
+    monitor = _monitor()
+    monitor.pages = 1
+    reason = monitor.check(FakeDriver(delay=0.08))
+    assert reason and reason.startswith("latencia")
+    print("✅ Umbrales de memoria, heap, DOM y latencia")
+
+
+def test_max_pages_and_reset():
+    """Se recicla al llegar a max_pages aunque las mediciones estén bien; reset reinicia"""
+    monitor, driver = _monitor(max_pages=3), FakeDriver()
+    assert monitor.check(driver) is None
+    assert monitor.check(driver) is None
+    assert monitor.check(driver) == "3 páginas con el mismo driver"
+
+    monitor.reset()
+    assert monitor.pages == 0 and monitor.last_sample == {}
+    monitor.check(driver)
+    monitor.check(driver)
+    assert driver.cdp.count("Performance.enable") == 2
+    print("✅ max_pages y reset correctos")
+
+
+def test_missing_rss_reading_is_ignored():
+    """Sin lectura de memoria (psutil ausente) no se decide por RSS"""
+    monitor = DriverHealthMonitor(CONFIG, read_rss=lambda driver: None)
+    monitor.pages = 1
+    assert monitor.check(FakeDriver()) is None
+    assert monitor.last_sample["rss_mb"] is None
+    print("✅ Lectura de memoria ausente ignorada")
+
+
+def test_failed_recycle_does_not_escape():
+    """Si el reciclaje falla al lanzar Chrome, between_products lo registra y sigue"""
+    manager = DriverManager.__new__(DriverManager)
+    manager.driver = FakeDriver()
+    manager.health = _monitor(max_pages=1)
+    attempts = []
+
+    def recycle_driver(reason):
+        attempts.append(reason)
+        raise RuntimeError("chromedriver no arrancó")
+
+    manager.recycle_driver = recycle_driver
+    manager.between_products()
+    manager.between_products()
+    assert attempts == ["1 páginas con el mismo driver", "2 páginas con el mismo driver"]
+    print("✅ Un reciclaje fallido no corta el lote")
+
+
+if __name__ == "__main__":
+    test_healthy_driver_samples_every_n_pages()
+    test_thresholds_trigger_recycle()
+    test_max_pages_and_reset()
+    test_missing_rss_reading_is_ignored()
+    test_failed_recycle_does_not_escape()
@@ -0,0 +1,94 @@
+"""
+Script de prueba para el watchdog del driver y DriverManager.guarded
+"""
+import threading
+import time
+import pytest
+from driver_manager import DriverManager
+from driver_watchdog import DriverWatchdog, DriverHungError
+
+
+def _watchdog(fired_event=None):
+    calls = []
+
+    def on_timeout(label, seconds):
+        calls.append((label, seconds))
+        if fired_event:
+            fired_event.set()
+
+    return DriverWatchdog(on_timeout, poll_interval=0.01), calls
+
+
+def _manager(watchdog):
+    manager = DriverManager.__new__(DriverManager)
+    manager.watchdog = watchdog
+    manager.recycled = []
+    manager.recycle_driver = manager.recycled.append
+    return manager
+
+
+def test_disarm_before_deadline():
+    """Desarmado a tiempo no dispara"""
+    watchdog, calls = _watchdog()
+    watchdog.arm(5, "rápida")
+    time.sleep(0.05)
+    assert watchdog.disarm() is False
+    time.sleep(0.05)
+    assert calls == []
+    print("✅ Operación a tiempo no dispara el watchdog")
+
+
+def test_fires_once_and_rearms():
+    """Pasado el plazo dispara una sola vez; al rearmar se limpia el estado"""
+    fired = threading.Event()
+    watchdog, calls = _watchdog(fired)
+    watchdog.arm(0.03, "lenta")
+    assert fired.wait(1)
+    time.sleep(0.05)
+    assert calls == [("lenta", 0.03)]
+    assert watchdog.disarm() is True
+
+    watchdog.arm(5, "siguiente")
+    assert watchdog.fired is False
+    assert watchdog.disarm() is False
+    print("✅ El watchdog dispara una vez y se rearma limpio")
+
+
+def test_guarded_reraises_when_not_fired():
+    """Una excepción propia del bloque se propaga si el watchdog no disparó"""
+    watchdog, calls = _watchdog()
+    manager = _manager(watchdog)
+    with pytest.raises(ValueError):
+        with manager.guarded("detalle", 5):
+            raise ValueError("selector roto")
+    assert calls == [] and manager.recycled == []
+    print("✅ guarded propaga los errores normales")
+
+
+def test_guarded_raises_hung_error_when_fired():
+    """Si dispara, el error del driver muerto se descarta y se lanza DriverHungError"""
+    fired = threading.Event()
+    watchdog, calls = _watchdog(fired)
+    manager = _manager(watchdog)
+    with pytest.raises(DriverHungError) as info:
+        with manager.guarded("https://example.com/p", 0.03):
+            # El driver matado hace fallar la llamada en curso
+            fired.wait(1)
+            raise ConnectionError("chromedriver terminado")
+    assert info.value.label == "https://example.com/p"
+    assert manager.recycled == ["watchdog (https://example.com/p)"]
+
+    # También cuando el bloque termina sin error después de disparar
+    fired.clear()
+    with pytest.raises(DriverHungError):
+        with manager.guarded("búsqueda", 0.03):
+            fired.wait(1)
+    assert len(manager.recycled) == 2
+    print("✅ guarded lanza DriverHungError solo si el watchdog disparó")
+
+
+if __name__ == "__main__":
+    test_disarm_before_deadline()
+    test_fires_once_and_rearms()
+    test_guarded_reraises_when_not_fired()
+    test_guarded_raises_hung_error_when_fired()
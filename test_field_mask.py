@@ -0,0 +1,69 @@
+"""
+Script de prueba para la proyección de campos por consumidor
+"""
+from field_mask import project, wanted_fields, wanted_subfields
+
+
+def _product(**overrides):
+    product = {
+        "description": "Pantalla LCD",
+        "product_url": "https://www.alibaba.com/product-detail/LCD_1.html",
+        "detailed_description_text": "texto",
+        "prices": [{"quantity": "1-9 Pieces", "price": "$18.00"}],
+        "supplier_info": {"name": "Proveedor A", "type": "Manufacturer", "years_on_alibaba": "5 years",
+                          "location": "Shenzhen", "performance": {"Response Rate": "95%"}, "extra": 1},
+        "iframe_content": {"html": "<div>crudo</div>", "text": "texto iframe",
+                           "reconstructed_html": "<body>...</body>", "images": ["https://img/a.jpg"]},
+        "debug": True
+    }
+    product.update(overrides)
+    return product
+
+
+def test_api_contract_is_flattened():
+    """La API recibe iframe y proveedor aplanados, como en show_api_structure.py"""
+    payload = project(_product(), "api")
+    assert "iframe_content" not in payload and "supplier_info" not in payload and "debug" not in payload
+    assert payload["iframe_content_text"] == "texto iframe"
+    assert payload["iframe_content_html"] == "<body>...</body>"
+    assert payload["iframe_content_images"] == ["https://img/a.jpg"]
+    assert payload["supplier_name"] == "Proveedor A"
+    assert payload["supplier_type"] == "Manufacturer"
+    assert payload["supplier_years"] == "5 years"
+    assert payload["supplier_location"] == "Shenzhen"
+    assert payload["supplier_performance"] == {"Response Rate": "95%"}
+    print("✅ Contrato de la API aplanado")
+
+
+def test_api_keeps_explicit_supplier_name():
+    """Un supplier_name propio del producto no se pisa con el del proveedor"""
+    payload = project(_product(supplier_name="Nombre listado"), "api")
+    assert payload["supplier_name"] == "Nombre listado"
+    print("✅ supplier_name explícito conservado")
+
+
+def test_csv_and_json_masks():
+    """CSV recorta subclaves; JSON conserva el proveedor completo"""
+    csv_product = project(_product(), "csv")
+    assert set(csv_product["iframe_content"]) == {"text", "reconstructed_html", "images"}
+    assert "extra" not in csv_product["supplier_info"]
+
+    json_product = project(_product(), "json")
+    assert json_product["supplier_info"]["extra"] == 1
+    assert "html" not in json_product["iframe_content"]
+    print("✅ Máscaras de CSV y JSON correctas")
+
+
+def test_extraction_fields_are_the_union():
+    """La extracción pide la unión de las máscaras, también las aplanadas"""
+    assert "iframe_content" in wanted_fields(["api"])
+    assert sorted(wanted_subfields("iframe_content", ["api"])) == ["images", "reconstructed_html", "text"]
+    assert wanted_subfields("supplier_info") == ["name", "type", "years_on_alibaba", "location", "performance"]
+    print("✅ Unión de campos para la extracción")
+
+
+if __name__ == "__main__":
+    test_api_contract_is_flattened()
+    test_api_keeps_explicit_supplier_name()
+    test_csv_and_json_masks()
+    test_extraction_fields_are_the_union()
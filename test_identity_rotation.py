@@ -0,0 +1,40 @@
+"""
+Script de prueba para el seguimiento de CAPTCHA y la rotación de identidades
+"""
+from identity_rotation import CaptchaRateTracker, IdentityPool
+
+
+def test_tracker_rate():
+    """La tasa solo se evalúa con suficientes páginas y usa la ventana deslizante"""
+    tracker = CaptchaRateTracker(window=4, min_pages=3)
+    tracker.record(True)
+    tracker.record(True)
+    assert tracker.rate == 0.0
+    tracker.record(False)
+    assert abs(tracker.rate - 2 / 3) < 1e-9
+    for _ in range(4):
+        tracker.record(False)
+    assert tracker.rate == 0.0
+    tracker.mark_captcha()
+    assert tracker.rate == 0.25
+    assert tracker.total_captchas == 3
+    print("✅ Tasa de CAPTCHA verificada")
+
+
+def test_pool_changes_identity():
+    """La nueva identidad no repite el user agent actual y recorre los proxies"""
+    pool = IdentityPool(user_agents=["ua-1", "ua-2"], proxies=["p1:80", "p2:80"])
+    current = pool.next_identity()
+    proxies = {current["proxy"]}
+    for _ in range(5):
+        identity = pool.next_identity(current)
+        assert identity["user_agent"] != current["user_agent"]
+        proxies.add(identity["proxy"])
+        current = identity
+    assert proxies == {"p1:80", "p2:80"}
+    print("✅ Rotación de identidades verificada")
+
+
+if __name__ == "__main__":
+    test_tracker_rate()
+    test_pool_changes_identity()
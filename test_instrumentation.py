@@ -0,0 +1,118 @@
+"""
+Script de prueba para la instrumentación de comandos del driver por fase
+"""
+import json
+from concurrent.futures import Future
+from instrumentation import CommandRecorder, phase, current_phase, add_phase_listener, remove_phase_listener
+
+CONFIG = {
+    "enabled": True,
+    "measure_bytes": True,
+    "latency_buckets_ms": [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+    "log_per_product": False,
+    "summary_file": None
+}
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.headers = {}
+
+
+class FakePool:
+    def request(self, method, url, body=None, headers=None):
+        return FakeResponse(json.dumps({"value": {"ok": True}}).encode())
+
+
+class FakeExecutor:
+    """Imita RemoteConnection: execute serializa y pasa por _request y el pool HTTP"""
+
+    def __init__(self):
+        self._conn = FakePool()
+
+    def execute(self, command, params=None):
+        if command == "fail":
+            raise RuntimeError("boom")
+        return self._request("POST", f"http://localhost/{command}", json.dumps(params))
+
+    def _request(self, method, url, body=None):
+        return json.loads(self._conn.request(method, url, body=body).data)
+
+
+class FakeSeleniumDriver:
+    def __init__(self):
+        self.command_executor = FakeExecutor()
+
+
+class FakeConnection:
+    def send(self, method, params=None):
+        future = Future()
+        future.bytes_out = len(json.dumps(params))
+        future.bytes_in = 30
+        future.set_result({"result": {"value": 1}})
+        return future
+
+
+class FakeCDPDriver:
+    def __init__(self):
+        self.connection = FakeConnection()
+
+
+def test_commands_counted_by_phase():
+    """Los comandos cuentan para la fase más interna y se agrupan por producto"""
+    recorder = CommandRecorder(CONFIG)
+    add_phase_listener(recorder.on_phase)
+    try:
+        driver = recorder.attach(FakeSeleniumDriver())
+        recorder.attach(driver)  # instrumentar dos veces no duplica el conteo
+        cdp = recorder.attach(FakeCDPDriver())
+
+        driver.command_executor.execute("get", {"url": "https://example.com"})
+        with phase("product", url="https://example.com/p_1.html"):
+            with phase("detail"):
+                driver.command_executor.execute("executeScript", {"script": "return 1", "args": []})
+                with phase("images"):
+                    for _ in range(3):
+                        driver.command_executor.execute("findElements", {"using": "css selector", "value": "img"})
+                assert current_phase() == "detail"
+            cdp.connection.send("Runtime.evaluate", {"expression": "1"})
+            try:
+                driver.command_executor.execute("fail")
+            except RuntimeError:
+                pass
+    finally:
+        remove_phase_listener(recorder.on_phase)
+
+    summary = recorder.run_summary()
+    assert summary["total"]["count"] == 7
+    assert summary["total"]["errors"] == 1
+    assert summary["by_phase"]["images"]["count"] == 3
+    assert summary["by_phase"]["detail"]["count"] == 1
+    assert summary["by_phase"]["product"]["count"] == 2
+    assert summary["by_phase"]["other"]["count"] == 1
+    assert summary["by_phase_command"]["images/findElements"]["bytes_in"] > 0
+    assert summary["by_command"]["Runtime.evaluate"]["count"] == 1
+    assert summary["by_command"]["Runtime.evaluate"]["bytes_in"] == 30
+    assert summary["by_command"]["get"]["bytes_out"] == len('{"url": "https://example.com"}')
+
+    assert len(summary["products"]) == 1
+    assert summary["products"][0]["total"]["count"] == 6
+    print("✅ Comandos contados por fase y por producto")
+
+
+def test_percentile_from_histogram():
+    """Los percentiles salen de los límites de los buckets"""
+    recorder = CommandRecorder(CONFIG)
+    for ms in (1, 2, 3, 4, 30, 40, 700, 9000):
+        recorder.record("detail", "executeScript", ms)
+    buckets = recorder.run[("detail", "executeScript")].buckets
+    assert recorder.percentile(buckets, 0.5) == 5
+    assert recorder.percentile(buckets, 0.75) == 50
+    assert recorder.percentile(buckets, 1.0) == float("inf")
+    print("✅ Percentiles aproximados correctos")
+
+
+if __name__ == "__main__":
+    test_commands_counted_by_phase()
+    test_percentile_from_histogram()
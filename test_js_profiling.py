@@ -0,0 +1,87 @@
+"""
+Script de prueba para el perfilado de los scripts de extracción en Chrome
+"""
+import tempfile
+from js_profiling import JSProfiler, analyze_cpu_profile
+
+PROFILE = {
+    "nodes": [
+        {"id": 1, "callFrame": {"functionName": "(root)", "url": "", "lineNumber": -1}},
+        {"id": 2, "callFrame": {"functionName": "", "url": "", "lineNumber": 3}},
+        {"id": 3, "callFrame": {"functionName": "scanPackaging", "url": "", "lineNumber": 40}},
+        {"id": 4, "callFrame": {"functionName": "(garbage collector)", "url": "", "lineNumber": -1}},
+        {"id": 5, "callFrame": {"functionName": "track", "url": "https://assets.alicdn.com/x.js", "lineNumber": 9}},
+        {"id": 6, "callFrame": {"functionName": "(idle)", "url": "", "lineNumber": -1}}
+    ],
+    "samples": [3, 3, 2, 4, 5, 6, 3],
+    "timeDeltas": [1000, 1000, 500, 2000, 700, 9000, 1000]
+}
+
+
+class FakeDriver:
+    def __init__(self):
+        self.cdp = []
+        self.current_url = "https://www.alibaba.com/product-detail/x_1.html"
+        self.metrics = {"ScriptDuration": 0.010, "LayoutCount": 2, "LayoutDuration": 0.001, "RecalcStyleCount": 1,
+                        "RecalcStyleDuration": 0.0005, "TaskDuration": 0.02, "JSHeapUsedSize": 1024 * 1024, "Nodes": 900}
+
+    def execute_cdp_cmd(self, cmd, args):
+        self.cdp.append(cmd)
+        if cmd == "Performance.getMetrics":
+            metrics = [{"name": k, "value": v} for k, v in self.metrics.items()]
+            self.metrics = {**self.metrics, "ScriptDuration": 0.014, "LayoutCount": 5, "JSHeapUsedSize": 2048 * 1024}
+            return {"metrics": metrics}
+        if cmd == "Profiler.stop":
+            return {"profile": PROFILE}
+        return {}
+
+    def execute_script(self, script, *args):
+        assert "__domCalls" in script and "return {title: arguments[0]};" in script
+        return {"result": {"title": args[0]}, "dom_calls": {"querySelectorAll": 4, "textContent": 120}}
+
+
+def test_cpu_profile_self_times():
+    """Tiempo propio del script inyectado separado del GC y del JavaScript de la página"""
+    result = analyze_cpu_profile(PROFILE)
+    assert result["script_self_ms"] == 3.5
+    assert result["gc_ms"] == 2.0
+    assert result["page_js_ms"] == 0.7
+    assert result["top_functions"][0] == {"function": "scanPackaging:41", "self_ms": 3.0}
+    print("✅ Tiempos propios del perfil de CPU")
+
+
+def test_execute_profiles_and_unwraps_result():
+    """Con el modo activo se devuelve el resultado original y se registran las métricas"""
+    profiler = JSProfiler({"enabled": True, "sampling_interval_us": 100, "save_cpuprofile": False,
+                           "output_dir": tempfile.mkdtemp()})
+    driver = FakeDriver()
+    for _ in range(2):
+        assert profiler.execute(driver, "product_details", "return {title: arguments[0]};", "abc") == {"title": "abc"}
+    assert driver.cdp.count("Profiler.enable") == 1
+
+    record = profiler.records[0]
+    assert record["layout_count"] == 3
+    assert record["script_duration_ms"] == 4.0
+    assert record["heap_delta_kb"] == 1024
+    assert record["dom_calls_total"] == 124
+    summary = profiler.summary()["product_details"]
+    assert summary["pages"] == 2 and summary["dom_calls"]["textContent"] == 120
+    print("✅ Script perfilado con el resultado original")
+
+
+def test_disabled_is_plain_execute_script():
+    """Apagado no envía comandos CDP ni envuelve el script"""
+    class PlainDriver:
+        def execute_script(self, script, *args):
+            assert script == "return 1;"
+            return 1
+
+    assert JSProfiler({"enabled": False, "sampling_interval_us": 100, "save_cpuprofile": False,
+                       "output_dir": tempfile.mkdtemp()}).execute(PlainDriver(), "x", "return 1;") == 1
+    print("✅ Sin perfilado el script se ejecuta tal cual")
+
+
+if __name__ == "__main__":
+    test_cpu_profile_self_times()
+    test_execute_profiles_and_unwraps_result()
+    test_disabled_is_plain_execute_script()
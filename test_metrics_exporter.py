@@ -0,0 +1,61 @@
+"""
+Script de prueba para el exportador de métricas Prometheus
+"""
+import os
+import tempfile
+import urllib.request
+from metrics_exporter import MetricsRegistry, MetricsExporter
+
+
+def make_registry():
+    registry = MetricsRegistry()
+    products = registry.counter("scraper_products_total", "Productos", ["outcome"])
+    queue = registry.gauge("scraper_queue_depth", "Cola", ["queue"])
+    latency = registry.histogram("scraper_api_request_seconds", "Latencia", ["endpoint"], buckets=[0.1, 1])
+    products.inc(outcome="ok")
+    products.inc(outcome="ok")
+    queue.set(3, queue="detail")
+    for seconds in (0.05, 0.5, 2):
+        latency.observe(seconds, endpoint="send_product")
+    return registry
+
+
+def test_exposition_format():
+    """Contadores, gauges e histogramas en formato de texto de Prometheus"""
+    text = make_registry().render()
+    assert "# TYPE scraper_products_total counter" in text
+    assert 'scraper_products_total{outcome="ok"} 2' in text
+    assert 'scraper_queue_depth{queue="detail"} 3' in text
+    assert 'scraper_api_request_seconds_bucket{endpoint="send_product",le="0.1"} 1' in text
+    assert 'scraper_api_request_seconds_bucket{endpoint="send_product",le="1"} 2' in text
+    assert 'scraper_api_request_seconds_bucket{endpoint="send_product",le="+Inf"} 3' in text
+    assert 'scraper_api_request_seconds_count{endpoint="send_product"} 3' in text
+    print("✅ Formato de exposición correcto")
+
+
+def test_http_and_textfile():
+    """El endpoint /metrics y el archivo .prom exponen lo mismo"""
+    registry = make_registry()
+    path = os.path.join(tempfile.mkdtemp(), "scraper.prom")
+    base = {"enabled": True, "address": "127.0.0.1", "port": 0, "textfile_path": path, "textfile_interval": 60}
+
+    exporter = MetricsExporter(registry, {**base, "mode": "http"})
+    assert exporter.start()
+    try:
+        url = f"http://127.0.0.1:{exporter.server.server_port}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+    finally:
+        exporter.stop()
+    assert 'scraper_products_total{outcome="ok"} 2' in body
+
+    exporter = MetricsExporter(registry, {**base, "mode": "textfile"})
+    assert exporter.start()
+    exporter.stop()
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == registry.render()
+    print("✅ Métricas servidas por HTTP y escritas en archivo")
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_http_and_textfile()
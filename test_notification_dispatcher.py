@@ -0,0 +1,117 @@
+"""
+Script de prueba para el despachador de notificaciones (límites, resúmenes y cola acotada)
+"""
+import threading
+from notification_handler import NotificationDispatcher, describe_window
+
+
+class FakeSender:
+    """Reemplaza a NotificationHandler: guarda los mensajes en lugar de mostrarlos"""
+
+    sink = "log"
+
+    def __init__(self, block: threading.Event = None):
+        self.sent = []
+        self.block = block
+        self.started = threading.Event()
+
+    def send_captcha_alert(self, message, title, duration):
+        self.started.set()
+        if self.block:
+            self.block.wait(5)
+        self.sent.append(message)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _dispatcher(sender, clock, queue_size=50):
+    return NotificationDispatcher(
+        sender, queue_size=queue_size,
+        rate_limits={"product_sent": (2, 60), "captcha": (1, 300)},
+        digests={"product_sent": "{count} productos enviados en {window}"},
+        clock=clock
+    )
+
+
+def test_rate_limit_and_digest():
+    """Se entregan max_immediate por ventana; el resto sale en un resumen al cerrarla"""
+    sender, clock = FakeSender(), FakeClock()
+    dispatcher = _dispatcher(sender, clock)
+    for n in range(5):
+        dispatcher._handle("product_sent", "t", f"producto {n}", 5)
+    assert sender.sent == ["producto 0", "producto 1"]
+
+    # Antes de que venza la ventana no hay resumen
+    clock.now += 30
+    dispatcher._emit_digests()
+    assert len(sender.sent) == 2
+
+    clock.now += 31
+    dispatcher._emit_digests()
+    assert sender.sent[-1] == "5 productos enviados en el último minuto"
+    assert dispatcher.windows == {}
+
+    # Una ventana nueva vuelve a entregar de inmediato
+    dispatcher._handle("product_sent", "t", "producto 5", 5)
+    assert sender.sent[-1] == "producto 5"
+    print("✅ Límite por categoría y resumen correctos")
+
+
+def test_digest_per_category_and_uncategorized():
+    """Cada categoría tiene su ventana; sin categoría no hay límite"""
+    sender, clock = FakeSender(), FakeClock()
+    dispatcher = _dispatcher(sender, clock)
+    for n in range(3):
+        dispatcher._handle("captcha", "t", f"captcha {n}", 5)
+        dispatcher._handle(None, "t", f"libre {n}", 5)
+    assert sender.sent == ["captcha 0", "libre 0", "libre 1", "libre 2"]
+
+    # Una categoría que llega a su ventana no afecta a otra
+    dispatcher._handle("product_sent", "t", "producto", 5)
+    clock.now += 61
+    dispatcher._emit_digests()
+    assert sender.sent[-1] == "producto"
+
+    # La ventana de captcha es de 300 s: el texto del resumen la refleja
+    dispatcher._emit_digests(force=True)
+    assert sender.sent[-1] == "3 notificaciones 'captcha' en los últimos 5 minutos"
+    print("✅ Ventanas independientes por categoría")
+
+
+def test_bounded_queue_drops_without_blocking():
+    """Con el hilo ocupado y la cola llena, notify descarta en lugar de bloquear"""
+    release = threading.Event()
+    sender = FakeSender(block=release)
+    dispatcher = _dispatcher(sender, FakeClock(), queue_size=2)
+    try:
+        assert dispatcher.notify("primero")
+        assert sender.started.wait(2)
+        assert dispatcher.notify("segundo")
+        assert dispatcher.notify("tercero")
+        assert not dispatcher.notify("cuarto")
+        assert dispatcher.dropped == 1
+    finally:
+        release.set()
+        dispatcher.close(2)
+    assert sender.sent == ["primero", "segundo", "tercero"]
+    print("✅ Cola acotada descarta sin bloquear")
+
+
+def test_describe_window():
+    assert describe_window(60) == "el último minuto"
+    assert describe_window(600) == "los últimos 10 minutos"
+    assert describe_window(30) == "los últimos 30 segundos"
+    print("✅ Texto de la ventana correcto")
+
+
+if __name__ == "__main__":
+    test_rate_limit_and_digest()
+    test_digest_per_category_and_uncategorized()
+    test_bounded_queue_drops_without_blocking()
+    test_describe_window()
@@ -0,0 +1,76 @@
+"""
+Script de prueba para los escritores incrementales de salida
+"""
+import csv
+import json
+import os
+import tempfile
+from output_writers import CsvAppender, JsonLinesWriter, ImagesReportAppender, ProductOutputWriter
+
+
+def _sample_product(i):
+    return {
+        "img": f"https://img/{i}.jpg",
+        "description": f"Producto {i}",
+        "price": "$1.00",
+        "product_url": f"https://www.alibaba.com/product-detail/x_{i}.html",
+        "original_product_id": i,
+        "prices": [{"quantity": "1-9", "price": "$1.00"}],
+        "attributes": {"Marca": "X"},
+        "images": [f"https://img/{i}-a.jpg"],
+        "iframe_content": {"html": "<div>pesado</div>", "text": "t" * 2000, "images": [], "reconstructed_html": "<body></body>"}
+    }
+
+
+def test_output_writers():
+    """Escribe productos uno a uno y verifica la publicación atómica"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "out.csv")
+        jsonl_path = os.path.join(tmp, "out.jsonl")
+        json_path = os.path.join(tmp, "out.json")
+        report_path = os.path.join(tmp, "report.txt")
+        writer = ProductOutputWriter([
+            CsvAppender(csv_path),
+            JsonLinesWriter(jsonl_path, json_path),
+            ImagesReportAppender(report_path)
+        ])
+        writer.open()
+        for i in range(3):
+            writer.write(_sample_product(i))
+            # Cada producto queda en disco antes de finalizar
+            assert os.path.exists(jsonl_path + ".part")
+        assert not os.path.exists(csv_path)
+        writer.finalize()
+
+        with open(csv_path, encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 3
+        assert len(rows[0]["iframe_content_text"]) == 1000
+
+        with open(json_path, encoding="utf-8") as f:
+            products = json.load(f)
+        assert [p["original_product_id"] for p in products] == [0, 1, 2]
+        assert "html" not in products[0]["iframe_content"]
+
+        with open(report_path, encoding="utf-8") as f:
+            assert f.read().count("Total de imágenes: 1") == 3
+        print("✅ Escritores incrementales verificados")
+
+
+def test_recover_part_file():
+    """Un .part huérfano se conserva en lugar de mezclarse con la nueva ejecución"""
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, "out.jsonl")
+        with open(jsonl_path + ".part", "w", encoding="utf-8") as f:
+            f.write('{"description": "interrumpido"}\n')
+        sink = JsonLinesWriter(jsonl_path, None)
+        sink.open()
+        sink.finalize(publish=False)
+        recovered = [name for name in os.listdir(tmp) if ".recovered-" in name]
+        assert len(recovered) == 1
+        print("✅ Salida parcial recuperada")
+
+
+if __name__ == "__main__":
+    test_output_writers()
+    test_recover_part_file()
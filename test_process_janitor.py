@@ -0,0 +1,31 @@
+"""
+Script de prueba para la limpieza de perfiles huérfanos
+"""
+import json
+import os
+import tempfile
+from process_janitor import ProcessJanitor, register_profile, OWNER_FILE
+
+
+def test_sweep_only_stale_profiles():
+    """Se borran los perfiles de dueños muertos y los antiguos sin registro"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        janitor = ProcessJanitor({"interval": 600, "grace_period": 3600, "temp_dir": temp_dir})
+
+        paths = {name: os.path.join(temp_dir, f"chrome_scraper_{name}") for name in ("live", "dead", "old", "new")}
+        for path in paths.values():
+            os.mkdir(path)
+        register_profile(paths["live"])
+        with open(os.path.join(paths["dead"], OWNER_FILE), "w") as f:
+            json.dump({"pid": 2 ** 22 + 12345}, f)
+        os.utime(paths["old"], (0, 0))
+        os.mkdir(os.path.join(temp_dir, "otro_directorio"))
+
+        result = janitor.sweep()
+        assert result["profiles"] == 2
+        assert sorted(os.listdir(temp_dir)) == ["chrome_scraper_live", "chrome_scraper_new", "otro_directorio"]
+        print("✅ Solo se limpiaron los perfiles huérfanos")
+
+
+if __name__ == "__main__":
+    test_sweep_only_stale_profiles()
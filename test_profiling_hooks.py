@@ -0,0 +1,76 @@
+"""
+Script de prueba para el perfilado bajo demanda por fase
+"""
+import json
+import os
+import tempfile
+import time
+from instrumentation import phase, add_phase_listener, remove_phase_listener
+from profiling_hooks import PhaseProfiler, load_config
+
+
+def busy_serialization(rows: int = 2000):
+    return [json.dumps({"id": i, "values": list(range(20))}) for i in range(rows)]
+
+
+def read_collapsed(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.rsplit(" ", 1) for line in f.read().splitlines()]
+
+
+def run_with_profiler(mode: str, **overrides):
+    config = {"enabled": True, "mode": mode, "phases": ["send"], "every_n_products": 0,
+              "interval_s": 0.001, "output_dir": tempfile.mkdtemp(), **overrides}
+    profiler = PhaseProfiler(config)
+    add_phase_listener(profiler.on_phase)
+    try:
+        for _ in range(4):
+            with phase("product"):
+                with phase("send"):
+                    started = time.time()
+                    while time.time() - started < 0.05:
+                        busy_serialization(200)
+                with phase("write"):
+                    busy_serialization(50)
+    finally:
+        remove_phase_listener(profiler.on_phase)
+        profiler.stop()
+    return profiler
+
+
+def test_deterministic_profile_per_phase():
+    """Solo las fases elegidas generan su archivo de pilas colapsadas"""
+    profiler = run_with_profiler("deterministic")
+    assert sorted(os.listdir(profiler.output_dir)) == ["send.deterministic.collapsed"]
+    lines = read_collapsed(profiler.path_for("send"))
+    assert all(path.startswith("send;") and int(value) > 0 for path, value in lines)
+    assert any("busy_serialization (test_profiling_hooks.py" in path and "dumps" in path for path, _ in lines)
+    print("✅ Perfil determinista de la fase send")
+
+
+def test_sampling_every_n_products():
+    """El muestreo de uno de cada N productos escribe el archivo de la fase product"""
+    profiler = run_with_profiler("sampling", phases=[], every_n_products=2)
+    assert profiler.product_count == 4
+    lines = read_collapsed(profiler.path_for("product"))
+    assert lines and all(path.startswith("product;") for path, _ in lines)
+    assert any("busy_serialization" in path for path, _ in lines)
+    print("✅ Muestreo de uno de cada N productos")
+
+
+def test_config_from_environment():
+    """SCRAPER_PROFILE* activan el perfilado sin tocar el código"""
+    os.environ.update({"SCRAPER_PROFILE": "detail, send", "SCRAPER_PROFILE_EVERY": "10"})
+    try:
+        config = load_config()
+    finally:
+        del os.environ["SCRAPER_PROFILE"], os.environ["SCRAPER_PROFILE_EVERY"]
+    assert config["enabled"] and config["phases"] == ["detail", "send"] and config["every_n_products"] == 10
+    assert not load_config()["enabled"]
+    print("✅ Configuración desde variables de entorno")
+
+
+if __name__ == "__main__":
+    test_deterministic_profile_per_phase()
+    test_sampling_every_n_products()
+    test_config_from_environment()
@@ -0,0 +1,75 @@
+"""
+Script de prueba para el reporte de rendimiento por ejecución
+"""
+from instrumentation import phase, add_phase_listener, remove_phase_listener
+from run_report import RunReport, percentile, compare_runs
+
+
+def make_run(run_id, products_per_minute, detail_p95, script="mainv3"):
+    return {
+        "run_id": run_id,
+        "script": script,
+        "products": {"completed": 10},
+        "throughput": {"products_per_minute": products_per_minute},
+        "phases": {"detail": {"p95_s": detail_p95}}
+    }
+
+
+def test_percentile():
+    """Percentiles con interpolación lineal"""
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentile(values, 0.5) == 5.5
+    assert abs(percentile(values, 0.95) - 9.55) < 1e-9
+    assert percentile([], 0.5) is None
+    print("✅ Percentiles correctos")
+
+
+def test_report_from_phases():
+    """Las fases alimentan duraciones, errores y resultados por producto"""
+    report = RunReport({"report_file": None, "history_file": None, "timeline_bucket_s": 60,
+                        "baseline_runs": 5, "regression_threshold": 0.15})
+    add_phase_listener(report.on_phase)
+    try:
+        for outcome in ("ok", "ok", "failed"):
+            with phase("product", outcome=outcome):
+                with phase("detail"):
+                    pass
+        try:
+            with phase("send"):
+                raise ConnectionError("api caída")
+        except ConnectionError:
+            pass
+    finally:
+        remove_phase_listener(report.on_phase)
+    report.retry("detail", "incomplete")
+    report.failure("send", "api")
+    report.record_cache("detail", {"hits": 3, "total": 4})
+
+    result = report.build(success=True)
+    assert result["products"] == {"completed": 2, "outcomes": {"ok": 2, "failed": 1}}
+    assert result["phases"]["detail"]["count"] == 3
+    assert result["errors"] == {"send": {"ConnectionError": 1}}
+    assert result["retries"] == {"detail": {"incomplete": 1}}
+    assert result["cache"]["detail"]["hit_rate"] == 0.75
+    assert result["throughput"]["timeline"][0]["products_per_minute"] == 2
+    print("✅ Reporte construido a partir de las fases")
+
+
+def test_compare_flags_regression():
+    """Una caída de throughput frente a la mediana de la línea base es regresión"""
+    history = [make_run("a", 10, 4.0), make_run("b", 12, 4.2), make_run("x", 50, 1.0, script="main"),
+               make_run("c", 11, 4.1), make_run("d", 8, 6.0)]
+    result = compare_runs(history, baseline_runs=5, threshold=0.15)
+    assert result["baseline_runs"] == ["a", "b", "c"]
+    assert result["regression"]
+    assert "detail" in result["slower_phases"]
+
+    history[-1] = make_run("d", 10.5, 4.1)
+    assert not compare_runs(history, baseline_runs=5, threshold=0.15)["regression"]
+    print("✅ Regresiones de throughput detectadas")
+
+
+if __name__ == "__main__":
+    test_percentile()
+    test_report_from_phases()
+    test_compare_flags_regression()
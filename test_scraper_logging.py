@@ -0,0 +1,79 @@
+"""
+Script de prueba para el logging estructurado en segundo plano
+"""
+import json
+import os
+import tempfile
+import threading
+from instrumentation import phase, UNSCOPED
+from scraper_logging import configure_logging, get_logger, log_context, shutdown_logging
+
+
+def _read_lines(path):
+    """Registros del logger de prueba (el resumen por producto de instrumentation también llega aquí)"""
+    shutdown_logging()
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    return [line for line in lines if line["logger"] == "scraper.test"]
+
+
+def test_json_lines_with_product_context():
+    """Cada registro lleva worker, fase y el contexto del producto tomado de las fases"""
+    path = os.path.join(tempfile.mkdtemp(), "scraper.log.jsonl")
+    configure_logging("DEBUG", "json", path, worker_id="w1")
+    logger = get_logger("test")
+    try:
+        with phase("original_product", id=42, name="mouse"):
+            logger.info("Buscando %s", "mouse")
+            with phase("product", url="https://www.alibaba.com/product-detail/Mouse_1601234567.html?spm=x"):
+                with phase("detail"):
+                    logger.warning("Detalles incompletos", extra={"attempt": 2})
+        logger.debug("Fuera de producto")
+        lines = _read_lines(path)
+    finally:
+        configure_logging()
+
+    assert [line["msg"] for line in lines] == ["Buscando mouse", "Detalles incompletos", "Fuera de producto"]
+    assert all(line["worker_id"] == "w1" for line in lines)
+    assert lines[0]["phase"] == "original_product" and lines[0]["original_product_id"] == 42
+    assert "canonical_id" not in lines[0]
+    assert lines[1]["phase"] == "detail" and lines[1]["level"] == "WARNING"
+    assert lines[1]["canonical_id"] == "1601234567" and lines[1]["attempt"] == 2
+    assert lines[2]["phase"] == UNSCOPED and "original_product_id" not in lines[2]
+    print("✅ Registros JSON con contexto del producto correctos")
+
+
+def test_level_filter_exceptions_and_threads():
+    """Respeta el nivel, serializa excepciones y aísla el contexto por hilo"""
+    path = os.path.join(tempfile.mkdtemp(), "scraper.log.jsonl")
+    configure_logging("INFO", "json", path, worker_id="w2")
+    logger = get_logger("test")
+    try:
+        logger.debug("No debe aparecer")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Falló")
+
+        def worker(n):
+            with log_context(original_product_id=n):
+                logger.info("hilo %d", n)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        lines = _read_lines(path)
+    finally:
+        configure_logging()
+
+    assert lines[0]["msg"] == "Falló" and "ValueError: boom" in lines[0]["exc"]
+    by_thread = {line["msg"]: line["original_product_id"] for line in lines[1:]}
+    assert by_thread == {f"hilo {n}": n for n in range(4)}
+    print("✅ Niveles, excepciones y contexto por hilo correctos")
+
+
+if __name__ == "__main__":
+    test_json_lines_with_product_context()
+    test_level_filter_exceptions_and_threads()
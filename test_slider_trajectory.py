@@ -0,0 +1,44 @@
+"""
+Script de prueba para el generador de trayectorias del slider
+"""
+import numpy as np
+from slider_trajectory import TrajectoryLibrary, mouse_events
+
+
+def test_trajectories_reach_target():
+    """Todas las trayectorias terminan exactamente en la distancia pedida"""
+    library = TrajectoryLibrary(seed=1)
+    for profile in ("direct", "human", "overshoot"):
+        for _ in range(30):
+            trajectory = library.sample(profile, 260)
+            assert trajectory.xs[-1] == 260
+            assert len(trajectory.xs) == len(trajectory.ys) == len(trajectory.durations_ms)
+            assert np.all(np.abs(trajectory.ys) <= 3)
+            assert np.all(trajectory.durations_ms >= 1)
+    print("✅ Trayectorias llegan al final")
+
+
+def test_profiles_shape():
+    """El perfil humano avanza sin retroceder y el de sobrepaso se pasa del final"""
+    library = TrajectoryLibrary(seed=2)
+    human = library.sample("human", 300)
+    assert np.all(np.diff(human.xs) >= 0)
+    overshoot = library.sample("overshoot", 300)
+    assert overshoot.xs.max() > 300
+    print("✅ Perfiles verificados")
+
+
+def test_mouse_events_batch():
+    """El lote CDP es presionar, mover N veces y soltar"""
+    trajectory = TrajectoryLibrary(seed=3).sample("direct", 200)
+    events = mouse_events(100, 50, trajectory)
+    assert events[0]["type"] == "mousePressed"
+    assert events[-1]["type"] == "mouseReleased" and events[-1]["x"] == 300
+    assert len(events) == len(trajectory.xs) + 2
+    print("✅ Lote de eventos verificado")
+
+
+if __name__ == "__main__":
+    test_trajectories_reach_target()
+    test_profiles_shape()
+    test_mouse_events_batch()
@@ -0,0 +1,88 @@
+"""
+Script de prueba para el almacén SQLite de productos
+"""
+import os
+import sqlite3
+import tempfile
+from sqlite_store import (
+    SQLiteProductStore,
+    canonical_product_id,
+    price_tiers_for_category,
+    products_for_original
+)
+
+
+def _sample_product(product_id, category_id, supplier):
+    return {
+        "description": f"Producto {product_id}",
+        "product_url": f"https://www.alibaba.com/product-detail/Item_{product_id}.html?s=p",
+        "alibaba_detail_url": f"https://www.alibaba.com/product-detail/Item_{product_id}.html",
+        "original_product_id": 7,
+        "category_id": category_id,
+        "prices": [{"quantity": "1-9 Pieces", "price": "$18.00"}, {"quantity": "10+ Pieces", "price": "$16.50"}],
+        "attributes": {"Brand Name": "Custom"},
+        "packaging_info": {"Package Type": "Carton Box"},
+        "images": ["https://img/a.jpg", "https://img/b.jpg"],
+        "supplier_info": {"name": supplier, "type": "Manufacturer", "location": "Shenzhen"},
+        "iframe_content": {"text": "texto", "reconstructed_html": "<body></body>", "images": ["https://img/c.jpg"]}
+    }
+
+
+def test_canonical_product_id():
+    """El id canónico ignora slug y parámetros de la URL"""
+    assert canonical_product_id("https://www.alibaba.com/product-detail/10-LCD_1601384661191.html?s=p") == "1601384661191"
+    assert canonical_product_id("N/A") == ""
+
+
+def test_sqlite_store():
+    """Inserta por lotes y consulta por categoría y producto original"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "products.sqlite3")
+        store = SQLiteProductStore(path, batch_size=2)
+        store.open()
+        store.write(_sample_product(1, 10, "Proveedor A"))
+        store.write(_sample_product(2, 10, "Proveedor A"))
+        store.write(_sample_product(3, 11, "Proveedor B"))
+        # El mismo producto scrapeado de nuevo reemplaza sus filas
+        store.write(_sample_product(1, 10, "Proveedor A"))
+        store.finalize()
+
+        conn = sqlite3.connect(path)
+        tiers = price_tiers_for_category(conn, 10)
+        assert len(tiers) == 4
+        assert products_for_original(conn, 7) == ["1", "2", "3"]
+        assert conn.execute("SELECT COUNT(*) FROM suppliers").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM images WHERE canonical_id = '1'").fetchone()[0] == 3
+        plan = " ".join(str(r) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM products WHERE category_id = '10'"
+        ).fetchall())
+        assert "idx_products_category" in plan
+        conn.close()
+        print("✅ Almacén SQLite verificado")
+
+
+def test_bad_product_does_not_drop_batch():
+    """Un producto que no se puede insertar se omite sin perder el resto del lote"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "products.sqlite3")
+        store = SQLiteProductStore(path, batch_size=3)
+        store.open()
+        bad = _sample_product(2, 10, "Proveedor A")
+        bad["description"] = {"no": "es texto"}
+        store.write(_sample_product(1, 10, "Proveedor A"))
+        store.write(bad)
+        store.write(_sample_product(3, 10, "Proveedor A"))
+        assert store.pending == []
+        store.finalize()
+
+        conn = sqlite3.connect(path)
+        assert products_for_original(conn, 7) == ["1", "3"]
+        assert conn.execute("SELECT COUNT(*) FROM price_tiers WHERE canonical_id = '2'").fetchone()[0] == 0
+        conn.close()
+        print("✅ Producto inválido omitido sin perder el lote")
+
+
+if __name__ == "__main__":
+    test_canonical_product_id()
+    test_sqlite_store()
+    test_bad_product_does_not_drop_batch()
@@ -0,0 +1,83 @@
+"""
+Script de prueba para las trazas OTLP del ciclo de vida del producto
+"""
+import os
+import tempfile
+from instrumentation import phase, add_phase_listener, remove_phase_listener
+from tracing import Tracer, OtlpHttpExporter, start_collector, load_traces
+
+CONFIG = {"enabled": True, "exporter": "file", "service_name": "test-scraper"}
+
+
+class ListExporter:
+    def __init__(self):
+        self.payloads = []
+
+    def export(self, payload):
+        self.payloads.append(payload)
+
+
+def test_nested_spans_one_trace_per_root():
+    """Las fases anidadas forman una traza por raíz, con padres y errores"""
+    exporter = ListExporter()
+    tracer = Tracer(CONFIG, exporter)
+    add_phase_listener(tracer.on_phase)
+    try:
+        with phase("original_product", id=7):
+            with phase("search", term="mouse"):
+                pass
+            with phase("product", url="https://www.alibaba.com/product-detail/x_1.html") as record:
+                with phase("detail"):
+                    try:
+                        with phase("iframe"):
+                            raise TimeoutError("iframe")
+                    except TimeoutError:
+                        pass
+                record["attrs"]["outcome"] = "ok"
+        with phase("original_product", id=8):
+            pass
+    finally:
+        remove_phase_listener(tracer.on_phase)
+    assert tracer.flush()
+
+    assert len(exporter.payloads) == 2
+    spans = exporter.payloads[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+    assert set(by_name) == {"original_product", "search", "product", "detail", "iframe"}
+    assert len({span["traceId"] for span in spans}) == 1
+    assert "parentSpanId" not in by_name["original_product"]
+    assert by_name["detail"]["parentSpanId"] == by_name["product"]["spanId"]
+    assert by_name["iframe"]["status"] == {"code": 2, "message": "TimeoutError"}
+    assert {"key": "outcome", "value": {"stringValue": "ok"}} in by_name["product"]["attributes"]
+    assert {"key": "id", "value": {"intValue": "7"}} in by_name["original_product"]["attributes"]
+    print("✅ Spans anidados en una traza por producto original")
+
+
+def test_collector_round_trip():
+    """El exportador OTLP/HTTP entrega al colector local, que guarda en archivo"""
+    filename = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    server = start_collector(0, filename)
+    try:
+        exporter = OtlpHttpExporter(f"http://127.0.0.1:{server.server_port}/v1/traces", timeout=5)
+        tracer = Tracer(CONFIG, exporter)
+        add_phase_listener(tracer.on_phase)
+        try:
+            with phase("original_product", id=1):
+                with phase("send"):
+                    pass
+        finally:
+            remove_phase_listener(tracer.on_phase)
+        assert tracer.flush()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    traces = load_traces(filename)
+    assert len(traces) == 1
+    assert sorted(span["name"] for span in traces[0]) == ["original_product", "send"]
+    print("✅ Traza recibida por el colector local")
+
+
+if __name__ == "__main__":
+    test_nested_spans_one_trace_per_root()
+    test_collector_round_trip()
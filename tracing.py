@@ -0,0 +1,275 @@
+"""
+Trazas ligeras del ciclo de vida de cada producto. Cada fase del scraper (ver
+instrumentation.phase) abre un span; una traza agrupa un producto original con su
+búsqueda y cada listado de Alibaba detallado. Las trazas se exportan en OTLP/JSON a
+un archivo o a un colector OTLP/HTTP; `--collector` levanta un colector local mínimo.
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+import requests
+from config import TRACING_CONFIG
+from instrumentation import add_phase_listener
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in self.attributes.items() if v is not None],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def otlp_payload(spans: List[Span], service_name: str = TRACING_CONFIG["service_name"]) -> Dict[str, Any]:
+    """Documento ExportTraceServiceRequest en su codificación JSON"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "alibaba_scraper.tracing"},
+                "spans": [span.to_otlp() for span in spans]
+            }]
+        }]
+    }
+
+
+class FileSpanExporter:
+    """Una traza OTLP/JSON por línea"""
+
+    def __init__(self, filename: str = TRACING_CONFIG["file"]):
+        self.filename = filename
+
+    def export(self, payload: Dict[str, Any]):
+        with open(self.filename, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+
+class OtlpHttpExporter:
+    """POST a un colector OTLP/HTTP (/v1/traces) con cuerpo JSON"""
+
+    def __init__(self, endpoint: str = TRACING_CONFIG["otlp_endpoint"], timeout: float = TRACING_CONFIG["export_timeout"]):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, payload: Dict[str, Any]):
+        response = requests.post(self.endpoint, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+def create_exporter(config: Dict[str, Any] = TRACING_CONFIG):
+    if config["exporter"] == "file":
+        return FileSpanExporter(config["file"])
+    if config["exporter"] == "otlp_http":
+        return OtlpHttpExporter(config["otlp_endpoint"], config["export_timeout"])
+    return None
+
+
+class Tracer:
+    """Convierte las fases en spans y exporta cada traza en segundo plano al cerrarse su raíz"""
+
+    def __init__(self, config: Dict[str, Any] = TRACING_CONFIG, exporter=None):
+        self.config = config
+        self.exporter = exporter if exporter is not None else create_exporter(config)
+        self.enabled = config["enabled"] and self.exporter is not None
+        self._current: ContextVar[Optional[Span]] = ContextVar(f"current_span_{id(self)}", default=None)
+        self._traces: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+
+    def on_phase(self, event: str, record: Dict[str, Any]):
+        if not self.enabled:
+            return
+        spans_by_tracer = record.setdefault("spans", {})
+        if event == "start":
+            span = Span(record["name"], self._current.get(), record["attrs"])
+            spans_by_tracer[self] = (span, self._current.set(span))
+            return
+
+        if self not in spans_by_tracer:
+            return
+        span, token = spans_by_tracer.pop(self)
+        span.end_ns = time.time_ns()
+        span.attributes.update(record["attrs"])
+        span.error = record["error"]
+        self._current.reset(token)
+        with self._lock:
+            spans = self._traces.setdefault(span.trace_id, [])
+            spans.append(span)
+            if span.parent_id is None:
+                del self._traces[span.trace_id]
+            else:
+                spans = None
+        if spans:
+            self._enqueue(spans)
+
+    def _enqueue(self, spans: List[Span]):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+        self._queue.put(otlp_payload(spans, self.config["service_name"]))
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            try:
+                self.exporter.export(payload)
+            except Exception as e:
+                print(f"⚠️ No se pudo exportar una traza: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Espera a que se exporten las trazas pendientes"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/v1/traces":
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_error(400)
+            return
+        self.server.exporter.export(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_collector(port: int = 4318, filename: str = TRACING_CONFIG["file"], address: str = "127.0.0.1"):
+    """Colector OTLP/HTTP mínimo que guarda lo recibido en un archivo (para pruebas locales)"""
+    server = ThreadingHTTPServer((address, port), _CollectorHandler)
+    server.exporter = FileSpanExporter(filename)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def load_traces(filename: str = TRACING_CONFIG["file"]) -> List[List[Dict[str, Any]]]:
+    """Lee las trazas del archivo: una lista de spans OTLP por traza"""
+    traces = {}
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for span in scope.get("spans", []):
+                        traces.setdefault(span["traceId"], []).append(span)
+    return list(traces.values())
+
+
+def _duration_ms(span: Dict[str, Any]) -> float:
+    return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+
+def _attributes(span: Dict[str, Any]) -> Dict[str, Any]:
+    return {a["key"]: next(iter(a["value"].values())) for a in span.get("attributes", [])}
+
+
+def print_span_tree(spans: List[Dict[str, Any]], root: Dict[str, Any], depth: int = 0):
+    children = {}
+    for span in spans:
+        children.setdefault(span.get("parentSpanId"), []).append(span)
+    attributes = _attributes(root)
+    label = attributes.get("url") or attributes.get("term") or attributes.get("id") or ""
+    error = " ✗" if root.get("status", {}).get("code") == STATUS_ERROR else ""
+    print(f"{'  ' * depth}{_duration_ms(root):>9.0f}ms  {root['name']} {label}{error}")
+    for child in sorted(children.get(root["spanId"], []), key=lambda s: int(s["startTimeUnixNano"])):
+        print_span_tree(spans, child, depth + 1)
+
+
+def print_slowest(filename: str, span_name: str = "product", top: int = 5):
+    """Los spans más lentos de un tipo, con el desglose de sus hijos"""
+    candidates = []
+    for spans in load_traces(filename):
+        for span in spans:
+            if span["name"] == span_name:
+                candidates.append((_duration_ms(span), span, spans))
+    candidates.sort(key=lambda item: -item[0])
+    for _, span, spans in candidates[:top]:
+        print_span_tree(spans, span)
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trazas del scraper en OTLP/JSON")
+    parser.add_argument("--file", default=TRACING_CONFIG["file"])
+    parser.add_argument("--collector", action="store_true", help="Levanta un colector OTLP/HTTP local")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--slowest", type=int, default=5, help="Muestra los N spans más lentos")
+    parser.add_argument("--span", default="product", help="Tipo de span a ordenar (product, original_product, ...)")
+    args = parser.parse_args()
+
+    if args.collector:
+        server = start_collector(args.port, args.file)
+        print(f"Colector OTLP/HTTP escuchando en http://127.0.0.1:{args.port}/v1/traces -> {args.file}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+    print_slowest(args.file, args.span, args.slowest)
+
+
+# Instancia global
+tracer = Tracer()
+add_phase_listener(tracer.on_phase)
+
+if __name__ == "__main__":
+    main()